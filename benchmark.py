@@ -0,0 +1,357 @@
+"""Benchmarks for the editor at catalog scale.
+
+Generates synthetic catalogs shaped like itemConfigs.json and inventories
+shaped like itemIds.json, then times the editor's own code paths under the
+offscreen Qt platform:
+
+    load        load_json_file until the rows are in the table
+    populate    populate_table on the loaded data
+    filter      filter_table once per keystroke while a query is typed
+    save        save_json after one edit, and after every item changed
+
+Each case runs in a fresh subprocess so its peak RSS is its own. Results are
+printed (and optionally written) as JSON; with --baseline, metrics that got
+slower or bigger than the threshold allows are flagged and the exit status
+is 1.
+
+Examples:
+    python benchmark.py --sizes 300,10000 -o bench.json
+    python benchmark.py --baseline bench.json
+    python benchmark.py --kinds inventory --sizes 100000 --repeat 3
+
+Generated files are cached in --data-dir and reused while the generator
+(and its seed) stay the same.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from catalog_schema import DECLARED_COLUMNS
+from catalog_validate import ATTACHMENT_CATEGORY, ATTACHMENT_WEAPONS
+
+DEFAULT_SIZES = (300, 10_000, 100_000, 1_000_000)
+KINDS = ("catalog", "inventory")
+
+# Bump when the generated data changes shape, so cached files are rebuilt
+GENERATOR_VERSION = 2
+SEED = 1234
+
+# Typed one character at a time; each prefix is one filter_table call
+QUERIES = {
+    "catalog": "category:weapon rarity:epic",
+    "inventory": "baseitemid:consumable",
+}
+
+# Relative slowdown, and absolute floor, before a metric counts as a regression
+DEFAULT_THRESHOLD = 1.25
+MIN_TIME_DELTA_MS = 5.0
+MIN_RSS_DELTA_MB = 8.0
+
+# Generated values are ones the declared schema and the validator accept,
+# so the benchmark times the paths real catalogs take, not flagged cells
+CATEGORIES = DECLARED_COLUMNS["category"].choices
+RARITIES = DECLARED_COLUMNS["rarity"].choices
+ATTACHMENT_TYPES = DECLARED_COLUMNS["attachment_type"].choices
+WEAPON_CLASSES = tuple(weapon for weapon in ATTACHMENT_WEAPONS if weapon != "scanner")
+WORDS = ("Heavy", "Light", "Tactical", "Altered", "Kinetic", "Plasma", "Weak", "Strong",
+         "Rifle", "Vest", "Stim", "Core", "Shard", "Optic", "Helmet", "Battery")
+
+
+def generate_catalog(size, rng):
+    """itemConfigs-shaped document with size items"""
+    items = {}
+    for index in range(size):
+        words = rng.sample(WORDS, 2)
+        category = rng.choice(CATEGORIES)
+        attachment = rng.choice(ATTACHMENT_TYPES) if category == ATTACHMENT_CATEGORY else ""
+        if attachment:
+            weapon = "scanner" if attachment == "scanner" else rng.choice(WEAPON_CLASSES)
+        else:
+            weapon = ""
+        items[f"{words[0]}{words[1]}_{index:07d}"] = {
+            "displayName": f"{words[0]} {words[1]} {index}",
+            "category": category,
+            "rarity": rng.choice(RARITIES),
+            "maxDurability": rng.choice((-1, -1, 100, 250, 1000)),
+            "icon": f"{words[0]}{words[1]}.png",
+            "maxStackSize": rng.choice((1, 1, 5, 10, 20, 50, 250)),
+            "attachment_weapon": weapon,
+            "attachment_type": attachment,
+        }
+    return {"itemConfigs": items}
+
+
+def generate_inventory(size, rng):
+    """itemIds-shaped array of size inventory records"""
+    bases = [f"{category.title()}_{word}_{n:02d}"
+             for category in CATEGORIES for word in WORDS[:6] for n in range(1, 4)]
+    records = []
+    for index in range(size):
+        base = rng.choice(bases)
+        records.append({
+            "itemId": f"{rng.getrandbits(32):08x}-{index:04x}-{rng.getrandbits(16):04x}",
+            "baseItemId": base,
+            "displayName": base,
+            "bgImg": "./bgImg/",
+            "tags": base.lower().split("_"),
+            "primaryVanityId": 0,
+            "secondaryVanityId": 0,
+            "amount": rng.choice((1, 1, 1, 5, 20)),
+            "durability": rng.choice((-1, 100)),
+            "modData": {"m": []},
+            "rolledPerks": [],
+            "insurance": "",
+            "insuranceOwnerPlayfabId": "",
+            "insuredAttachmentId": "",
+            "origin": {"t": "", "p": "", "g": ""},
+        })
+    return records
+
+
+def dataset_path(data_dir, kind, size):
+    """Generate (once) and return the path of a synthetic file"""
+    name = "itemConfigs.json" if kind == "catalog" else "itemIds.json"
+    folder = os.path.join(data_dir, f"v{GENERATOR_VERSION}-{SEED}-{kind}-{size}")
+    path = os.path.join(folder, name)
+    if not os.path.exists(path):
+        os.makedirs(folder, exist_ok=True)
+        rng = random.Random(f"{SEED}-{kind}-{size}")
+        document = generate_catalog(size, rng) if kind == "catalog" else generate_inventory(size, rng)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=4, ensure_ascii=False)
+        os.replace(temp_path, path)
+    return path
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(kind, size, source_path):
+    """Time one catalog in this process and return its metrics"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    # Dialogs would block a headless run
+    QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Ok)
+    QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.No)
+
+    import json_editor
+
+    # Work on a copy so saves never touch the cached source file
+    work_dir = tempfile.mkdtemp(prefix="catalog-bench-")
+    path = os.path.join(work_dir, os.path.basename(source_path))
+    with open(source_path, "rb") as src, open(path, "wb") as dst:
+        dst.write(src.read())
+
+    editor = json_editor.ItemConfigsEditor()
+    editor.thumbnails.cancel_queued()
+    baseline_rss = peak_rss_mb()
+    metrics = {}
+
+    loaded = []
+    start = time.perf_counter()
+    editor.load_json_file(path, lambda: loaded.append(True), lambda error: loaded.append(error))
+    while not loaded:
+        app.processEvents()
+    if loaded[0] is not True:
+        raise RuntimeError(f"load failed: {loaded[0]}")
+    metrics["load_ms"] = elapsed_ms(start)
+    app.processEvents()
+
+    start = time.perf_counter()
+    editor.populate_table()
+    metrics["populate_ms"] = elapsed_ms(start)
+
+    query = QUERIES[kind]
+    timings = []
+    for end in range(1, len(query) + 1):
+        editor.search_input.setText(query[:end])
+        start = time.perf_counter()
+        editor.filter_table()
+        timings.append(elapsed_ms(start))
+    metrics["filter_first_ms"] = timings[0]
+    metrics["filter_keystroke_ms"] = round(statistics.median(timings[1:]), 3)
+    metrics["filter_max_ms"] = max(timings)
+    metrics["filter_matches"] = editor.proxy.rowCount()
+    editor.clear_search()
+
+    model = editor.model
+    column = 1 if kind == "inventory" else model.column_of("displayName")
+    model.setData(model.index(0, column), "Benchmark edit")
+    start = time.perf_counter()
+    editor.save_json()
+    metrics["save_edit_ms"] = elapsed_ms(start)
+
+    model.writer.mark_all(model.item_ids)
+    start = time.perf_counter()
+    editor.save_json()
+    metrics["save_full_ms"] = elapsed_ms(start)
+
+    metrics["rows"] = model.rowCount()
+    metrics["file_mb"] = round(os.path.getsize(path) / (1024 * 1024), 2)
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    if baseline_rss is not None:
+        metrics["startup_rss_mb"] = baseline_rss
+
+    editor.watcher.unwatch()
+    if model.journal is not None:
+        model.journal.discard()
+    for name in os.listdir(work_dir):
+        os.remove(os.path.join(work_dir, name))
+    os.rmdir(work_dir)
+    return metrics
+
+
+def elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def run_in_subprocess(kind, size, path, timeout):
+    command = [sys.executable, os.path.abspath(__file__), "--case", kind, str(size), path]
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run(command, capture_output=True, text=True, timeout=timeout, env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(f"{kind} {size}: case failed\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def combine_repeats(runs):
+    """Median of each metric over repeated runs"""
+    combined = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs if run.get(key) is not None]
+        if values and all(isinstance(value, (int, float)) for value in values):
+            combined[key] = round(statistics.median(values), 3)
+        else:
+            combined[key] = runs[-1][key]
+    return combined
+
+
+def compare(results, baseline, threshold):
+    """Return regressions of results against a baseline results document"""
+    previous = {(entry["kind"], entry["size"]): entry["metrics"] for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry["kind"], entry["size"]))
+        if before is None:
+            continue
+        for key, value in entry["metrics"].items():
+            old = before.get(key)
+            if key.endswith("_ms"):
+                floor = MIN_TIME_DELTA_MS
+            elif key.endswith("_mb") and key != "file_mb":
+                floor = MIN_RSS_DELTA_MB
+            else:
+                continue
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            if value > old * threshold and value - old > floor:
+                regressions.append({
+                    "kind": entry["kind"], "size": entry["size"], "metric": key,
+                    "baseline": old, "current": value, "ratio": round(value / old, 2) if old else None,
+                })
+    return regressions
+
+
+def environment():
+    try:
+        from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    except ImportError:
+        PYQT_VERSION_STR = QT_VERSION_STR = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "generator": GENERATOR_VERSION,
+        "seed": SEED,
+    }
+
+
+def parse_sizes(text):
+    try:
+        return [int(size.replace("_", "")) for size in text.split(",") if size.strip()]
+    except ValueError:
+        raise SystemExit(f"error: invalid --sizes {text!r}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmark.py", description="Benchmark the item editor at scale.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated item counts (default: %(default)s)")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="catalog, inventory or both")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the median is reported")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "catalog-bench-data"),
+                        help="where generated files are cached")
+    parser.add_argument("-o", "--output", help="write the results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown ratio counted as a regression (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds allowed per case")
+    parser.add_argument("--case", nargs=3, metavar=("KIND", "SIZE", "PATH"), help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.case:
+        kind, size, path = args.case
+        print(json.dumps(run_case(kind, int(size), path)))
+        return 0
+
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()]
+    for kind in kinds:
+        if kind not in KINDS:
+            raise SystemExit(f"error: unknown kind {kind!r}")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = []
+    for kind in kinds:
+        for size in parse_sizes(args.sizes):
+            path = dataset_path(args.data_dir, kind, size)
+            runs = [run_in_subprocess(kind, size, path, args.timeout) for _ in range(max(1, args.repeat))]
+            metrics = combine_repeats(runs)
+            results.append({"kind": kind, "size": size, "metrics": metrics})
+            print(f"{kind:>9} {size:>9}: load {metrics['load_ms']:.0f} ms, "
+                  f"keystroke {metrics['filter_keystroke_ms']:.1f} ms, "
+                  f"save {metrics['save_edit_ms']:.0f} ms, peak {metrics['peak_rss_mb']} MB",
+                  file=sys.stderr)
+
+    document = {"environment": environment(), "results": results}
+    if baseline is not None:
+        document["regressions"] = compare(results, baseline, args.threshold)
+        for regression in document["regressions"]:
+            print(f"REGRESSION {regression['kind']} {regression['size']} {regression['metric']}: "
+                  f"{regression['baseline']} -> {regression['current']}", file=sys.stderr)
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return 1 if document.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""Command line tool for item config catalogs (no Qt required).
+
+Examples:
+    python catalog_cli.py query itemConfigs.json --where "category:armor rarity:epic"
+    python catalog_cli.py set itemConfigs.json --set maxStackSize=10 --where "category:ammo"
+    python catalog_cli.py validate builds/*/itemConfigs.json --report validation.json
+    python catalog_cli.py merge base.json patch.json -o merged.json
+    python catalog_cli.py merge --base base.json ours.json theirs.json -o merged.json
+    python catalog_cli.py diff _itemConfigs.json itemConfigs.json
+    python catalog_cli.py export itemConfigs.json -o items.csv
+    python catalog_cli.py export items.sqlite -o itemConfigs.json
+    python catalog_cli.py xref . --check
+
+Every command reads and writes any format in catalog_formats.py (json,
+jsonl, csv, tsv, sqlite, columnar), picked by file extension. Queries use
+the editor's search syntax (see catalog_search.py). Exit status
+is 0 on success, 1 when validation (or xref --check) finds problems, diff
+finds differences or a three-way merge has conflicts, and 2 on usage or I/O
+errors.
+"""
+import argparse
+import csv
+import json
+import sys
+
+from collections.abc import Mapping
+
+from catalog_core import Catalog, atomic_write_text, coerce_value, json_default
+from catalog_diff import ADDED, CHANGED, REMOVED, RESOLVE_MARKERS, diff_catalogs, merge_catalogs
+from catalog_formats import FORMATS, export_catalog, load_catalog, save_catalog
+from catalog_schema import MISSING
+from catalog_validate import CACHE_FILE, validate_files
+from catalog_xref import CrossReference
+
+
+def load_catalogs(paths):
+    """Yield (path, Catalog) for each file, reporting unreadable files"""
+    for path in paths:
+        try:
+            yield path, load_catalog(path)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"error: cannot load {path}: {e}")
+
+
+def parse_assignments(assignments):
+    """Turn ["field=value", ...] into [(field, text), ...]; see coerce_assignments"""
+    parsed = []
+    for assignment in assignments:
+        field, sep, value = assignment.partition("=")
+        if not sep or not field.strip():
+            raise SystemExit(f"error: expected FIELD=VALUE, got {assignment!r}")
+        parsed.append((field.strip(), value))
+    return parsed
+
+
+def coerce_assignments(path, catalog, assignments):
+    """Typed values of assignments for one catalog.
+
+    Columns typed from the catalog's data (a ColumnStore's schema) parse
+    by that type; new columns and array catalogs use the declared schema.
+    """
+    schema = getattr(catalog.items, "schema", None) or {}
+    values = []
+    for field, text in assignments:
+        try:
+            if field in schema:
+                values.append((field, schema[field].parse(text)))
+            else:
+                values.append((field, coerce_value(field, text)))
+        except ValueError as e:
+            raise SystemExit(f"error: {path}: {e}")
+    return values
+
+
+def cmd_query(args):
+    for path, catalog in load_catalogs(args.files):
+        matches = catalog.find(args.where, args.column)
+        if args.format == "count":
+            print(f"{path}\t{len(matches)}" if len(args.files) > 1 else len(matches))
+            continue
+        if args.format == "ids":
+            for item_id in matches:
+                print(item_id)
+            continue
+        if args.format == "json":
+            json.dump({item_id: catalog.items[item_id] for item_id in matches},
+                      sys.stdout, indent=4, ensure_ascii=False, default=json_default)
+            print()
+            continue
+
+        columns = args.columns.split(",") if args.columns else catalog.columns[1:]
+        writer = csv.writer(sys.stdout, delimiter="\t", lineterminator="\n")
+        writer.writerow(["ID"] + columns)
+        for item_id in matches:
+            item = catalog.items.get(item_id)
+            item = item if isinstance(item, Mapping) else {}
+            writer.writerow([item_id] + [item.get(column, "") for column in columns])
+    return 0
+
+
+def cmd_set(args):
+    assignments = parse_assignments(args.set)
+    for path, catalog in load_catalogs(args.files):
+        values = coerce_assignments(path, catalog, assignments)
+        changed = 0
+        for item_id in catalog.find(args.where):
+            for field, value in values:
+                changed += catalog.set_value(item_id, field, value)
+        if changed and not args.dry_run:
+            save_catalog(catalog)
+        action = "would change" if args.dry_run else "changed"
+        print(f"{path}: {action} {changed} value(s)")
+    return 0
+
+
+def cmd_validate(args):
+    report = validate_files(args.files, args.jobs, None if args.no_cache else args.cache)
+    if args.report:
+        try:
+            atomic_write_text(args.report, json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+        except OSError as e:
+            raise SystemExit(f"error: cannot write {args.report}: {e}")
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        for path, result in report["files"].items():
+            if result["error"]:
+                status = result["error"]
+            else:
+                status = "OK" if not result["problems"] else f"{len(result['problems'])} problem(s)"
+            print(f"{path}: {result['items']} items, {status}" + (" (cached)" if result["cached"] else ""))
+            for problem in result["problems"]:
+                print(f"  {problem['id']}: {problem['message']}")
+        summary = report["summary"]
+        print(f"{summary['failed']} of {summary['files']} file(s) failed, {summary['problems']} problem(s), "
+              f"{summary['cached']} unchanged", file=sys.stderr)
+    return 1 if report["summary"]["failed"] else 0
+
+
+def cmd_merge(args):
+    """Overlay catalogs in order; items in later files replace earlier ones"""
+    if args.base:
+        return merge_three_way(args)
+    merged = Catalog(path=args.output)
+    for _, catalog in load_catalogs(args.files):
+        for item_id in catalog.item_ids:
+            merged.add(item_id, catalog.items[item_id])
+    save_catalog(merged, args.output)
+    print(f"{args.output}: {len(merged)} items from {len(args.files)} file(s)")
+    return 0
+
+
+def merge_three_way(args):
+    """Merge ours and theirs against a common base"""
+    if len(args.files) != 2:
+        raise SystemExit("error: --base needs exactly two files (ours and theirs)")
+    (_, base), (_, ours), (_, theirs) = load_catalogs([args.base] + args.files)
+    result = merge_catalogs(base.items, ours.items, theirs.items, args.conflicts)
+    merged = Catalog(path=args.output, layout=ours.writer.layout)
+    for item_id, item in result.items.items():
+        merged.add(item_id, item)
+    save_catalog(merged, args.output)
+    print(f"{args.output}: {len(merged)} items, {len(result.conflicts)} conflict(s)")
+    for conflict in result.conflicts:
+        print(f"  {conflict.describe()}")
+    return 1 if result.conflicts and args.conflicts == RESOLVE_MARKERS else 0
+
+
+def diff_value(value):
+    return "(none)" if value is MISSING else json.dumps(value, ensure_ascii=False, default=json_default)
+
+
+def cmd_diff(args):
+    (_, old), (_, new) = load_catalogs([args.old, args.new])
+    diff = diff_catalogs(old.items, new.items)
+    if args.json:
+        json.dump(diff.report(), sys.stdout, indent=2, ensure_ascii=False, default=json_default)
+        print()
+    else:
+        for change in diff.changes:
+            if change.kind == ADDED:
+                print(f"+ {change.item_id}")
+            elif change.kind == REMOVED:
+                print(f"- {change.item_id}")
+            else:
+                for key, old_value, new_value in change.fields:
+                    print(f"~ {change.item_id}.{key}: {diff_value(old_value)} -> {diff_value(new_value)}")
+        counts = diff.counts()
+        print(f"{counts[ADDED]} added, {counts[REMOVED]} removed, {counts[CHANGED]} changed "
+              f"({diff.field_count()} field(s))", file=sys.stderr)
+    return 1 if diff.changes else 0
+
+
+def cmd_export(args):
+    (path, catalog), = load_catalogs([args.file])
+    try:
+        fmt = export_catalog(args.output, catalog.items, catalog.item_ids, catalog.columns[1:],
+                             catalog.writer.layout, args.format)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"error: cannot write {args.output}: {e}")
+    print(f"{args.output}: exported {len(catalog)} items as {fmt.name}")
+    return 0
+
+
+def cmd_xref(args):
+    xref = CrossReference(args.folder)
+    xref.refresh()
+    report = xref.report()
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(f"Unused configs ({len(report['unused_configs'])}):")
+        for config_id in report["unused_configs"]:
+            print(f"  {config_id}")
+        print(f"Inventory records with no config ({len(report['missing_configs'])}):")
+        for entry in report["missing_configs"]:
+            print(f"  {entry['file']}: {entry['id']} -> {entry['baseItemId']}")
+        print(f"Missing icons ({len(report['missing_icons'])}):")
+        for entry in report["missing_icons"]:
+            print(f"  {entry['file']}: {entry['id']} -> {entry['icon']}")
+        print(f"Orphaned icons ({len(report['orphaned_icons'])}):")
+        for name in report["orphaned_icons"]:
+            print(f"  {name}")
+        for entry in report["errors"]:
+            print(f"error: {entry['file']}: {entry['error']}", file=sys.stderr)
+    dangling = report["missing_configs"] or report["missing_icons"] or report["errors"]
+    return 1 if args.check and dangling else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="catalog_cli.py", description="Query and edit itemConfigs catalogs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query = commands.add_parser("query", help="list items matching a search")
+    query.add_argument("files", nargs="+", metavar="FILE")
+    query.add_argument("-w", "--where", default="", help="search query, e.g. 'category:armor maxStackSize>5'")
+    query.add_argument("--column", help="limit plain search terms to this column")
+    query.add_argument("-c", "--columns", help="comma separated columns to print")
+    query.add_argument("-f", "--format", choices=("table", "json", "ids", "count"), default="table")
+    query.set_defaults(func=cmd_query)
+
+    set_cmd = commands.add_parser("set", help="set fields on matching items and save in place")
+    set_cmd.add_argument("files", nargs="+", metavar="FILE")
+    set_cmd.add_argument("-s", "--set", action="append", required=True, metavar="FIELD=VALUE")
+    set_cmd.add_argument("-w", "--where", default="", help="only change items matching this query")
+    set_cmd.add_argument("-n", "--dry-run", action="store_true", help="report changes without saving")
+    set_cmd.set_defaults(func=cmd_set)
+
+    validate = commands.add_parser("validate", help="check catalogs for problems, in parallel")
+    validate.add_argument("files", nargs="+", metavar="FILE")
+    validate.add_argument("--json", action="store_true", help="print a JSON report")
+    validate.add_argument("--report", metavar="FILE", help="also write the JSON report to FILE")
+    validate.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per CPU)")
+    validate.add_argument("--cache", default=CACHE_FILE, metavar="FILE",
+                          help=f"results of unchanged files are kept here (default: {CACHE_FILE})")
+    validate.add_argument("--no-cache", action="store_true", help="check every file again")
+    validate.set_defaults(func=cmd_validate)
+
+    merge = commands.add_parser("merge", help="combine catalogs; later files win unless --base is given")
+    merge.add_argument("files", nargs="+", metavar="FILE")
+    merge.add_argument("-o", "--output", required=True)
+    merge.add_argument("--base", metavar="FILE",
+                       help="three-way merge of two files (ours, theirs) against this common base")
+    merge.add_argument("--conflicts", choices=("markers", "ours", "theirs"), default="markers",
+                       help="how to settle fields both sides changed (default: write conflict markers)")
+    merge.set_defaults(func=cmd_merge)
+
+    diff = commands.add_parser("diff", help="list items added, removed or changed between two catalogs")
+    diff.add_argument("old", metavar="OLD")
+    diff.add_argument("new", metavar="NEW")
+    diff.add_argument("--json", action="store_true", help="print a JSON report")
+    diff.set_defaults(func=cmd_diff)
+
+    export = commands.add_parser("export", help="convert a catalog to " + ", ".join(FORMATS))
+    export.add_argument("file", metavar="FILE")
+    export.add_argument("-o", "--output", required=True)
+    export.add_argument("-f", "--format", choices=tuple(FORMATS),
+                        help="output format (default: from the output file's extension)")
+    export.set_defaults(func=cmd_export)
+
+    xref = commands.add_parser("xref", help="cross-check configs, inventories and icons in a folder")
+    xref.add_argument("folder", nargs="?", default=".", metavar="DIR")
+    xref.add_argument("--json", action="store_true", help="print a JSON report")
+    xref.add_argument("--check", action="store_true",
+                      help="exit with status 1 if references or icons are missing")
+    xref.set_defaults(func=cmd_xref)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except SystemExit as e:
+        if isinstance(e.code, str):
+            print(e.code, file=sys.stderr)
+            return 2
+        raise
+    except BrokenPipeError:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
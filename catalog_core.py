@@ -0,0 +1,1186 @@
+"""Qt-free core for reading, editing and writing item config catalogs.
+
+Everything here works without PyQt, so the same loading and saving logic
+backs the editor, the command line tool (catalog_cli.py) and scripts.
+"""
+import ast
+import codecs
+import json
+import math
+import operator
+import os
+import re
+import sys
+import tempfile
+from collections.abc import Mapping, MutableMapping
+
+from catalog_metrics import METRICS
+from catalog_schema import DECLARED_COLUMNS, KIND_INT, ColumnStore, ItemRow, column_schema, detach
+from catalog_search import SearchIndex, parse_query
+
+# Columns every item config is expected to have, in display order
+STANDARD_COLUMNS = ["displayName", "category", "rarity", "maxDurability", "icon", "maxStackSize"]
+
+# Fields stored as integers (see catalog_schema for every declared column)
+NUMERIC_FIELDS = tuple(name for name, schema in DECLARED_COLUMNS.items() if schema.kind == KIND_INT)
+
+# Indentation of item entries inside {"itemConfigs": {...}} with indent=4
+ITEM_INDENT = " " * 8
+
+# Indentation of records inside a top-level array with indent=4
+RECORD_INDENT = " " * 4
+
+
+# Catalog file layouts: {"itemConfigs": {...}}, a direct {id: item} object
+# (saved back under "itemConfigs", as the editor always has) or a top-level
+# array of inventory records such as itemIds.json
+LAYOUT_ITEM_CONFIGS = "itemConfigs"
+LAYOUT_OBJECT = "object"
+LAYOUT_ARRAY = "array"
+
+# Field used as the row ID for array records
+RECORD_ID_FIELD = "itemId"
+
+# Strings up to this length are shared between records (keys, tags, enums)
+SHARED_STRING_MAX = 32
+
+# Nested values up to this encoded size are shared between identical records
+SHARED_VALUE_MAX = 256
+
+
+def parse_catalog(raw_data):
+    """Return (items, layout) from a parsed catalog document.
+
+    Accepts {"itemConfigs": {...}}, a direct {id: item} object or a
+    top-level array of records keyed by their itemId.
+    """
+    if isinstance(raw_data, dict) and "itemConfigs" in raw_data:
+        return raw_data["itemConfigs"], LAYOUT_ITEM_CONFIGS
+    if isinstance(raw_data, dict):
+        return raw_data, LAYOUT_OBJECT
+    if isinstance(raw_data, list):
+        keys = RecordKeys()
+        return {keys.key_for(index, record): record for index, record in enumerate(raw_data)}, LAYOUT_ARRAY
+    raise ValueError("Invalid JSON structure. Expected object with 'itemConfigs' key, direct object or array.")
+
+
+def read_catalog(file_path, duplicates=None):
+    """Load a catalog file and return (items, layout).
+
+    Object catalogs go through json.load and are kept in a typed
+    ColumnStore; arrays of inventory records are streamed and stored as
+    CompactRecords. JSON keeps only the last of two equal keys: given a
+    duplicates list, object catalogs are streamed too and every item ID
+    seen more than once is appended to it.
+    """
+    with METRICS.timed("parse"):
+        is_array = peek_json_start(file_path) == "["
+        if is_array or duplicates is not None:
+            stream = CatalogStream(file_path)
+            pairs = stream if duplicates is None else note_duplicates(stream, duplicates)
+            if is_array:
+                return dict(pairs), stream.layout
+            items = ColumnStore()
+            items.extend(pairs)
+            return items, stream.layout
+        with open(file_path, "r", encoding="utf-8") as f:
+            items, layout = parse_catalog(json.load(f))
+        return ColumnStore(items), layout
+
+
+def note_duplicates(pairs, duplicates):
+    """Pass (item_id, item) pairs through, appending repeated IDs to duplicates"""
+    seen = set()
+    for item_id, item in pairs:
+        if item_id in seen:
+            duplicates.append(item_id)
+        seen.add(item_id)
+        yield item_id, item
+
+
+def read_catalog_source(file_path):
+    """read_catalog that also keeps the file's own text: (items, layout, source).
+
+    source is a CatalogSource (None for direct objects and empty catalogs);
+    seeding a CatalogWriter with it saves untouched items exactly as they
+    are in the file. Object catalogs are streamed too, which is slower than
+    json.load.
+    """
+    with METRICS.timed("parse"):
+        stream = CatalogStream(file_path, keep_source=True)
+        if peek_json_start(file_path) == "[":
+            items = dict(stream)
+        else:
+            items = ColumnStore()
+            items.extend(stream)
+        return items, stream.layout, stream.source
+
+
+def catalog_columns(items, layout=LAYOUT_ITEM_CONFIGS):
+    """Data columns for a set of items: the standard ones, then any extra
+    keys in the order they are first seen. Array records only get the keys
+    they actually have."""
+    columns = [] if layout == LAYOUT_ARRAY else list(STANDARD_COLUMNS)
+    known = getattr(items, "columns", None)
+    if known is not None:
+        # ColumnStores (and paged databases) know their keys without visiting items
+        return extend_columns(columns, [known])
+    return extend_columns(columns, items.values())
+
+
+def extend_columns(columns, items):
+    """Append keys of items missing from columns; returns columns"""
+    seen = set(columns)
+    for item in items:
+        if isinstance(item, Mapping):
+            for key in item:
+                if key not in seen:
+                    seen.add(key)
+                    columns.append(key)
+    return columns
+
+
+def cell_text(item, key):
+    """Display text of one field of an item ("" when missing).
+
+    Nested lists and objects are shown as JSON so they can be edited back.
+    """
+    # Exact type checks first: this runs for every cell the index reads
+    if type(item) is not dict and not isinstance(item, Mapping):
+        return ""
+    return value_text(item.get(key, ""))
+
+
+def value_text(value):
+    """Display text of one stored value"""
+    value_type = type(value)
+    if value_type is str:
+        return value
+    if value_type is list or value_type is dict:
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def json_default(value):
+    """json.dumps hook for CompactRecords, ItemRows and other mappings"""
+    if type(value) is ItemRow:
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def peek_json_start(file_path):
+    """First non-whitespace character of a JSON file ("" if empty)"""
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return ""
+            stripped = chunk.lstrip(b" \t\r\n\xef\xbb\xbf")
+            if stripped:
+                return chr(stripped[0])
+
+
+class RecordShape:
+    """Key layout shared by every CompactRecord with the same keys in the same order"""
+
+    __slots__ = ("keys", "positions", "transitions", "__weakref__")
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.positions = {key: index for index, key in enumerate(keys)}
+        self.transitions = {}
+
+    def with_key(self, key):
+        shape = self.transitions.get(key)
+        if shape is None:
+            shape = RecordShape(self.keys + (sys.intern(key),))
+            self.transitions[key] = shape
+        return shape
+
+
+ROOT_SHAPE = RecordShape(())
+
+# keys tuple -> RecordShape, so records with a known layout skip the transition walk
+SHAPES = {}
+
+
+def shape_for(keys):
+    keys = tuple(keys)
+    shape = SHAPES.get(keys)
+    if shape is None:
+        shape = ROOT_SHAPE
+        for key in keys:
+            shape = shape.with_key(key)
+        SHAPES[keys] = shape
+    return shape
+
+
+class CompactRecord(MutableMapping):
+    """A record stored as a shared RecordShape plus a list of values.
+
+    Behaves like a dict but costs one small object and one list per record;
+    the keys live once in the shape. Values may be shared with other
+    records, so nested lists/dicts must be replaced rather than mutated.
+    """
+
+    __slots__ = ("shape", "values")
+
+    def __init__(self, shape, values):
+        self.shape = shape
+        self.values = values
+
+    def __getitem__(self, key):
+        return self.values[self.shape.positions[key]]
+
+    def get(self, key, default=None):
+        position = self.shape.positions.get(key)
+        return default if position is None else self.values[position]
+
+    def __setitem__(self, key, value):
+        position = self.shape.positions.get(key)
+        if position is None:
+            self.shape = self.shape.with_key(key)
+            self.values.append(value)
+        else:
+            self.values[position] = value
+
+    def __delitem__(self, key):
+        position = self.shape.positions[key]
+        keys = self.shape.keys
+        self.shape = shape_for(keys[:position] + keys[position + 1:])
+        del self.values[position]
+
+    def __contains__(self, key):
+        return key in self.shape.positions
+
+    def __iter__(self):
+        return iter(self.shape.keys)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return f"CompactRecord({dict(self)!r})"
+
+
+class RecordCompactor:
+    """Turns decoded records into CompactRecords, sharing repeated data.
+
+    Short strings (tags, base IDs, enum values) are interned and small
+    nested values that occur over and over (modData, origin, empty lists)
+    are stored once, so memory grows with the number of distinct values
+    rather than the number of records.
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.values = {}
+        self.canonical = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode
+
+    def compact(self, record):
+        if not isinstance(record, dict):
+            return record
+        share = self.share
+        return CompactRecord(shape_for(record), [share(value) for value in record.values()])
+
+    def share(self, value):
+        value_type = type(value)
+        if value_type is str:
+            if len(value) <= SHARED_STRING_MAX:
+                return self.strings.setdefault(value, value)
+            return value
+        if value_type is list or value_type is dict:
+            if not value:
+                key = "[]" if value_type is list else "{}"
+            else:
+                key = self.canonical(value)
+            if len(key) > SHARED_VALUE_MAX:
+                return value
+            shared = self.values.get(key)
+            if shared is None:
+                if isinstance(value, list):
+                    shared = [self.share(element) for element in value]
+                else:
+                    shared = {sys.intern(k): self.share(v) for k, v in value.items()}
+                self.values[key] = shared
+            return shared
+        return value
+
+
+class RecordKeys:
+    """Assigns unique row IDs to array records (their itemId when possible)"""
+
+    def __init__(self):
+        self.used = set()
+
+    def key_for(self, index, record):
+        key = record.get(RECORD_ID_FIELD) if isinstance(record, Mapping) else None
+        if not isinstance(key, str) or not key or key in self.used:
+            key = f"{key or 'record'}#{index}"
+        self.used.add(key)
+        return key
+
+
+class CatalogSource:
+    """A catalog file's own text, cut around its items.
+
+    fragments maps each item ID to the item's text exactly as it is in the
+    file ('"id": {...}' inside itemConfigs, the bare record in an array).
+    head is the text before the first item, separator the text between the
+    first two and tail everything after the last one.
+    """
+
+    __slots__ = ("layout", "head", "separator", "tail", "fragments")
+
+    def __init__(self, layout, head, separator, tail, fragments):
+        self.layout = layout
+        self.head = head
+        self.separator = separator
+        self.tail = tail
+        self.fragments = fragments
+
+
+class CatalogStream:
+    """Incremental reader that yields (item_id, item) pairs from a catalog file.
+
+    Handles top-level arrays of records, {"itemConfigs": {...}} and direct
+    objects without loading the whole document: the file is read in chunks
+    and each item is decoded on its own with JSONDecoder.raw_decode. Array
+    records are stored as CompactRecords. bytes_read / total_bytes give
+    progress; layout is known once the first token has been read.
+
+    A top-level object is treated as an itemConfigs wrapper when its first
+    key is "itemConfigs". With keep_source, the text of every item is kept
+    as the offsets raw_decode reports, and source is a CatalogSource once
+    the whole file has been read (None for direct objects).
+    """
+
+    def __init__(self, file_path, chunk_size=1 << 16, keep_source=False):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.keep_source = keep_source
+        self.total_bytes = os.path.getsize(file_path)
+        self.bytes_read = 0
+        self.layout = None
+        self.source = None
+        self.compactor = RecordCompactor()
+        self.decoder = json.JSONDecoder()
+
+    def __iter__(self):
+        with open(self.file_path, "rb") as f:
+            self.file = f
+            self.text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            self.buffer = ""
+            self.pos = 0
+            self.eof = False
+            self.recording = self.keep_source
+            self.kept = 0  # Start of the text not yet assigned to an item
+            self.head = self.separator = None
+            self.fragments = {}
+            yield from self.iter_document()
+            if self.recording and self.head is not None:
+                while self.fill():
+                    pass
+                self.source = CatalogSource(self.layout, self.head, self.separator,
+                                            self.buffer[self.kept:], self.fragments)
+            self.fragments = None
+
+    def fill(self, size=None):
+        """Read another chunk into the buffer; returns False at end of file"""
+        if self.eof:
+            return False
+        data = self.file.read(size or self.chunk_size)
+        self.bytes_read += len(data)
+        if not data:
+            self.eof = True
+            self.buffer += self.text_decoder.decode(b"", final=True)
+            return False
+        done = min(self.pos, self.kept) if self.recording else self.pos
+        if done > len(self.buffer) // 2:
+            self.buffer = self.buffer[done:]
+            self.pos -= done
+            if self.recording:
+                self.kept -= done
+        self.buffer += self.text_decoder.decode(data)
+        return True
+
+    def begin_item(self):
+        """Note where the next item's text starts (with keep_source)"""
+        if self.recording:
+            self.next_token()
+            gap = self.buffer[self.kept:self.pos]
+            if self.head is None:
+                self.head = gap
+            elif self.separator is None:
+                self.separator = gap
+            self.kept = self.pos
+
+    def end_item(self, item_id):
+        if self.recording:
+            self.fragments[item_id] = self.buffer[self.kept:self.pos]
+            self.kept = self.pos
+
+    def next_token(self):
+        """Skip whitespace and return the next character without consuming it"""
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, chars):
+        token = self.next_token()
+        if token not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, found {token!r}")
+        self.pos += 1
+        return token
+
+    def decode_value(self):
+        """Decode one complete JSON value, reading more input as needed"""
+        self.next_token()
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow reads so one large value is not re-parsed once per chunk
+            self.fill(read_size)
+            read_size *= 2
+
+    def iter_document(self):
+        start = self.expect("[{")
+        if start == "[":
+            self.layout = LAYOUT_ARRAY
+            keys = RecordKeys()
+            index = 0
+            if self.next_token() == "]":
+                self.pos += 1
+                return
+            while True:
+                self.begin_item()
+                record = self.compactor.compact(self.decode_value())
+                item_id = keys.key_for(index, record)
+                self.end_item(item_id)
+                yield item_id, record
+                index += 1
+                if self.expect(",]") == "]":
+                    return
+
+        if self.next_token() == "}":
+            self.pos += 1
+            self.layout = LAYOUT_OBJECT
+            return
+        key = self.decode_value()
+        self.expect(":")
+        if key == "itemConfigs" and self.next_token() == "{":
+            self.layout = LAYOUT_ITEM_CONFIGS
+            self.pos += 1
+            yield from self.iter_members()
+            return
+        self.layout = LAYOUT_OBJECT
+        self.recording = False  # Saved under "itemConfigs", so the text cannot be kept
+        yield key, self.decode_value()
+        if self.expect(",}") == ",":
+            yield from self.iter_members()
+
+    def iter_members(self):
+        """Yield key/value pairs of an object whose opening brace was consumed"""
+        if self.next_token() == "}":
+            self.pos += 1
+            return
+        while True:
+            self.begin_item()
+            key = self.decode_value()
+            self.expect(":")
+            value = self.decode_value()
+            self.end_item(key)
+            yield key, value
+            if self.expect(",}") == "}":
+                return
+
+
+def coerce_value(key, text, current=None, schema=None):
+    """Convert edited cell text to the value stored for a field.
+
+    schema is the column's ColumnSchema (the declared one by default).
+    Raises ValueError when the text does not fit it, e.g. a word in an
+    integer column or a nested value that is no longer valid JSON.
+    """
+    return (schema or column_schema(key)).parse(text, current)
+
+
+# Operators and functions allowed in bulk scale expressions
+EXPRESSION_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: operator.pow, ast.USub: operator.neg, ast.UAdd: operator.pos,
+}
+EXPRESSION_FUNCTIONS = {
+    "round": round, "min": min, "max": max, "abs": abs, "int": int, "float": float,
+    "ceil": math.ceil, "floor": math.floor,
+}
+
+
+def compile_expression(text):
+    """Compile a numeric expression of x (the current value) into a function.
+
+    Only numbers, x, arithmetic and a few functions (round, min, max, abs,
+    int, float, ceil, floor) are allowed, e.g. "x * 1.5" or
+    "max(1, round(x / 2))". Raises ValueError for anything else.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}") from None
+
+    def check(node):
+        if isinstance(node, ast.Expression):
+            check(node.body)
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+                raise ValueError(f"Only numbers are allowed, not {node.value!r}")
+        elif isinstance(node, ast.Name):
+            if node.id != "x":
+                raise ValueError(f"Unknown name {node.id!r} (use x for the current value)")
+        elif isinstance(node, ast.BinOp) and type(node.op) in EXPRESSION_OPERATORS:
+            check(node.left)
+            check(node.right)
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in EXPRESSION_OPERATORS:
+            check(node.operand)
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+              and node.func.id in EXPRESSION_FUNCTIONS and not node.keywords):
+            for arg in node.args:
+                check(arg)
+        else:
+            raise ValueError(f"Not allowed in an expression: {ast.unparse(node)}")
+
+    check(tree)
+
+    def evaluate(node, x):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            return x
+        if isinstance(node, ast.BinOp):
+            left, right = evaluate(node.left, x), evaluate(node.right, x)
+            if isinstance(node.op, ast.Pow) and abs(right) > 64:
+                raise ValueError("Exponent too large")
+            return EXPRESSION_OPERATORS[type(node.op)](left, right)
+        if isinstance(node, ast.UnaryOp):
+            return EXPRESSION_OPERATORS[type(node.op)](evaluate(node.operand, x))
+        return EXPRESSION_FUNCTIONS[node.func.id](*(evaluate(arg, x) for arg in node.args))
+
+    body = tree.body
+    return lambda x: evaluate(body, x)
+
+
+def scale_records(item_ids, item_data, key, function):
+    """Set records applying function to the numeric key of each item.
+
+    Integers stay integers (rounded); missing and non-numeric values are
+    skipped. Returns (records, skipped count).
+    """
+    records, skipped = [], 0
+    for item_id in item_ids:
+        item = item_data.get(item_id)
+        value = item.get(key) if isinstance(item, Mapping) else None
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            skipped += 1
+            continue
+        try:
+            new_value = function(value)
+        except (ArithmeticError, ValueError, TypeError):
+            skipped += 1
+            continue
+        if isinstance(new_value, float) and not math.isfinite(new_value):
+            skipped += 1
+            continue
+        if isinstance(value, int):
+            new_value = int(round(new_value))
+        if new_value != value or type(new_value) is not type(value):
+            records.append({"op": "set", "id": item_id, "key": key, "value": new_value})
+    return records, skipped
+
+
+def set_records(item_ids, item_data, key, value):
+    """Set records giving key the same value on every item, skipping unchanged ones"""
+    records = []
+    for item_id in item_ids:
+        item = item_data.get(item_id)
+        if (isinstance(item, Mapping) and key in item and item[key] == value
+                and type(item[key]) is type(value)):
+            continue
+        records.append({"op": "set", "id": item_id, "key": key, "value": value})
+    return records
+
+
+def id_pattern(pattern):
+    """Regex for an ID pattern where {name} placeholders match any text"""
+    parts = re.split(r"\{(\w+)\}", pattern)
+    regex = ""
+    for index, part in enumerate(parts):
+        if index % 2 == 0:
+            regex += re.escape(part)
+        elif f"(?P<{part}>" in regex:
+            regex += f"(?P={part})"
+        else:
+            regex += f"(?P<{part}>.+?)"
+    return re.compile(regex + r"\Z", re.DOTALL)
+
+
+def duplicate_records(rows, item_ids, item_data, match, replace):
+    """Insert record copying the items at rows under new IDs.
+
+    IDs are matched against the match pattern and renamed with replace,
+    e.g. "Helmet_0{n}" -> "Helmet_Tactical_0{n}" ("{id}" is the whole ID).
+    Copies go right after their originals. Raises ValueError when an ID
+    does not match or a new ID is already taken.
+    """
+    pattern = id_pattern(match)
+    taken = set(item_data)
+    entries = []
+    for offset, row in enumerate(sorted(rows)):
+        item_id = item_ids[row]
+        found = pattern.match(item_id)
+        if found is None:
+            raise ValueError(f"{item_id} does not match {match}")
+        try:
+            new_id = replace.format(**found.groupdict())
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Invalid new ID pattern {replace!r}: {e}") from None
+        if not new_id or new_id in taken:
+            raise ValueError(f"ID {new_id!r} already exists")
+        taken.add(new_id)
+        item = item_data.get(item_id)
+        # Deep copy through JSON so copies share nothing with the original
+        copy = json.loads(json.dumps(item if item is not None else {}, default=json_default))
+        entries.append([row + offset + 1, new_id, copy])
+    return {"op": "insert", "rows": entries}
+
+
+def file_signature(path):
+    """(size, mtime_ns) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def atomic_write_text(path, text):
+    """Write text to path via a temp file, fsync and rename.
+
+    Readers see either the old file or the complete new one, never a
+    partially written catalog.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            # mkstemp creates 0600 files; keep the permissions of the file we replace
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Make the rename itself durable (not supported on Windows)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except (OSError, AttributeError):
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+class CatalogWriter:
+    """Incremental serializer for {"itemConfigs": {...}} documents.
+
+    Each item's serialized text is cached as a fragment. Edits mark items
+    (and the keys that changed) dirty; a save re-serializes only the dirty
+    items and joins the cached fragments, producing the same text as
+    json.dump(..., indent=4, ensure_ascii=False) on the whole document.
+
+    seed() takes the fragments from the file as it was read instead (see
+    CatalogSource), so untouched items are saved byte for byte as they
+    were and edited ones follow the file's own indentation.
+
+    pad_columns writes dirty items with every column, as the editor does;
+    without it items keep only the keys they hold.
+    """
+
+    def __init__(self, layout=LAYOUT_ITEM_CONFIGS, pad_columns=True):
+        self.layout = layout
+        self.pad_columns = pad_columns
+        self.reset()
+
+    def reset(self, layout=None):
+        """Forget cached output, e.g. after loading another file"""
+        if layout is not None:
+            self.layout = layout
+        self.fragments = {}   # item_id -> '"id": {...}' as written between separators
+        self.dirty = {}       # item_id -> set of changed keys (empty = whole item)
+        self.removed = set()
+        self.style = None     # (head, separator, tail, newline, item indent, indent) of a seeded file
+
+    def seed(self, source, item_ids=None):
+        """Reuse a file's text (a CatalogSource) for items not edited since it was read.
+
+        item_ids limits the items taken (default: all of them). A source of
+        another layout, or None, is ignored.
+        """
+        if source is None or source.layout != self.layout:
+            return
+        self.style = source_style(source)
+        fragments, dirty = source.fragments, self.dirty
+        for item_id in fragments if item_ids is None else item_ids:
+            if item_id in fragments and item_id not in dirty:
+                self.fragments[item_id] = fragments[item_id]
+
+    def text_style(self):
+        """(head, separator, tail, newline, item indent, indent) of the document"""
+        if self.style is not None:
+            return self.style
+        if self.layout == LAYOUT_ARRAY:
+            return "[\n" + RECORD_INDENT, ",\n" + RECORD_INDENT, "\n]", "\n", RECORD_INDENT, 4
+        return ('{\n    "itemConfigs": {\n' + ITEM_INDENT, ",\n" + ITEM_INDENT, "\n    }\n}",
+                "\n", ITEM_INDENT, 4)
+
+    def has_changes(self):
+        return bool(self.dirty or self.removed)
+
+    def change_count(self):
+        """Number of items that will be rewritten or dropped on the next save"""
+        return len(self.dirty) + len(self.removed)
+
+    def mark_cell(self, item_id, key):
+        keys = self.dirty.setdefault(item_id, set())
+        keys.add(key)
+
+    def mark_item(self, item_id):
+        self.dirty.setdefault(item_id, set())
+        self.removed.discard(item_id)
+
+    def mark_removed(self, item_id):
+        self.dirty.pop(item_id, None)
+        self.removed.add(item_id)
+        self.fragments.pop(item_id, None)
+
+    def mark_renamed(self, old_id, new_id):
+        self.mark_removed(old_id)
+        self.mark_item(new_id)
+
+    def mark_all(self, item_ids):
+        """Every item changes, e.g. when a column is added to all of them"""
+        for item_id in item_ids:
+            self.mark_item(item_id)
+
+    def mark_clean(self, item_ids):
+        """Items now match the file on disk (e.g. after reloading them from it);
+        their cached text is dropped since the file's version replaced it"""
+        for item_id in item_ids:
+            self.dirty.pop(item_id, None)
+            self.removed.discard(item_id)
+            self.fragments.pop(item_id, None)
+
+    def changed_ids(self):
+        """IDs edited, added or removed since the last save"""
+        return set(self.dirty) | self.removed
+
+    def render(self, item_ids, item_data, columns):
+        """Return the document text, re-serializing only dirty items.
+
+        With pad_columns, dirty items are written with every column (missing
+        keys as ""), the shape the editor has always saved; untouched items
+        keep their cached text. Array records keep their own keys.
+        """
+        fragments = self.fragments
+        dirty = self.dirty
+        for item_id in item_ids:
+            if item_id in dirty or item_id not in fragments:
+                item = item_data.get(item_id)
+                if type(item) is ItemRow:
+                    item = item.to_dict()
+                elif not isinstance(item, Mapping):
+                    item = {}
+                if item_id in dirty and self.pad_columns and self.layout != LAYOUT_ARRAY:
+                    item = {key: item.get(key, "") for key in columns}
+                fragments[item_id] = self.serialize_item(item_id, item)
+
+        if not item_ids:
+            return "[]" if self.layout == LAYOUT_ARRAY else '{\n    "itemConfigs": {}\n}'
+        # Array records are written without their row IDs
+        head, separator, tail = self.text_style()[:3]
+        return head + separator.join([fragments[item_id] for item_id in item_ids]) + tail
+
+    def serialize_item(self, item_id, item):
+        _, _, _, newline, item_indent, indent = self.text_style()
+        text = json.dumps(item, indent=indent, ensure_ascii=False, default=json_default)
+        if indent is not None:
+            text = text.replace("\n", newline + item_indent)
+        if self.layout == LAYOUT_ARRAY:
+            return text
+        return json.dumps(item_id, ensure_ascii=False) + ": " + text
+
+    def save(self, path, item_ids, item_data, columns):
+        """Write the catalog atomically and return how many items were rewritten"""
+        rewritten = sum(1 for item_id in item_ids if item_id in self.dirty or item_id not in self.fragments)
+        text = self.render(item_ids, item_data, columns)
+        atomic_write_text(path, text)
+        self.dirty = {}
+        self.removed = set()
+        return rewritten
+
+
+def source_style(source):
+    """CatalogWriter.text_style() that matches a file (see CatalogSource).
+
+    The item indentation is what precedes the first item on its line and
+    the indent step is how much deeper the first item's second line goes;
+    an item on one line means items are written on one line.
+    """
+    head = source.head
+    newline = "\r\n" if "\r\n" in head else "\n"
+    line_start = head.rfind("\n") + 1
+    item_indent = head[line_start:]
+    if not line_start or item_indent.strip(" \t"):
+        item_indent = ""  # The first item does not start a line
+    separator = source.separator
+    if separator is None:
+        separator = "," + newline + item_indent if line_start else ", "
+    indent = None
+    first = next(iter(source.fragments.values()), "")
+    lines = first.split("\n", 2)
+    if len(lines) > 1:
+        second = lines[1]
+        spaces = second[:len(second) - len(second.lstrip(" \t"))]
+        if spaces.startswith(item_indent) and len(spaces) > len(item_indent):
+            indent = spaces[len(item_indent):]
+    return head, separator, source.tail, newline, item_indent, indent
+
+
+def item_digest(item):
+    """Order-independent fingerprint of an item's content"""
+    return hash(json.dumps(item, sort_keys=True, ensure_ascii=False, default=json_default))
+
+
+def catalog_digests(items):
+    """item_id -> item_digest for a whole catalog"""
+    return {item_id: item_digest(item) for item_id, item in items.items()}
+
+
+def plan_reload(item_ids, item_data, new_items, old_digests, new_digests, changed_locally):
+    """Work out how to bring the loaded catalog up to date with the file on disk.
+
+    item_ids/item_data are the loaded rows (including unsaved edits),
+    new_items/new_digests the file as just read and old_digests the file as
+    it was last read or saved (None if unknown). Items changed on disk that
+    also have unsaved edits (changed_locally) are conflicts and are left
+    alone. Returns (records, reloaded_ids, conflicts): edit records that
+    apply the other changes in order, the IDs they touch and the
+    conflicting IDs.
+    """
+    def changed_on_disk(item_id):
+        if old_digests is None:
+            return True
+        return old_digests.get(item_id) != new_digests.get(item_id)
+
+    reloaded, conflicts = [], []
+    removed, modified = [], []
+    for item_id in item_ids:
+        if item_id in new_items:
+            local, disk = item_data.get(item_id), new_items[item_id]
+            if not changed_on_disk(item_id) or local == disk:
+                continue
+            if item_id in changed_locally:
+                conflicts.append(item_id)
+            else:
+                modified.append(item_id)
+        elif old_digests is None or item_id in old_digests:
+            # Gone from the file (items only added here were never on disk)
+            if item_id in changed_locally:
+                conflicts.append(item_id)
+            else:
+                removed.append(item_id)
+    added = []
+    for item_id in new_items:
+        if item_id not in item_data and changed_on_disk(item_id):
+            if item_id in changed_locally:
+                conflicts.append(item_id)  # Deleted or renamed here, changed on disk
+            else:
+                added.append(item_id)
+
+    records = []
+    if removed:
+        records.append({"op": "remove", "ids": removed})
+        reloaded += removed
+
+    if added:
+        # New items go after the item that precedes them in the file
+        removed_set, added_set = set(removed), set(added)
+        follows = {}
+        previous = None
+        for item_id in new_items:
+            if item_id in item_data and item_id not in removed_set:
+                previous = item_id
+            elif item_id in added_set:
+                follows.setdefault(previous, []).append(item_id)
+        order = follows.get(None, [])
+        for item_id in item_ids:
+            if item_id not in removed_set:
+                order.append(item_id)
+                order += follows.get(item_id, [])
+        rows = [[position, item_id, detach(new_items[item_id])]
+                for position, item_id in enumerate(order) if item_id in added_set]
+        records.append({"op": "insert", "rows": rows})
+        reloaded += added
+
+    for item_id in modified:
+        local, disk = item_data.get(item_id), new_items[item_id]
+        local = local if isinstance(local, Mapping) else {}
+        disk = disk if isinstance(disk, Mapping) else {}
+        for key, value in disk.items():
+            if key not in local or local[key] != value or type(local[key]) is not type(value):
+                records.append({"op": "set", "id": item_id, "key": key, "value": value})
+        for key in local:
+            if key not in disk:
+                records.append({"op": "unset", "id": item_id, "key": key})
+        reloaded.append(item_id)
+    return records, reloaded, conflicts
+
+
+def encode_records(records):
+    """Compact one-line JSON for a list of edit records"""
+    return json.dumps(records, ensure_ascii=False, separators=(",", ":"), default=json_default)
+
+
+def read_journal_file(path):
+    """(header, batches) of one journal file, or None if it holds no edits"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    if not lines:
+        return None
+    try:
+        header = json.loads(lines[0])
+    except ValueError:
+        return None
+    batches = []
+    for line in lines[1:]:
+        try:
+            batches.append(json.loads(line))
+        except ValueError:
+            break  # Torn last line from a crash mid-write
+    return (header, batches) if batches else None
+
+
+class EditJournal:
+    """Append-only log of the edit records applied since the last save.
+
+    The journal sits next to the catalog as .<name>.journal. Its first line
+    records the size and mtime of the catalog it applies to; every later
+    line is a list of records in the order they were applied (undo appends
+    the inverse records), so replaying the lines in order against the last
+    saved file restores the unsaved state after a crash.
+
+    Edits found when a file is opened are set aside in .<name>.journal.pending
+    until the user has answered the recovery prompt, so starting the new
+    journal (or crashing before the prompt) cannot lose them.
+    """
+
+    VERSION = 1
+
+    def __init__(self, catalog_path):
+        directory, name = os.path.split(os.path.abspath(catalog_path))
+        self.catalog_path = catalog_path
+        self.path = os.path.join(directory, f".{name}.journal")
+        self.pending_path = self.path + ".pending"
+        self.file = None
+        self.base_stat = None
+
+    def read_pending(self):
+        """Return (header, batches) left by previous sessions, or None.
+
+        Edits set aside for a prompt that was never answered come first,
+        then those journaled after them.
+        """
+        header, batches = None, []
+        for path in (self.pending_path, self.path):
+            entry = read_journal_file(path)
+            if entry is not None:
+                header = header or entry[0]
+                batches += entry[1]
+        return (header, batches) if batches else None
+
+    def set_aside(self, pending):
+        """Keep pending edits (from read_pending) until resolve_pending()"""
+        header, batches = pending
+        lines = [json.dumps(header)] + [json.dumps(batch, ensure_ascii=False) for batch in batches]
+        try:
+            atomic_write_text(self.pending_path, "\n".join(lines) + "\n")
+        except OSError:
+            pass  # Read-only folder: the journal could not have been written either
+
+    def resolve_pending(self):
+        """The recovery prompt was answered; the set-aside edits are no longer needed"""
+        try:
+            os.remove(self.pending_path)
+        except OSError:
+            pass
+
+    def matches_catalog(self, header):
+        """True if the journal was started against the catalog as it is on disk now"""
+        try:
+            stat = os.stat(self.catalog_path)
+        except OSError:
+            return False
+        return header.get("size") == stat.st_size and header.get("mtime_ns") == stat.st_mtime_ns
+
+    def start(self):
+        """Begin a fresh journal for the catalog as currently on disk"""
+        self.close()
+        try:
+            stat = os.stat(self.catalog_path)
+            self.base_stat = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            self.base_stat = (None, None)
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def append(self, line):
+        """Append one encoded batch of records; the file is created on first use"""
+        if self.file is None:
+            size, mtime_ns = self.base_stat if self.base_stat else (None, None)
+            self.file = open(self.path, "w", encoding="utf-8")
+            header = {"journal": self.VERSION, "size": size, "mtime_ns": mtime_ns}
+            self.file.write(json.dumps(header) + "\n")
+        self.file.write(line + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def discard(self):
+        """Remove the journal once its edits are saved or abandoned"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class Catalog:
+    """An item catalog held in memory, without any Qt dependency.
+
+    Rows and columns follow the editor's table: column 0 is the item ID,
+    the rest are catalog_columns(). Saving goes through a CatalogWriter, so
+    only items changed through set_value/remove are re-serialized, and
+    with only the keys they hold: a bulk edit never adds empty fields.
+    """
+
+    def __init__(self, items=None, path=None, layout=LAYOUT_ITEM_CONFIGS):
+        self.path = path
+        if items is None:
+            items = {} if layout == LAYOUT_ARRAY else ColumnStore()
+        self.items = items
+        self.item_ids = list(self.items)
+        self.columns = ["ID"] + catalog_columns(self.items, layout)
+        self.writer = CatalogWriter(layout, pad_columns=False)
+
+    @classmethod
+    def load(cls, path):
+        """Read a JSON catalog, keeping its text so saves only change edited items"""
+        items, layout, source = read_catalog_source(path)
+        catalog = cls(items, path, layout)
+        catalog.writer.seed(source)
+        return catalog
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def cell_text(self, row, col):
+        item_id = self.item_ids[row]
+        if col == 0:
+            return str(item_id)
+        return cell_text(self.items.get(item_id), self.columns[col])
+
+    def find(self, query, column=None):
+        """Return the IDs of items matching a search query (editor syntax)"""
+        if not query or not query.strip():
+            return list(self.item_ids)
+        default_column = self.columns.index(column) if column in self.columns else None
+        terms = parse_query(query, self.columns, default_column)
+        index = SearchIndex(self.cell_text)
+        index.reset(len(self.item_ids), len(self.columns))
+        mask = index.search(terms)
+        if mask is None:
+            return list(self.item_ids)
+        return [item_id for item_id, keep in zip(self.item_ids, mask) if keep]
+
+    def set_value(self, item_id, key, value):
+        """Set one field; returns True if the stored value changed"""
+        item = self.items.get(item_id)
+        if not isinstance(item, Mapping):
+            self.items[item_id] = {}
+            item = self.items[item_id]  # A ColumnStore keeps its own copy
+        if key in item and item[key] == value and type(item[key]) is type(value):
+            return False
+        item[key] = value
+        if key not in self.columns:
+            self.columns.append(key)
+        self.writer.mark_cell(item_id, key)
+        return True
+
+    def remove(self, item_id):
+        if item_id in self.items:
+            del self.items[item_id]
+            self.item_ids.remove(item_id)
+            self.writer.mark_removed(item_id)
+
+    def add(self, item_id, item):
+        """Add or replace an item"""
+        if item_id not in self.items:
+            self.item_ids.append(item_id)
+        self.items[item_id] = item
+        for key in item:
+            if key not in self.columns:
+                self.columns.append(key)
+        self.writer.mark_item(item_id)
+
+    def save(self, path=None):
+        """Write the catalog atomically; returns the number of items rewritten"""
+        path = path or self.path
+        rewritten = self.writer.save(path, self.item_ids, self.items, self.columns[1:])
+        self.path = path
+        return rewritten
@@ -0,0 +1,259 @@
+"""Diff and three-way merge of item catalogs keyed by item ID.
+
+Items are compared by their item_digest fingerprints first: an unchanged
+item costs one dict lookup, and only items whose fingerprints differ are
+compared field by field. Both operations are linear in the number of
+items. No Qt required.
+
+A three-way merge takes every change made on one side only. When both
+sides changed the same field differently, the field is reported as a
+Conflict. It is resolved to ours or theirs, or replaced by a marker object
+holding all three versions:
+
+    {"<<<<<<< ours": 5, "||||||| base": 1, ">>>>>>> theirs": 10}
+"""
+from collections.abc import Mapping
+
+from catalog_core import catalog_digests
+from catalog_schema import MISSING
+
+ADDED = "added"      # Only in the new catalog
+REMOVED = "removed"  # Only in the old catalog
+CHANGED = "changed"  # In both, with different fields
+
+MARKER_OURS = "<<<<<<< ours"
+MARKER_BASE = "||||||| base"
+MARKER_THEIRS = ">>>>>>> theirs"
+
+# How merge_catalogs settles a conflicting field
+RESOLVE_OURS = "ours"
+RESOLVE_THEIRS = "theirs"
+RESOLVE_MARKERS = "markers"
+
+
+def same_value(a, b):
+    """Equal values of the same type (1, 1.0 and True differ in the file)"""
+    return a == b and type(a) is type(b)
+
+
+def as_mapping(item):
+    return item if isinstance(item, Mapping) else {}
+
+
+def field_changes(old, new):
+    """[(key, old value, new value)] for fields that differ; MISSING marks an absent field"""
+    old, new = as_mapping(old), as_mapping(new)
+    changes = []
+    for key, value in old.items():
+        new_value = new[key] if key in new else MISSING
+        if new_value is MISSING or not same_value(value, new_value):
+            changes.append((key, value, new_value))
+    for key, value in new.items():
+        if key not in old:
+            changes.append((key, MISSING, value))
+    return changes
+
+
+class ItemChange:
+    """One item that differs between two catalogs"""
+
+    __slots__ = ("item_id", "kind", "fields")
+
+    def __init__(self, item_id, kind, fields=()):
+        self.item_id = item_id
+        self.kind = kind
+        self.fields = fields  # (key, old, new) for CHANGED items
+
+    def __repr__(self):
+        return f"ItemChange({self.item_id!r}, {self.kind!r}, {len(self.fields)} field(s))"
+
+
+class CatalogDiff:
+    """Changes from an old catalog to a new one, in the new catalog's order
+    (items only in the old catalog come last)"""
+
+    def __init__(self, changes, old_items, new_items):
+        self.changes = changes
+        self.old_items = old_items
+        self.new_items = new_items
+
+    def __len__(self):
+        return len(self.changes)
+
+    def of_kind(self, kind):
+        return [change for change in self.changes if change.kind == kind]
+
+    def counts(self):
+        counts = {ADDED: 0, REMOVED: 0, CHANGED: 0}
+        for change in self.changes:
+            counts[change.kind] += 1
+        return counts
+
+    def field_count(self):
+        return sum(len(change.fields) for change in self.changes)
+
+    def report(self):
+        """JSON-friendly summary; absent fields are left out of old/new"""
+        changed = {}
+        for change in self.of_kind(CHANGED):
+            fields = changed[change.item_id] = {}
+            for key, old, new in change.fields:
+                entry = fields[key] = {}
+                if old is not MISSING:
+                    entry["old"] = old
+                if new is not MISSING:
+                    entry["new"] = new
+        return {
+            "added": [change.item_id for change in self.of_kind(ADDED)],
+            "removed": [change.item_id for change in self.of_kind(REMOVED)],
+            "changed": changed,
+        }
+
+
+def diff_catalogs(old_items, new_items, old_digests=None, new_digests=None):
+    """Compare two {item_id: item} catalogs; digests are computed if not given"""
+    if old_digests is None:
+        old_digests = catalog_digests(old_items)
+    if new_digests is None:
+        new_digests = catalog_digests(new_items)
+    changes = []
+    for item_id in new_items:
+        if item_id not in old_items:
+            changes.append(ItemChange(item_id, ADDED))
+        elif old_digests.get(item_id) != new_digests.get(item_id):
+            fields = field_changes(old_items[item_id], new_items[item_id])
+            if fields:
+                changes.append(ItemChange(item_id, CHANGED, fields))
+    for item_id in old_items:
+        if item_id not in new_items:
+            changes.append(ItemChange(item_id, REMOVED))
+    return CatalogDiff(changes, old_items, new_items)
+
+
+class Conflict:
+    """Both sides of a merge changed the same thing differently.
+
+    key is None when one side deleted an item the other changed. Values
+    are MISSING where a side does not have the item or field.
+    """
+
+    __slots__ = ("item_id", "key", "base", "ours", "theirs")
+
+    def __init__(self, item_id, key, base, ours, theirs):
+        self.item_id = item_id
+        self.key = key
+        self.base = base
+        self.ours = ours
+        self.theirs = theirs
+
+    def describe(self):
+        if self.key is None:
+            side = "ours" if self.ours is MISSING else "theirs"
+            return f"{self.item_id}: deleted in {side}, changed in the other"
+        return f"{self.item_id}.{self.key}: ours {show(self.ours)}, theirs {show(self.theirs)}, base {show(self.base)}"
+
+    def __repr__(self):
+        return f"Conflict({self.item_id!r}, {self.key!r})"
+
+
+def show(value):
+    return "(none)" if value is MISSING else repr(value)
+
+
+def marker(base, ours, theirs):
+    """Object written in place of a conflicting field"""
+    def plain(value):
+        return None if value is MISSING else value
+    return {MARKER_OURS: plain(ours), MARKER_BASE: plain(base), MARKER_THEIRS: plain(theirs)}
+
+
+class MergeResult:
+    """Merged {item_id: item} in order, plus the conflicts found"""
+
+    def __init__(self, items, conflicts):
+        self.items = items
+        self.conflicts = conflicts
+
+
+def merge_fields(item_id, base, ours, theirs, resolve, conflicts):
+    """Merge one item changed on both sides, field by field"""
+    base, ours, theirs = as_mapping(base), as_mapping(ours), as_mapping(theirs)
+    merged = {}
+    keys = list(ours) + [key for key in theirs if key not in ours]
+    for key in keys:
+        b = base[key] if key in base else MISSING
+        o = ours[key] if key in ours else MISSING
+        t = theirs[key] if key in theirs else MISSING
+        if o is MISSING and t is MISSING:
+            continue
+        if o is not MISSING and t is not MISSING and same_value(o, t):
+            value = o
+        elif (o is MISSING and b is MISSING) or (o is not MISSING and b is not MISSING and same_value(o, b)):
+            value = t  # Only theirs changed it
+        elif (t is MISSING and b is MISSING) or (t is not MISSING and b is not MISSING and same_value(t, b)):
+            value = o  # Only ours changed it
+        else:
+            conflicts.append(Conflict(item_id, key, b, o, t))
+            if resolve == RESOLVE_MARKERS:
+                value = marker(b, o, t)
+            else:
+                value = t if resolve == RESOLVE_THEIRS else o
+        if value is not MISSING:
+            merged[key] = value
+    return merged
+
+
+def merge_catalogs(base, ours, theirs, resolve=RESOLVE_OURS,
+                   base_digests=None, our_digests=None, their_digests=None):
+    """Three-way merge of {item_id: item} catalogs.
+
+    Items keep our order; items only theirs added follow the item that
+    precedes them in their catalog. resolve (ours, theirs or markers)
+    decides conflicting fields. An item deleted on one side and changed on
+    the other keeps the changed version, unless resolve picks the side that
+    deleted it.
+    """
+    base_digests = catalog_digests(base) if base_digests is None else base_digests
+    our_digests = catalog_digests(ours) if our_digests is None else our_digests
+    their_digests = catalog_digests(theirs) if their_digests is None else their_digests
+
+    # Our order, with items new in theirs after their predecessor there
+    follows = {}
+    previous = None
+    for item_id in theirs:
+        if item_id in ours:
+            previous = item_id
+        else:
+            follows.setdefault(previous, []).append(item_id)
+    order = follows.get(None, [])
+    for item_id in ours:
+        order.append(item_id)
+        order += follows.get(item_id, [])
+    order += [item_id for item_id in base if item_id not in ours and item_id not in theirs]
+
+    merged, conflicts = {}, []
+    for item_id in order:
+        b, o, t = base_digests.get(item_id), our_digests.get(item_id), their_digests.get(item_id)
+        if o == t or t == b:
+            if item_id in ours:
+                merged[item_id] = ours[item_id]
+        elif o == b:
+            if item_id in theirs:
+                merged[item_id] = theirs[item_id]
+        elif item_id in ours and item_id in theirs:
+            merged[item_id] = merge_fields(item_id, base.get(item_id), ours[item_id], theirs[item_id],
+                                           resolve, conflicts)
+        else:
+            # Deleted on one side, changed on the other
+            conflict = Conflict(item_id, None, base.get(item_id, MISSING),
+                                ours.get(item_id, MISSING), theirs.get(item_id, MISSING))
+            conflicts.append(conflict)
+            if resolve == RESOLVE_OURS:
+                kept = conflict.ours
+            elif resolve == RESOLVE_THEIRS:
+                kept = conflict.theirs
+            else:
+                kept = conflict.ours if conflict.ours is not MISSING else conflict.theirs
+            if kept is not MISSING:
+                merged[item_id] = kept
+    return MergeResult(merged, conflicts)
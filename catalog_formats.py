@@ -0,0 +1,802 @@
+"""Reading and writing catalogs in formats other than the editor's JSON.
+
+Each format is a CatalogFormat registered in FORMATS and picked by file
+extension (format_for_path) or by name:
+
+    json      the editor's {"itemConfigs": {...}} document
+    jsonl     one JSON object per line, with the item ID under "ID"
+    csv, tsv  one row per item, for spreadsheets
+    sqlite    one "items" table, indexed on item_id, category and rarity
+    columnar  compressed row groups of per-column chunks (like Parquet)
+
+Writers stream: rows are read from the catalog in batches of BATCH_ROWS
+and written out, so no format builds the whole output in memory. Files are
+written next to the target and renamed over it when complete.
+
+Every format round-trips the values of the catalog's columns losslessly
+(keys come back in column order). CSV cells hold plain text where that
+reads back as the same string and JSON otherwise: 5 is a number, "5" (with
+the quotes) a string, true a boolean and an empty cell a missing field.
+SQLite stores strings, integers and floats natively and anything else
+(booleans, null, lists, objects) as a JSON BLOB.
+
+SqliteItems opens a database as a lazily paged {item_id: item} mapping,
+so the editor can browse a huge catalog without reading every row. No Qt
+required.
+"""
+import csv
+import json
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from contextlib import contextmanager
+
+from catalog_core import (ITEM_INDENT, LAYOUT_ARRAY, LAYOUT_ITEM_CONFIGS, RECORD_INDENT, Catalog,
+                          CatalogWriter, catalog_columns, json_default, read_catalog)
+from catalog_metrics import METRICS
+from catalog_schema import MISSING, ColumnStore
+
+# Rows read from the catalog (and written or parsed) per batch
+BATCH_ROWS = 10000
+
+# Rows per row group of a columnar file
+ROW_GROUP_ROWS = 50000
+
+# Rows per page of a paged SQLite catalog, and pages kept in memory
+PAGE_ROWS = 1000
+PAGE_CACHE = 64
+
+# Columns that get an index in SQLite (item_id is the primary key)
+SQLITE_INDEXED = ("category", "rarity")
+
+# Columnar files start and end with this (the end also holds the footer size)
+COLUMNAR_MAGIC = b"ICCOLS01"
+COLUMNAR_TAIL = struct.Struct("<Q8s")
+
+# Values a columnar chunk can dictionary encode
+SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# Values that may start a JSON document other than a plain string
+JSON_START = frozenset('"[{-0123456789tfnNI')
+
+
+def encode_text(value):
+    """Text of one CSV cell ("" for a missing field)"""
+    if value is MISSING:
+        return ""
+    if type(value) is str:
+        # Plain unless it would read back as something else
+        if value and decode_text(value) is value:
+            return value
+        return json.dumps(value, ensure_ascii=False)
+    return json.dumps(value, ensure_ascii=False, default=json_default)
+
+
+def decode_text(text):
+    """Value of one CSV cell (MISSING for an empty cell)"""
+    if not text:
+        return MISSING
+    if text[0] in JSON_START:
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return text
+
+
+def encode_sql(value):
+    """SQLite value of a field: native where SQLite keeps the type, else JSON as a BLOB"""
+    value_type = type(value)
+    if value is MISSING:
+        return None
+    if value_type is str:
+        return value
+    if value_type is int and -(1 << 63) <= value < (1 << 63):
+        return value
+    if value_type is float and value == value:  # NaN would be stored as NULL
+        return value
+    return json.dumps(value, ensure_ascii=False, default=json_default).encode("utf-8")
+
+
+def decode_sql(value):
+    if value is None:
+        return MISSING
+    if type(value) is bytes:
+        return json.loads(value)
+    return value
+
+
+def field(item, key):
+    """One field of an item, or MISSING"""
+    if isinstance(item, Mapping):
+        return item.get(key, MISSING)
+    return MISSING
+
+
+def column_batch(items, item_ids, key, convert=None):
+    """One field of many items, converted; read column-wise from a ColumnStore"""
+    if isinstance(items, ColumnStore):
+        return items.column_values(key, item_ids, convert, MISSING)
+    get = items.get
+    if convert is None:
+        return [field(get(item_id), key) for item_id in item_ids]
+    return [convert(field(get(item_id), key)) for item_id in item_ids]
+
+
+def batches(values, size=BATCH_ROWS):
+    """Split an iterable into lists of up to size values"""
+    batch = []
+    for value in values:
+        batch.append(value)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def collect(pairs, layout):
+    """Build a catalog from streamed (item_id, item) pairs, like read_catalog does"""
+    if layout == LAYOUT_ARRAY:
+        return dict(pairs)
+    store = ColumnStore()
+    for batch in batches(pairs):
+        store.extend(batch)
+    return store
+
+
+def item_of(columns, values):
+    """Item dict from parallel keys and values, leaving out missing fields"""
+    return {key: value for key, value in zip(columns, values) if value is not MISSING}
+
+
+@contextmanager
+def replacing(path):
+    """Yield a temporary path next to path; it replaces path if the block succeeds"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        yield temp_path
+        with open(temp_path, "rb") as f:
+            os.fsync(f.fileno())
+        try:
+            # mkstemp creates 0600 files; keep the permissions of the file we replace
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class CatalogFormat:
+    """A file format catalogs can be read from and written to"""
+
+    name = ""
+    extensions = ()
+    description = ""
+
+    def read(self, path):
+        """Load a file and return (items, layout), as read_catalog does"""
+        layout, _, pairs = self.read_items(path)
+        with METRICS.timed("parse"):
+            return collect(pairs, layout), layout
+
+    def read_items(self, path):
+        """(layout, columns, iterator of (item_id, item)) for streaming reads"""
+        raise NotImplementedError
+
+    def write(self, path, items, item_ids, columns, layout=LAYOUT_ITEM_CONFIGS):
+        """Write items in item_ids order. columns (without "ID") must hold
+        every key in use, e.g. catalog_columns(items)."""
+        raise NotImplementedError
+
+    def file_filter(self):
+        """Name filter for file dialogs"""
+        return f"{self.description} ({' '.join('*' + ext for ext in self.extensions)})"
+
+
+class JsonFormat(CatalogFormat):
+    name = "json"
+    extensions = (".json",)
+    description = "JSON Files"
+
+    def read(self, path):
+        return read_catalog(path)
+
+    def read_items(self, path):
+        items, layout = read_catalog(path)
+        return layout, catalog_columns(items, layout), iter(items.items())
+
+    def write(self, path, items, item_ids, columns, layout=LAYOUT_ITEM_CONFIGS):
+        # The text CatalogWriter.render gives, written one item at a time
+        if layout == LAYOUT_ARRAY:
+            writer = CatalogWriter(LAYOUT_ARRAY)
+            opening, indent, closing, empty = "[\n", RECORD_INDENT, "\n]", "[]"
+        else:
+            writer = CatalogWriter(LAYOUT_ITEM_CONFIGS)
+            opening, indent, closing = '{\n    "itemConfigs": {\n', ITEM_INDENT, "\n    }\n}"
+            empty = '{\n    "itemConfigs": {}\n}'
+        with replacing(path) as temp_path:
+            with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                if not item_ids:
+                    f.write(empty)
+                    return
+                f.write(opening)
+                for index, item_id in enumerate(item_ids):
+                    if index:
+                        f.write(",\n")
+                    f.write(indent + writer.serialize_item(item_id, items.get(item_id, {})))
+                f.write(closing)
+
+
+class JsonLinesFormat(CatalogFormat):
+    name = "jsonl"
+    extensions = (".jsonl", ".ndjson")
+    description = "JSON Lines"
+
+    def read_items(self, path):
+        def pairs():
+            with open(path, "r", encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    if not isinstance(item, dict) or "ID" not in item:
+                        raise ValueError(f"line {number}: expected an object with an \"ID\"")
+                    item_id = item.pop("ID")
+                    yield str(item_id), item
+        return LAYOUT_ITEM_CONFIGS, None, pairs()
+
+    def write(self, path, items, item_ids, columns, layout=LAYOUT_ITEM_CONFIGS):
+        with replacing(path) as temp_path:
+            with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                for batch in batches(item_ids):
+                    f.write("".join(
+                        json.dumps({"ID": item_id, **items.get(item_id, {})}, ensure_ascii=False,
+                                   default=json_default) + "\n"
+                        for item_id in batch
+                    ))
+
+
+class CsvFormat(CatalogFormat):
+    name = "csv"
+    extensions = (".csv",)
+    description = "CSV Files"
+    delimiter = ","
+
+    def read_items(self, path):
+        f = open(path, "r", encoding="utf-8-sig", newline="")
+        try:
+            # Nested values can be long; the default limit is 128 KiB per cell
+            csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+            reader = csv.reader(f, delimiter=self.delimiter)
+            header = next(reader, None)
+        except BaseException:
+            f.close()
+            raise
+        if not header or header[0] != "ID":
+            f.close()
+            raise ValueError(f"{os.path.basename(path)}: the first column must be \"ID\"")
+        columns = header[1:]
+
+        def pairs():
+            with f:
+                try:
+                    for row in reader:
+                        if not row:
+                            continue
+                        yield row[0], item_of(columns, map(decode_text, row[1:]))
+                except csv.Error as e:
+                    raise ValueError(f"line {reader.line_num}: {e}")
+        return LAYOUT_ITEM_CONFIGS, columns, pairs()
+
+    def write(self, path, items, item_ids, columns, layout=LAYOUT_ITEM_CONFIGS):
+        with replacing(path) as temp_path:
+            with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f, delimiter=self.delimiter)
+                writer.writerow(["ID"] + list(columns))
+                for batch in batches(item_ids):
+                    cells = [[str(item_id) for item_id in batch]]
+                    cells += [column_batch(items, batch, key, encode_text) for key in columns]
+                    writer.writerows(zip(*cells))
+
+
+class TsvFormat(CsvFormat):
+    name = "tsv"
+    extensions = (".tsv", ".tab")
+    description = "Tab Separated Files"
+    delimiter = "\t"
+
+
+def quote_name(name):
+    """SQL identifier for a column name"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_names(keys, taken=()):
+    """{key: SQL column name}; keys that clash (case-insensitively) with
+    item_id or each other get a numbered name"""
+    used = {"item_id"} | {name.lower() for name in taken}
+    names = {}
+    for key in keys:
+        name, number = key, 2
+        while name.lower() in used:
+            name = f"{key}_{number}"
+            number += 1
+        used.add(name.lower())
+        names[key] = name
+    return names
+
+
+def read_sqlite_schema(connection, path):
+    """(layout, {key: SQL column name}) of a catalog database"""
+    try:
+        info = dict(connection.execute("SELECT name, value FROM catalog_info"))
+        names = {key: name for key, name in
+                 connection.execute("SELECT key, name FROM catalog_columns ORDER BY position")}
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"{os.path.basename(path)} is not a catalog database ({e})")
+    return info.get("layout", LAYOUT_ITEM_CONFIGS), names
+
+
+class SqliteFormat(CatalogFormat):
+    name = "sqlite"
+    extensions = (".sqlite", ".sqlite3", ".db")
+    description = "SQLite Databases"
+
+    def read_items(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)  # connect() would create an empty database
+        connection = sqlite3.connect(path)
+        try:
+            layout, names = read_sqlite_schema(connection, path)
+        except BaseException:
+            connection.close()
+            raise
+        columns = list(names)
+        select = ", ".join(["item_id"] + [quote_name(name) for name in names.values()])
+
+        def pairs():
+            try:
+                cursor = connection.execute(f"SELECT {select} FROM items ORDER BY rowid")
+                for row in cursor:
+                    yield row[0], item_of(columns, map(decode_sql, row[1:]))
+            finally:
+                connection.close()
+        return layout, columns, pairs()
+
+    def write(self, path, items, item_ids, columns, layout=LAYOUT_ITEM_CONFIGS):
+        columns = list(columns)
+        names = sql_names(columns)
+        with replacing(path) as temp_path:
+            connection = sqlite3.connect(temp_path)
+            try:
+                # A fresh file that only replaces the target once complete: no journal needed
+                connection.execute("PRAGMA journal_mode = OFF")
+                connection.execute("PRAGMA synchronous = OFF")
+                create_sqlite_schema(connection, names, layout)
+                insert = (f"INSERT INTO items (rowid, item_id{''.join(', ' + quote_name(names[key]) for key in columns)}) "
+                          f"VALUES (?, ?{', ?' * len(columns)})")
+                rowid = 0
+                for batch in batches(item_ids):
+                    cells = [range(rowid, rowid + len(batch)), [str(item_id) for item_id in batch]]
+                    cells += [column_batch(items, batch, key, encode_sql) for key in columns]
+                    connection.executemany(insert, zip(*cells))
+                    rowid += len(batch)
+                # Indexes are cheaper to build once the rows are in
+                for key in SQLITE_INDEXED:
+                    if key in names:
+                        connection.execute(f"CREATE INDEX {quote_name('items_' + key)} "
+                                           f"ON items ({quote_name(names[key])})")
+                connection.commit()
+            finally:
+                connection.close()
+
+
+def create_sqlite_schema(connection, names, layout):
+    columns = "".join(", " + quote_name(name) for name in names.values())
+    # Columns have no declared type, so SQLite keeps each value's own type
+    connection.execute(f"CREATE TABLE items (item_id TEXT PRIMARY KEY NOT NULL{columns})")
+    connection.execute("CREATE TABLE catalog_columns (position INTEGER PRIMARY KEY, key TEXT NOT NULL, "
+                       "name TEXT NOT NULL)")
+    connection.executemany("INSERT INTO catalog_columns VALUES (?, ?, ?)",
+                           [(position, key, name) for position, (key, name) in enumerate(names.items())])
+    connection.execute("CREATE TABLE catalog_info (name TEXT PRIMARY KEY, value)")
+    connection.executemany("INSERT INTO catalog_info VALUES (?, ?)", [("layout", layout), ("version", 1)])
+
+
+class PagedItem(dict):
+    """An item read from a database page; changing it keeps it in memory until saved"""
+
+    __slots__ = ("owner", "item_id")
+
+    def __init__(self, owner, item_id, fields):
+        super().__init__(fields)
+        self.owner = owner
+        self.item_id = item_id
+
+    def changing(self):
+        self.owner.pin(self.item_id, self)
+
+    def __setitem__(self, key, value):
+        self.changing()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.changing()
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        self.changing()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.changing()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self.changing()
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.changing()
+        super().update(*args, **kwargs)
+
+    def clear(self):
+        self.changing()
+        super().clear()
+
+
+class SqliteItems(MutableMapping):
+    """{item_id: item} over a catalog database, read a page of rows at a time.
+
+    Only the IDs are read up front. Items are fetched PAGE_ROWS at a time
+    and the last PAGE_CACHE pages are kept. Edited, added and removed
+    items are held in memory until save() writes them back in one
+    transaction; rows added while paging are stored after the existing ones.
+    """
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        try:
+            self.layout, self.names = read_sqlite_schema(self.connection, path)
+            self.rowids = dict(self.connection.execute("SELECT item_id, rowid FROM items ORDER BY rowid"))
+        except BaseException:
+            self.connection.close()
+            raise
+        self.next_rowid = max(self.rowids.values(), default=-1) + 1
+        self.pages = OrderedDict()  # page number -> {item_id: PagedItem}, least recently used first
+        self.changed = {}  # item_id -> item edited or added since the last save
+        self.added = {}    # item_ids not in the database yet, in order
+        self.removed = set()
+
+    @property
+    def columns(self):
+        """Keys stored in the database, in column order"""
+        return list(self.names)
+
+    def __getitem__(self, item_id):
+        item = self.changed.get(item_id)
+        if item is not None:
+            return item
+        rowid = self.rowids.get(item_id)
+        if rowid is None or item_id in self.removed:
+            raise KeyError(item_id)
+        return self.page(rowid // PAGE_ROWS)[item_id]
+
+    def __contains__(self, item_id):
+        return item_id in self.changed or (item_id in self.rowids and item_id not in self.removed)
+
+    def __iter__(self):
+        removed = self.removed
+        for item_id in self.rowids:
+            if item_id not in removed:
+                yield item_id
+        yield from list(self.added)
+
+    def __len__(self):
+        return len(self.rowids) - len(self.removed) + len(self.added)
+
+    def __setitem__(self, item_id, item):
+        if item_id not in self.rowids:
+            self.added[item_id] = None
+        self.removed.discard(item_id)
+        self.changed[item_id] = item
+
+    def __delitem__(self, item_id):
+        if item_id not in self:
+            raise KeyError(item_id)
+        self.changed.pop(item_id, None)
+        if item_id in self.added:
+            del self.added[item_id]
+        else:
+            self.removed.add(item_id)
+
+    def __repr__(self):
+        return f"SqliteItems({self.path!r}, {len(self)} items)"
+
+    def pin(self, item_id, item):
+        """Keep an item that is being changed until the next save"""
+        if item_id in self.rowids and item_id not in self.removed:
+            self.changed.setdefault(item_id, item)
+
+    def page(self, number):
+        page = self.pages.get(number)
+        if page is not None:
+            self.pages.move_to_end(number)
+            return page
+        if METRICS.enabled:
+            METRICS.count("database pages read")
+        columns = list(self.names)
+        select = ", ".join(["item_id"] + [quote_name(name) for name in self.names.values()])
+        rows = self.connection.execute(f"SELECT {select} FROM items WHERE rowid >= ? AND rowid < ?",
+                                       (number * PAGE_ROWS, (number + 1) * PAGE_ROWS))
+        page = {row[0]: PagedItem(self, row[0], item_of(columns, map(decode_sql, row[1:]))) for row in rows}
+        self.pages[number] = page
+        if len(self.pages) > PAGE_CACHE:
+            self.pages.popitem(last=False)
+        return page
+
+    def has_changes(self):
+        return bool(self.changed or self.removed)
+
+    def save(self, columns):
+        """Write edits back to the database; columns are the keys to keep, in order"""
+        columns = list(columns)
+        connection = self.connection
+        with connection:
+            table = [row[1] for row in connection.execute("PRAGMA table_info(items)")]
+            new_keys = [key for key in columns if key not in self.names]
+            for key, name in sql_names(new_keys, table).items():
+                connection.execute(f"ALTER TABLE items ADD COLUMN {quote_name(name)}")
+                self.names[key] = name
+            for key in [key for key in self.names if key not in columns]:
+                # Older SQLite versions cannot drop a column: clear it and forget it
+                connection.execute(f"UPDATE items SET {quote_name(self.names.pop(key))} = NULL")
+            self.names = {key: self.names[key] for key in columns}
+            connection.execute("DELETE FROM catalog_columns")
+            connection.executemany("INSERT INTO catalog_columns VALUES (?, ?, ?)",
+                                   [(position, key, name) for position, (key, name) in enumerate(self.names.items())])
+
+            connection.executemany("DELETE FROM items WHERE item_id = ?", [(item_id,) for item_id in self.removed])
+            assignments = ", ".join(f"{quote_name(name)} = ?" for name in self.names.values())
+            updates, inserts = [], []
+            for item_id, item in self.changed.items():
+                values = [encode_sql(field(item, key)) for key in columns]
+                if item_id in self.added:
+                    inserts.append([self.next_rowid, item_id] + values)
+                    self.rowids[item_id] = self.next_rowid
+                    self.next_rowid += 1
+                else:
+                    updates.append(values + [item_id])
+            if assignments:
+                connection.executemany(f"UPDATE items SET {assignments} WHERE item_id = ?", updates)
+            if inserts:
+                names = "".join(", " + quote_name(name) for name in self.names.values())
+                connection.executemany(f"INSERT INTO items (rowid, item_id{names}) "
+                                       f"VALUES (?, ?{', ?' * len(columns)})", inserts)
+        for item_id in self.removed:
+            self.rowids.pop(item_id, None)
+        saved = len(self.changed) + len(self.removed)
+        self.changed, self.added, self.removed = {}, {}, set()
+        self.pages.clear()
+        return saved
+
+    def close(self):
+        self.connection.close()
+
+
+def encode_chunk(values):
+    """Compressed bytes of one column chunk (MISSING marks absent fields).
+
+    Columns of repeated scalars are dictionary encoded: a JSON table of the
+    distinct values plus one code per row (0 = missing). Anything else is
+    a presence byte per row followed by the present values as a JSON list.
+    """
+    table, codes = {}, []
+    limit = len(values) // 2 + 16  # Mostly distinct values: a table would not help
+    for value in values:
+        if value is MISSING:
+            codes.append(0)
+            continue
+        value_type = type(value)
+        if value_type not in SCALAR_TYPES:
+            return encode_plain(values)
+        key = (value_type, value)  # 1, 1.0 and True are different values
+        code = table.get(key)
+        if code is None:
+            if len(table) >= limit:
+                return encode_plain(values)
+            code = table[key] = len(table) + 1
+        codes.append(code)
+
+    typecode = "B" if len(table) < 1 << 8 else "H" if len(table) < 1 << 16 else "I"
+    packed = array(typecode, codes)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    header = json.dumps([value for _, value in table], ensure_ascii=False).encode("utf-8")
+    return zlib.compress(b"D" + typecode.encode("ascii") + struct.pack("<I", len(header)) + header
+                         + packed.tobytes())
+
+
+def encode_plain(values):
+    present = bytes(value is not MISSING for value in values)
+    body = json.dumps([value for value in values if value is not MISSING], ensure_ascii=False,
+                      default=json_default).encode("utf-8")
+    return zlib.compress(b"P" + struct.pack("<I", len(present)) + present + body)
+
+
+def decode_chunk(data):
+    data = zlib.decompress(data)
+    kind = data[:1]
+    if kind == b"D":
+        typecode = data[1:2].decode("ascii")
+        (size,) = struct.unpack_from("<I", data, 2)
+        table = [MISSING] + json.loads(data[6:6 + size])
+        codes = array(typecode)
+        codes.frombytes(data[6 + size:])
+        if sys.byteorder == "big":
+            codes.byteswap()
+        return [table[code] for code in codes]
+    if kind == b"P":
+        (size,) = struct.unpack_from("<I", data, 1)
+        present = data[5:5 + size]
+        values = iter(json.loads(data[5 + size:]))
+        return [next(values) if flag else MISSING for flag in present]
+    raise ValueError("unknown column chunk encoding")
+
+
+class ColumnarFormat(CatalogFormat):
+    """Row groups of ROW_GROUP_ROWS items, each stored column by column.
+
+    File: magic, column chunks, a zlib-compressed JSON footer listing each
+    group's row count and chunk offsets, then the footer size and the magic
+    again. Columns can be read without decoding the others (read_columns).
+    """
+
+    name = "columnar"
+    extensions = (".cols",)
+    description = "Columnar Catalogs"
+
+    def read_footer(self, f, path):
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        if end < len(COLUMNAR_MAGIC) + COLUMNAR_TAIL.size:
+            raise ValueError(f"{os.path.basename(path)} is not a columnar catalog")
+        f.seek(end - COLUMNAR_TAIL.size)
+        size, magic = COLUMNAR_TAIL.unpack(f.read(COLUMNAR_TAIL.size))
+        f.seek(0)
+        if magic != COLUMNAR_MAGIC or f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{os.path.basename(path)} is not a columnar catalog")
+        f.seek(end - COLUMNAR_TAIL.size - size)
+        return json.loads(zlib.decompress(f.read(size)))
+
+    def read_items(self, path):
+        return self.read_columns(path)
+
+    def read_columns(self, path, keys=None):
+        """Like read_items, but only decoding the columns in keys (all if None)"""
+        f = open(path, "rb")
+        try:
+            footer = self.read_footer(f, path)
+        except BaseException:
+            f.close()
+            raise
+        columns = footer["columns"]
+        wanted = [position for position, key in enumerate(columns) if keys is None or key in keys]
+
+        def pairs():
+            with f:
+                for group in footer["groups"]:
+                    chunks = []
+                    for position in [-1] + wanted:  # -1: the item IDs
+                        offset, length = group["chunks"][position + 1]
+                        f.seek(offset)
+                        chunks.append(decode_chunk(f.read(length)))
+                    keys_read = [columns[position] for position in wanted]
+                    for item_id, *values in zip(*chunks):
+                        yield item_id, item_of(keys_read, values)
+        return footer["layout"], [columns[position] for position in wanted], pairs()
+
+    def write(self, path, items, item_ids, columns, layout=LAYOUT_ITEM_CONFIGS):
+        columns = list(columns)
+        groups = []
+        with replacing(path) as temp_path:
+            with open(temp_path, "wb") as f:
+                f.write(COLUMNAR_MAGIC)
+                for batch in batches(item_ids, ROW_GROUP_ROWS):
+                    chunks = []
+                    for values in [[str(item_id) for item_id in batch]] + [
+                            column_batch(items, batch, key) for key in columns]:
+                        data = encode_chunk(values)
+                        chunks.append([f.tell(), len(data)])
+                        f.write(data)
+                    groups.append({"rows": len(batch), "chunks": chunks})
+                footer = zlib.compress(json.dumps({"version": 1, "layout": layout, "columns": columns,
+                                                   "groups": groups}).encode("utf-8"))
+                f.write(footer)
+                f.write(COLUMNAR_TAIL.pack(len(footer), COLUMNAR_MAGIC))
+
+
+FORMATS = {}
+
+
+def register_format(catalog_format):
+    """Make a CatalogFormat available by name and extension"""
+    FORMATS[catalog_format.name] = catalog_format
+    return catalog_format
+
+
+for _format in (JsonFormat(), JsonLinesFormat(), CsvFormat(), TsvFormat(), SqliteFormat(), ColumnarFormat()):
+    register_format(_format)
+
+
+def format_for_path(path, name=None):
+    """The CatalogFormat named name, else the one for path's extension (JSON if unknown)"""
+    if name:
+        try:
+            return FORMATS[name]
+        except KeyError:
+            raise ValueError(f"unknown catalog format {name!r}")
+    extension = os.path.splitext(path)[1].lower()
+    for catalog_format in FORMATS.values():
+        if extension in catalog_format.extensions:
+            return catalog_format
+    return FORMATS["json"]
+
+
+def file_filters():
+    """File dialog filter listing every readable format"""
+    patterns = " ".join("*" + ext for fmt in FORMATS.values() for ext in fmt.extensions)
+    return ";;".join([f"Catalogs ({patterns})"] + [fmt.file_filter() for fmt in FORMATS.values()]
+                     + ["All Files (*)"])
+
+
+def read_any(path, name=None):
+    """(items, layout) from a catalog in any registered format"""
+    return format_for_path(path, name).read(path)
+
+
+def load_catalog(path, name=None):
+    """A Catalog read from any registered format"""
+    catalog_format = format_for_path(path, name)
+    if catalog_format.name == "json":
+        return Catalog.load(path)  # Saved back with untouched items as they are
+    items, layout = catalog_format.read(path)
+    return Catalog(items, path, layout)
+
+
+def export_catalog(path, items, item_ids, columns, layout=LAYOUT_ITEM_CONFIGS, name=None):
+    """Write items to path in the format named name (or picked by its extension)"""
+    catalog_format = format_for_path(path, name)
+    with METRICS.timed("save"):
+        catalog_format.write(path, items, item_ids, columns, layout)
+    return catalog_format
+
+
+def save_catalog(catalog, path=None):
+    """Save a Catalog in its file's format; returns the number of items written
+    (for JSON, the number re-serialized)"""
+    path = path or catalog.path
+    catalog_format = format_for_path(path)
+    if catalog_format.name == "json":
+        return catalog.save(path)
+    catalog_format.write(path, catalog.items, catalog.item_ids, catalog.columns[1:], catalog.writer.layout)
+    catalog.path = path
+    catalog.writer.reset()
+    return len(catalog)
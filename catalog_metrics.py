@@ -0,0 +1,174 @@
+"""Timings and counters for the editor's hot paths.
+
+Instrumented code reports through the shared METRICS object:
+
+    with METRICS.timed("filter"):
+        ...
+    if METRICS.enabled:
+        METRICS.count("rows touched", len(rows))
+
+Collection is off by default. Then timed() hands back one shared no-op
+context manager and counting is skipped by the enabled check, so a call
+site costs an attribute lookup. Timings and counts may come from worker
+threads. No Qt required.
+
+A cProfile capture can be armed for the next run of one timed operation;
+its stats are written to a file that pstats (or snakeviz etc.) can read.
+cProfile only sees the thread that runs the operation.
+"""
+import cProfile
+import threading
+import time
+
+# Timed operations, in the order the diagnostics panel lists them
+OPERATIONS = ("load", "parse", "populate", "filter", "sort", "save", "icon decode")
+
+
+class Timing:
+    """Running totals of one timed operation (seconds)"""
+
+    __slots__ = ("calls", "total", "last", "worst")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds):
+        self.calls += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.worst:
+            self.worst = seconds
+
+
+class NullTimer:
+    """Stand-in for Timer while collection is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def stop(self):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class Timer:
+    """Times one run of an operation, as a context manager or with stop()
+    for operations that span several event loop turns"""
+
+    __slots__ = ("metrics", "name", "started", "profile")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.profile = metrics.take_profile(name)
+        self.started = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    def stop(self):
+        if self.started is None:
+            return
+        elapsed = time.perf_counter() - self.started
+        self.started = None
+        if self.profile is not None:
+            self.metrics.finish_profile(self.name, *self.profile)
+        self.metrics.record(self.name, elapsed)
+
+
+class Metrics:
+    """Timings per operation name and counters per event name"""
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.timings = {}   # name -> Timing
+        self.counters = {}  # name -> count
+        self.profile_requests = {}  # operation -> output path of an armed capture
+        self.profiles = []  # (operation, path, error or None) of finished captures
+
+    def timed(self, name):
+        """Context manager timing one run of name (a no-op while disabled)"""
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name)
+
+    start = timed  # timer = METRICS.start(name) ... timer.stop()
+
+    def record(self, name, seconds):
+        with self.lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = Timing()
+            timing.add(seconds)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        with self.lock:
+            self.timings = {}
+            self.counters = {}
+
+    def report(self):
+        """(timings, counters) as sorted lists of plain tuples:
+        (name, calls, total, last, worst) and (name, count)"""
+        with self.lock:
+            order = {name: index for index, name in enumerate(OPERATIONS)}
+            timings = sorted(((name, t.calls, t.total, t.last, t.worst) for name, t in self.timings.items()),
+                             key=lambda row: (order.get(row[0], len(order)), row[0]))
+            counters = sorted(self.counters.items())
+        return timings, counters
+
+    def profile_next(self, name, path):
+        """Capture a cProfile of the next run of name into path"""
+        with self.lock:
+            self.profile_requests[name] = path
+
+    def take_profile(self, name):
+        """Start the capture armed for name, if any: (profile, path) or None"""
+        if not self.profile_requests:
+            return None
+        with self.lock:
+            path = self.profile_requests.pop(name, None)
+        if path is None:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # Another profiler is active
+            with self.lock:
+                self.profiles.append((name, path, str(e)))
+            return None
+        return profile, path
+
+    def finish_profile(self, name, profile, path):
+        profile.disable()
+        error = None
+        try:
+            profile.dump_stats(path)
+        except OSError as e:
+            error = str(e)
+        with self.lock:
+            self.profiles.append((name, path, error))
+
+    def take_finished_profiles(self):
+        with self.lock:
+            finished, self.profiles = self.profiles, []
+        return finished
+
+
+METRICS = Metrics()
@@ -0,0 +1,693 @@
+"""Column types for item catalogs and typed, columnar storage of their items.
+
+Every column has a ColumnSchema. The well-known itemConfigs fields are
+declared (enums for category, rarity and attachment_type, integers for the
+numeric fields, a file name for icon); any other key is inferred from the
+first value stored in it. Edited text is parsed by the column's type, so a
+bad value is refused as it is typed, and problem() explains stored values
+that do not fit so the editor can flag them in place.
+
+ColumnStore keeps a catalog as one array per column instead of one dict
+per item: enums and other repeated strings as integer codes into a table
+of distinct values, integers in array('q') and everything else in plain
+lists. It is a MutableMapping of item_id -> ItemRow, so code written for a
+dict of item dicts keeps working. No Qt required.
+"""
+import json
+from array import array
+from collections.abc import Mapping, MutableMapping
+
+from catalog_metrics import METRICS
+
+KIND_TEXT = "text"
+KIND_ENUM = "enum"
+KIND_INT = "int"
+KIND_FLOAT = "float"
+KIND_BOOL = "bool"
+KIND_PATH = "path"
+KIND_JSON = "json"
+
+# Text accepted for boolean columns
+BOOL_WORDS = {"true": True, "yes": True, "1": True, "false": False, "no": False, "0": False, "": False}
+
+# An inferred enum column with more distinct values than this, and more
+# than half as many values as rows, is stored as a plain list instead
+ENUM_MIN_VALUES = 64
+
+# Values of IntColumn.states
+INT_MISSING, INT_STORED, INT_OTHER = 0, 1, 2
+
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class Missing:
+    """Marker for a field an item does not have"""
+
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = Missing()
+
+
+class ColumnSchema:
+    """Type of one catalog column"""
+
+    def __init__(self, name, kind, choices=()):
+        self.name = name
+        self.kind = kind
+        self.choices = tuple(choices)
+        self.choice_set = frozenset(self.choices)
+
+    def parse(self, text, current=None):
+        """Convert edited cell text to the value to store.
+
+        Raises ValueError with a readable message when the text does not
+        fit the column. current is the value being replaced: nested
+        lists/objects are parsed back from JSON and, in untyped columns,
+        numbers stay numbers when the text still parses as one.
+        """
+        value = str(text).strip()
+        if isinstance(current, (list, dict)) or (self.kind == KIND_JSON and current is None):
+            try:
+                return json.loads(value)
+            except ValueError:
+                raise ValueError(f"{self.name} must be valid JSON") from None
+        if self.kind == KIND_INT:
+            try:
+                return int(value) if value else 0
+            except ValueError:
+                raise ValueError(f"{self.name} must be a whole number, not {value!r}") from None
+        if self.kind == KIND_FLOAT:
+            try:
+                return float(value) if value else 0.0
+            except ValueError:
+                raise ValueError(f"{self.name} must be a number, not {value!r}") from None
+        if self.kind == KIND_BOOL:
+            try:
+                return BOOL_WORDS[value.lower()]
+            except KeyError:
+                raise ValueError(f"{self.name} must be true or false, not {value!r}") from None
+        if isinstance(current, (int, float)) and not isinstance(current, bool):
+            try:
+                return type(current)(value)
+            except ValueError:
+                return value
+        return value
+
+    def problem(self, value, files=None):
+        """Why a stored value does not fit the column, or None.
+
+        files is the set of file names a path column may refer to (None
+        skips the check).
+        """
+        value_type = type(value)
+        if self.kind == KIND_INT:
+            if value_type is not int:
+                return f"{self.name} should be a whole number"
+        elif self.kind == KIND_FLOAT:
+            if value_type is not int and value_type is not float:
+                return f"{self.name} should be a number"
+        elif self.kind == KIND_BOOL:
+            if value_type is not bool:
+                return f"{self.name} should be true or false"
+        elif self.kind == KIND_ENUM:
+            if self.choice_set and value != "" and value not in self.choice_set:
+                return f"{value!r} is not a known {self.name} ({', '.join(self.choices)})"
+        elif self.kind == KIND_PATH:
+            if files is not None and value and value_type is str and value.strip() not in files:
+                return f"{value} is not in the icons folder"
+        return None
+
+    def sort_key(self, value):
+        """Value the column sorts by: numbers numerically, the rest as text"""
+        if self.kind in (KIND_INT, KIND_FLOAT):
+            value_type = type(value)
+            return value if value_type is int or value_type is float else float("-inf")
+        return None
+
+    def __repr__(self):
+        return f"ColumnSchema({self.name!r}, {self.kind!r})"
+
+
+DECLARED_COLUMNS = {
+    "displayName": ColumnSchema("displayName", KIND_TEXT),
+    "category": ColumnSchema("category", KIND_ENUM, (
+        "weapons", "ammo", "attachments", "armor", "consumables", "materials", "tools")),
+    "rarity": ColumnSchema("rarity", KIND_ENUM, (
+        "common", "uncommon", "rare", "epic", "legendary", "exotic")),
+    "attachment_type": ColumnSchema("attachment_type", KIND_ENUM, (
+        "optic", "muzzle", "grip", "stock", "magazine", "tactical", "converter", "scanner")),
+    "maxDurability": ColumnSchema("maxDurability", KIND_INT),
+    "maxStackSize": ColumnSchema("maxStackSize", KIND_INT),
+    "icon": ColumnSchema("icon", KIND_PATH),
+}
+
+
+def column_schema(name):
+    """Declared schema of a column, or untyped text"""
+    return DECLARED_COLUMNS.get(name) or ColumnSchema(name, KIND_TEXT)
+
+
+def infer_schema(name, value):
+    """Schema of an undeclared column from the first value stored in it"""
+    value_type = type(value)
+    if value_type is bool:
+        return ColumnSchema(name, KIND_BOOL)
+    if value_type is int:
+        return ColumnSchema(name, KIND_INT)
+    if value_type is float:
+        return ColumnSchema(name, KIND_FLOAT)
+    if value_type is list or value_type is dict or isinstance(value, Mapping):
+        return ColumnSchema(name, KIND_JSON)
+    # Strings start as an enum and fall back to text if they turn out to vary
+    return ColumnSchema(name, KIND_ENUM)
+
+
+class ObjectColumn:
+    """Values in a plain list (text, paths, floats, nested values)"""
+
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values = []
+
+    def get(self, slot):
+        values = self.values
+        return values[slot] if slot < len(values) else MISSING
+
+    def set(self, slot, value):
+        """Store a value; returns True if the column should change storage"""
+        values = self.values
+        if slot == len(values):
+            values.append(value)
+        elif slot < len(values):
+            values[slot] = value
+        else:
+            values.extend([MISSING] * (slot - len(values)))
+            values.append(value)
+        return False
+
+    def extend(self, start, values):
+        """Store values for the slots from start on (MISSING where absent)"""
+        own = self.values
+        own.extend([MISSING] * (start - len(own)))
+        own.extend(values)
+        return False
+
+    def clear(self, slot):
+        if slot < len(self.values):
+            self.values[slot] = MISSING
+
+    def values_in_use(self):
+        return ()
+
+
+class EnumColumn:
+    """Values as codes into a table of the distinct values (code 0 = missing)"""
+
+    __slots__ = ("codes", "table", "lookup")
+
+    def __init__(self):
+        self.codes = array("I")
+        self.table = [MISSING]
+        self.lookup = {}  # (type, value) -> code; 1, 1.0 and True stay apart
+
+    def get(self, slot):
+        codes = self.codes
+        return self.table[codes[slot]] if slot < len(codes) else MISSING
+
+    def set(self, slot, value):
+        grew = False
+        try:
+            lookup_key = (value.__class__, value)
+            code = self.lookup.get(lookup_key)
+        except TypeError:  # Unhashable (nested) values get a code each
+            lookup_key = code = None
+        if code is None:
+            code = len(self.table)
+            self.table.append(value)
+            if lookup_key is not None:
+                self.lookup[lookup_key] = code
+            grew = True
+        codes = self.codes
+        if slot == len(codes):
+            codes.append(code)
+        elif slot < len(codes):
+            codes[slot] = code
+        else:
+            codes.extend([0] * (slot - len(codes)))
+            codes.append(code)
+        return grew and self.too_varied()
+
+    def extend(self, start, values):
+        codes = self.codes
+        codes.extend([0] * (start - len(codes)))
+        lookup, table = self.lookup, self.table
+        new_codes = []
+        for value in values:
+            if value is MISSING:
+                new_codes.append(0)
+                continue
+            try:
+                lookup_key = (value.__class__, value)
+                code = lookup.get(lookup_key)
+            except TypeError:
+                lookup_key = code = None
+            if code is None:
+                code = len(table)
+                table.append(value)
+                if lookup_key is not None:
+                    lookup[lookup_key] = code
+            new_codes.append(code)
+        codes.extend(new_codes)
+        return self.too_varied()
+
+    def too_varied(self):
+        """True when the values are mostly distinct, so codes save nothing"""
+        distinct = len(self.table) - 1
+        return distinct > ENUM_MIN_VALUES and distinct * 2 > len(self.codes)
+
+    def clear(self, slot):
+        if slot < len(self.codes):
+            self.codes[slot] = 0
+
+    def values_in_use(self):
+        """Distinct string values, in the order first seen"""
+        return [value for value in self.table[1:] if type(value) is str]
+
+    def to_objects(self):
+        column = ObjectColumn()
+        table = self.table
+        column.values = [table[code] for code in self.codes]
+        return column
+
+
+class IntColumn:
+    """Integers in array('q'); anything else (or beyond 64 bits) kept aside"""
+
+    __slots__ = ("values", "states", "other")
+
+    def __init__(self):
+        self.values = array("q")
+        self.states = bytearray()
+        self.other = {}  # slot -> value that is not a 64-bit int
+
+    def get(self, slot):
+        states = self.states
+        if slot >= len(states):
+            return MISSING
+        state = states[slot]
+        if state == INT_STORED:
+            return self.values[slot]
+        if state == INT_OTHER:
+            return self.other[slot]
+        return MISSING
+
+    def set(self, slot, value):
+        values, states = self.values, self.states
+        if slot > len(states):
+            values.extend([0] * (slot - len(states)))
+            states.extend(bytes(slot - len(states)))
+        if type(value) is int and INT64_MIN <= value <= INT64_MAX:
+            state, number = INT_STORED, value
+            self.other.pop(slot, None)
+        else:
+            state, number = INT_OTHER, 0
+            self.other[slot] = value
+        if slot == len(states):
+            values.append(number)
+            states.append(state)
+        else:
+            values[slot] = number
+            states[slot] = state
+        return False
+
+    def extend(self, start, values):
+        states = self.states
+        self.values.extend([0] * (start - len(states)))
+        states.extend(bytes(start - len(states)))
+        numbers, new_states = array("q"), bytearray()
+        for slot, value in enumerate(values, start):
+            if type(value) is int and INT64_MIN <= value <= INT64_MAX:
+                numbers.append(value)
+                new_states.append(INT_STORED)
+            elif value is MISSING:
+                numbers.append(0)
+                new_states.append(INT_MISSING)
+            else:
+                numbers.append(0)
+                new_states.append(INT_OTHER)
+                self.other[slot] = value
+        self.values.extend(numbers)
+        states.extend(new_states)
+        return False
+
+    def clear(self, slot):
+        if slot < len(self.states):
+            self.states[slot] = INT_MISSING
+            self.other.pop(slot, None)
+
+    def values_in_use(self):
+        return ()
+
+
+def new_column(schema):
+    if schema.kind in (KIND_ENUM, KIND_BOOL):
+        return EnumColumn()
+    if schema.kind == KIND_INT:
+        return IntColumn()
+    return ObjectColumn()
+
+
+class ItemRow(MutableMapping):
+    """One item of a ColumnStore, read and written in place"""
+
+    __slots__ = ("store", "slot")
+
+    def __init__(self, store, slot):
+        self.store = store
+        self.slot = slot
+
+    def __getitem__(self, key):
+        column = self.store.columns.get(key)
+        if column is None:
+            raise KeyError(key)
+        value = column.get(self.slot)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        column = self.store.columns.get(key)
+        if column is None:
+            return default
+        value = column.get(self.slot)
+        return default if value is MISSING else value
+
+    def __setitem__(self, key, value):
+        self.store.set_field(self.slot, key, value)
+
+    def __delitem__(self, key):
+        self.store.delete_field(self.slot, key)
+
+    def __contains__(self, key):
+        column = self.store.columns.get(key)
+        return column is not None and column.get(self.slot) is not MISSING
+
+    def __iter__(self):
+        return iter(self.store.row_keys(self.slot))
+
+    def __len__(self):
+        return len(self.store.row_keys(self.slot))
+
+    def to_dict(self):
+        return self.store.row_dict(self.slot)
+
+    def __repr__(self):
+        return f"ItemRow({self.to_dict()!r})"
+
+
+def detach(item):
+    """item as a plain dict if it is an ItemRow, else item itself.
+
+    Anything kept beyond the current edit (undo records, the journal) must
+    hold the values, not a view of a slot that may be cleared or reused.
+    """
+    return item.to_dict() if type(item) is ItemRow else item
+
+
+class ColumnStore(MutableMapping):
+    """item_id -> ItemRow over typed per-column arrays.
+
+    Assigning an item copies its fields into the columns. A replaced item
+    keeps its slot and the slots of removed items are cleared and handed
+    out again, so an ItemRow only stays valid while its item is in the
+    store; keep detach()ed copies instead.
+    """
+
+    def __init__(self, items=None):
+        self.slots = {}      # item_id -> slot, in item order
+        self.size = 0        # Slots handed out so far
+        self.free = []       # Cleared slots of removed items, reused first
+        self.columns = {}    # key -> column, in the order keys were first seen
+        self.positions = {}  # key -> position in self.columns
+        self.schema = {}     # key -> ColumnSchema
+        self.orders = {}     # slot -> keys, for items whose keys are not in column order
+        self.loose = {}      # slot -> value, for items that are not objects
+        if items is not None:
+            self.extend(items.items() if isinstance(items, Mapping) else items)
+
+    def __getitem__(self, item_id):
+        slot = self.slots[item_id]
+        if slot in self.loose:
+            return self.loose[slot]
+        return ItemRow(self, slot)
+
+    def get(self, item_id, default=None):
+        slot = self.slots.get(item_id)
+        if slot is None:
+            return default
+        if slot in self.loose:
+            return self.loose[slot]
+        return ItemRow(self, slot)
+
+    def __contains__(self, item_id):
+        return item_id in self.slots
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __setitem__(self, item_id, item):
+        self.extend(((item_id, item),))
+
+    def __delitem__(self, item_id):
+        slot = self.slots.pop(item_id)
+        self.clear_slot(slot)
+        self.free.append(slot)
+
+    def pop(self, item_id, *default):
+        """Remove an item and return its fields as a plain dict"""
+        if item_id not in self.slots:
+            if default:
+                return default[0]
+            raise KeyError(item_id)
+        item = detach(self[item_id])
+        del self[item_id]
+        return item
+
+    def __repr__(self):
+        return f"ColumnStore({len(self)} items, {len(self.columns)} columns)"
+
+    def copy(self):
+        return ColumnStore(self)
+
+    def extend(self, pairs):
+        """Add or replace many (item_id, item) pairs, filling each column in one pass.
+
+        A replaced item keeps its slot (and its place in the item order);
+        new items take freed slots first, then new ones at the end.
+        """
+        start = self.size
+        slots, positions, free = self.slots, self.positions, self.free
+        no_fields = {}
+        batch = []  # Items for the new slots from start on
+        reused = {}  # slot below start -> item
+        key_orders = {}  # keys of an item -> True if they follow the column order
+        for item_id, item in pairs:
+            if type(item) is ItemRow and item.store is self:
+                item = item.to_dict()  # Its slot may be cleared below
+            slot = slots.get(item_id)
+            if slot is None:
+                slot = free.pop() if free else start + len(batch)
+                slots[item_id] = slot
+            elif slot < start:
+                self.clear_slot(slot)
+            else:
+                self.orders.pop(slot, None)  # Given twice in pairs
+                self.loose.pop(slot, None)
+            if not isinstance(item, Mapping):
+                self.loose[slot] = item
+                item = no_fields
+            else:
+                keys = tuple(item)
+                in_order = key_orders.get(keys)
+                if in_order is None:
+                    for key in keys:
+                        if key not in self.columns:
+                            self.add_column(key, item[key])
+                    order = [positions[key] for key in keys]
+                    in_order = all(a < b for a, b in zip(order, order[1:]))
+                    key_orders[keys] = in_order
+                if not in_order:
+                    self.orders[slot] = keys
+            if slot < start:
+                reused[slot] = item
+            elif slot - start < len(batch):
+                batch[slot - start] = item
+            else:
+                batch.append(item)
+        self.size = start + len(batch)
+
+        keys = set().union(*key_orders)
+        if METRICS.enabled:
+            METRICS.count("cells allocated", len(batch) * len(keys))
+        for key in keys:
+            values = [item.get(key, MISSING) for item in batch]
+            if self.columns[key].extend(start, values):
+                self.store_as_objects(key)
+        columns = self.columns
+        for slot, item in reused.items():
+            for key, value in item.items():
+                if columns[key].set(slot, value):
+                    self.store_as_objects(key)
+
+    def clear_slot(self, slot):
+        """Drop every value of a slot, e.g. before it is reused"""
+        for column in self.columns.values():
+            column.clear(slot)
+        self.orders.pop(slot, None)
+        self.loose.pop(slot, None)
+
+    def add_column(self, key, value):
+        schema = DECLARED_COLUMNS.get(key) or infer_schema(key, value)
+        column = new_column(schema)
+        self.schema[key] = schema
+        self.positions[key] = len(self.columns)
+        self.columns[key] = column
+        return column
+
+    def set_field(self, slot, key, value):
+        column = self.columns.get(key)
+        if column is None:
+            column = self.add_column(key, value)
+        if column.get(slot) is MISSING:
+            # A new key goes last, as it would in a dict
+            keys = self.row_keys(slot)
+            if slot in self.orders or (keys and self.positions[keys[-1]] > self.positions[key]):
+                self.orders[slot] = keys + (key,)
+        if column.set(slot, value):
+            self.store_as_objects(key)
+
+    def store_as_objects(self, key):
+        """Switch an enum column whose values turned out to vary to a plain list"""
+        self.columns[key] = self.columns[key].to_objects()
+        if key not in DECLARED_COLUMNS:
+            self.schema[key] = ColumnSchema(key, KIND_TEXT)
+
+    def delete_field(self, slot, key):
+        column = self.columns.get(key)
+        if column is None or column.get(slot) is MISSING:
+            raise KeyError(key)
+        column.clear(slot)
+        order = self.orders.get(slot)
+        if order is not None:
+            self.orders[slot] = tuple(name for name in order if name != key)
+
+    def rename_column(self, key, new_key):
+        """Give a column another key; values and key order stay as they are"""
+        self.columns = {new_key if name == key else name: column for name, column in self.columns.items()}
+        self.positions = {name: position for position, name in enumerate(self.columns)}
+        schema = self.schema.pop(key)
+        self.schema[new_key] = DECLARED_COLUMNS.get(new_key) or ColumnSchema(new_key, schema.kind, schema.choices)
+        for slot, order in self.orders.items():
+            if key in order:
+                self.orders[slot] = tuple(new_key if name == key else name for name in order)
+
+    def drop_column(self, key):
+        """Remove a column from every item; returns {item_id: value} of the items that had it"""
+        item_ids = list(self.slots)
+        values = self.column_values(key, item_ids, default=MISSING)
+        del self.columns[key]
+        del self.schema[key]
+        self.positions = {name: position for position, name in enumerate(self.columns)}
+        for slot, order in self.orders.items():
+            if key in order:
+                self.orders[slot] = tuple(name for name in order if name != key)
+        return {item_id: value for item_id, value in zip(item_ids, values) if value is not MISSING}
+
+    def fill_column(self, key, values):
+        """Add a column no item has yet from {item_id: value}, e.g. to undo drop_column"""
+        if not values:
+            return
+        slots, loose, orders = self.slots, self.loose, self.orders
+        column = self.add_column(key, next(iter(values.values())))
+        for item_id, value in values.items():
+            slot = slots.get(item_id)
+            if slot is None or slot in loose:
+                continue
+            if slot in orders:
+                orders[slot] += (key,)  # A new key goes last
+            if column.set(slot, value):
+                self.store_as_objects(key)
+                column = self.columns[key]
+
+    def row_keys(self, slot):
+        order = self.orders.get(slot)
+        if order is not None:
+            return order
+        return tuple(key for key, column in self.columns.items() if column.get(slot) is not MISSING)
+
+    def row_dict(self, slot):
+        """The fields of one slot as a plain dict, in the item's key order"""
+        order = self.orders.get(slot)
+        columns = self.columns
+        if order is not None:
+            return {key: columns[key].get(slot) for key in order}
+        row = {}
+        for key, column in columns.items():
+            value = column.get(slot)
+            if value is not MISSING:
+                row[key] = value
+        return row
+
+    def column_values(self, key, item_ids, convert=None, default=""):
+        """One field of many items as a list (default where missing).
+
+        convert, if given, is applied to the values; enum columns convert
+        each distinct value once.
+        """
+        slots = self.slots
+        column = self.columns.get(key)
+        if column is None:
+            return [convert(default) if convert else default] * len(item_ids)
+        if type(column) is EnumColumn:
+            table = [default if value is MISSING else value for value in column.table]
+            if convert is not None:
+                table = [convert(value) for value in table]
+            codes = column.codes
+            size = len(codes)
+            return [table[codes[slot]] if slot < size else table[0]
+                    for slot in map(slots.__getitem__, item_ids)]
+        get = column.get
+        values = [get(slot) for slot in map(slots.__getitem__, item_ids)]
+        if convert is not None:
+            missing = convert(default)
+            return [missing if value is MISSING else convert(value) for value in values]
+        return [default if value is MISSING else value for value in values]
+
+    def value(self, item_id, key, default=""):
+        """One field of an item without building an ItemRow (default if missing)"""
+        slot = self.slots.get(item_id)
+        column = self.columns.get(key)
+        if slot is None or column is None:
+            return default
+        value = column.get(slot)
+        return default if value is MISSING else value
+
+    def choices(self, key):
+        """Values offered for an enum column: the declared ones, then those in use"""
+        schema = self.schema.get(key)
+        if schema is None or schema.kind != KIND_ENUM:
+            return []
+        choices = list(schema.choices)
+        seen = set(choices)
+        column = self.columns[key]
+        for value in column.values_in_use():
+            if value not in seen and value != "":
+                seen.add(value)
+                choices.append(value)
+        return choices
@@ -0,0 +1,409 @@
+"""Search index and query language for the item table.
+
+The index keeps a lowercase copy of every cell, grouped per column, plus a
+joined per-row blob used for "All Columns" searches. It is filled lazily on
+the first search and then kept up to date cell by cell as the table is
+edited, so a keystroke never has to re-read the model.
+
+Queries are whitespace separated terms that must all match:
+
+    helmet                  substring in the selected column (or any column)
+    category:armor          substring in one column
+    rarity=epic             exact value
+    maxStackSize>50         numeric comparison (>, >=, <, <=, !=)
+    displayName:"weak stim" quotes allow spaces
+
+Field names are the table headers (case-insensitive). A token whose field is
+not a known column is searched for as plain text.
+"""
+import re
+from itertools import compress
+
+from catalog_metrics import METRICS
+
+# field, operator, value | "quoted text" | bare text
+QUERY_TOKEN = re.compile(r'(\w+)(>=|<=|!=|:|=|>|<)("[^"]*"?|\S*)|"([^"]*)"?|(\S+)')
+
+NUMERIC_OPS = (">", ">=", "<", "<=")
+
+# Separator between cells in a row blob; it cannot appear in typed search text
+CELL_SEPARATOR = "\x00"
+
+
+class SearchTerm:
+    """One condition of a query. column is None to match any column."""
+
+    __slots__ = ("column", "op", "value", "number")
+
+    def __init__(self, column, op, value):
+        self.column = column
+        self.op = op
+        self.value = value.lower()
+        self.number = None
+        if op in NUMERIC_OPS or op == "!=":
+            self.number = to_number(value)
+
+    def __eq__(self, other):
+        return (isinstance(other, SearchTerm) and self.column == other.column
+                and self.op == other.op and self.value == other.value)
+
+    def __repr__(self):
+        return f"SearchTerm({self.column!r}, {self.op!r}, {self.value!r})"
+
+    def matches_text(self, text):
+        """Check a lowercase cell text against this term"""
+        op = self.op
+        if op == ":":
+            return self.value in text
+        if op == "=":
+            return text == self.value
+        if op == "!=":
+            if self.number is not None:
+                number = to_number(text)
+                if number is not None:
+                    return number != self.number
+            return text != self.value
+        return self.matches_number(to_number(text))
+
+    def matches_number(self, number):
+        """Check a parsed cell value against a numeric comparison"""
+        if number is None or self.number is None:
+            return False
+        op = self.op
+        if op == ">":
+            return number > self.number
+        if op == ">=":
+            return number >= self.number
+        if op == "<":
+            return number < self.number
+        return number <= self.number
+
+    def implies(self, other):
+        """True if every row matching self also matches other"""
+        if self.column != other.column:
+            return False
+        if self == other:
+            return True
+        if other.op == ":":
+            return self.op in (":", "=") and other.value in self.value
+        if self.op != other.op or self.number is None or other.number is None:
+            return False
+        if self.op in (">", ">="):
+            return self.number >= other.number
+        if self.op in ("<", "<="):
+            return self.number <= other.number
+        return False
+
+
+def to_number(text):
+    """Parse a cell value as a number, or return None"""
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_query(text, columns, default_column=None):
+    """Split search text into SearchTerms.
+
+    columns is the list of header names; default_column is the column index
+    plain terms are restricted to (None searches every column).
+    """
+    lookup = {name.lower(): index for index, name in enumerate(columns)}
+    terms = []
+    for match in QUERY_TOKEN.finditer(text):
+        field, op, value, quoted, bare = match.groups()
+        if field is not None:
+            column = lookup.get(field.lower())
+            if column is not None:
+                value = value.strip('"')
+                # "category:" while still typing matches everything
+                if value or op in ("=", "!="):
+                    terms.append(SearchTerm(column, op, value))
+                continue
+            bare = match.group(0)
+        if quoted is not None:
+            bare = quoted
+        if bare:
+            terms.append(SearchTerm(default_column, ":", bare))
+    return terms
+
+
+def splice_in(sequence, positions, values):
+    """Copy of sequence with values inserted so they end up at positions (ascending)"""
+    result = sequence[:0]
+    previous = 0
+    for inserted, (position, value) in enumerate(zip(positions, values)):
+        source = position - inserted
+        result += sequence[previous:source]
+        result.append(value)
+        previous = source
+    result += sequence[previous:]
+    return result
+
+
+def splice_out(sequence, rows):
+    """Copy of sequence without the items at rows (ascending)"""
+    result = sequence[:0]
+    previous = 0
+    for row in rows:
+        result += sequence[previous:row]
+        previous = row + 1
+    result += sequence[previous:]
+    return result
+
+
+class SearchIndex:
+    """Lowercase cell index over a table with incremental narrowing.
+
+    text_of(row, column) returns the display text of a cell; column_texts(column),
+    if given, returns a whole column at once and is used for full builds. The
+    result of a search is a bytearray mask with one byte per row (1 = visible),
+    or None when no filter is active.
+    """
+
+    def __init__(self, text_of, column_texts=None):
+        self.text_of = text_of
+        self.column_texts = column_texts
+        self.row_count = 0
+        self.column_count = 0
+        self.cells = None       # per column: list of lowercase cell text
+        self.blobs = None       # per row: all lowercase cells joined, built on demand
+        self.numbers = {}       # column -> list of parsed numbers, built on demand
+        self.mask = None
+        self.last_terms = None
+        self.recheck = set()    # rows edited since the last search
+
+    def reset(self, row_count, column_count):
+        """Forget everything; the index is rebuilt on the next search"""
+        self.row_count = row_count
+        self.column_count = column_count
+        self.cells = None
+        self.blobs = None
+        self.numbers = {}
+        self.mask = None
+        self.last_terms = None
+        self.recheck = set()
+
+    def ensure_built(self):
+        if self.cells is not None:
+            return
+        self.cells = [self.column_cells(col) for col in range(self.column_count)]
+        self.blobs = None
+
+    def row_blobs(self):
+        """Joined cells of every row, rebuilt after columns were added or removed"""
+        if self.blobs is None:
+            self.blobs = [CELL_SEPARATOR.join(row_cells) for row_cells in zip(*self.cells)]
+            if not self.blobs:
+                self.blobs = [""] * self.row_count
+        return self.blobs
+
+    def column_cells(self, col):
+        """Lowercase text of every row of a column, read from the model"""
+        if METRICS.enabled:
+            METRICS.count("index cells built", self.row_count)
+        if self.column_texts is not None:
+            return [text.lower() for text in self.column_texts(col)]
+        text_of = self.text_of
+        return [text_of(row, col).lower() for row in range(self.row_count)]
+
+    def update_cell(self, row, column):
+        """Refresh one cell after an edit"""
+        if self.cells is not None:
+            self.cells[column][row] = self.text_of(row, column).lower()
+            if self.blobs is not None:
+                self.blobs[row] = CELL_SEPARATOR.join(cells[row] for cells in self.cells)
+            numbers = self.numbers.get(column)
+            if numbers is not None:
+                numbers[row] = to_number(self.cells[column][row])
+        # An edited row may now match a query it failed before
+        self.recheck.add(row)
+
+    def update_block(self, top, left, bottom, right):
+        """Refresh a rectangle of cells after a bulk edit.
+
+        Cheaper than invalidating when only a few columns changed: other
+        columns keep their text and only the touched rows get new blobs.
+        """
+        if self.cells is not None:
+            text_of = self.text_of
+            changed = set()
+            for col in range(left, right + 1):
+                cells = self.cells[col]
+                for row in range(top, bottom + 1):
+                    text = text_of(row, col).lower()
+                    if text != cells[row]:
+                        cells[row] = text
+                        changed.add(row)
+                self.numbers.pop(col, None)
+            all_cells = self.cells
+            blobs = self.blobs
+            if blobs is not None:
+                for row in changed:
+                    blobs[row] = CELL_SEPARATOR.join(cells[row] for cells in all_cells)
+        # Too many rows to recheck one by one; the next search starts over
+        self.recheck = set()
+        self.last_terms = None
+
+    def reserve_rows(self, first, count):
+        """Make room for rows about to be inserted; new rows start out visible.
+
+        Called before the model inserts, so a proxy filtering on the mask
+        already sees the shifted rows.
+        """
+        if self.mask is not None:
+            self.mask[first:first] = b"\x01" * count
+        self.row_count += count
+        self.recheck = set()
+        self.last_terms = None
+
+    def index_rows(self, first, count):
+        """Index the text of rows once the model has inserted them"""
+        if self.cells is not None:
+            text_of = self.text_of
+            new_rows = range(first, first + count)
+            for col, cells in enumerate(self.cells):
+                cells[first:first] = [text_of(row, col).lower() for row in new_rows]
+            if self.blobs is not None:
+                self.blobs[first:first] = [
+                    CELL_SEPARATOR.join(cells[row] for cells in self.cells) for row in new_rows
+                ]
+        self.numbers = {}
+
+    def invalidate(self):
+        """Drop the cell index after a large update, keeping the current mask"""
+        self.cells = None
+        self.blobs = None
+        self.numbers = {}
+        self.recheck = set()
+        self.last_terms = None
+
+    def remove_rows(self, first, last):
+        if self.cells is not None:
+            for cells in self.cells:
+                del cells[first:last + 1]
+            if self.blobs is not None:
+                del self.blobs[first:last + 1]
+        self.numbers = {}
+        if self.mask is not None:
+            del self.mask[first:last + 1]
+        self.row_count -= last - first + 1
+        self.recheck = set()
+        self.last_terms = None
+
+    def insert_rows_at(self, positions):
+        """Index rows inserted at scattered positions (ascending, final row numbers).
+
+        Existing rows keep their cells and mask bits; only the new rows are
+        read. New rows start out visible.
+        """
+        if self.cells is not None:
+            text_of = self.text_of
+            self.cells = [splice_in(cells, positions, [text_of(row, col).lower() for row in positions])
+                          for col, cells in enumerate(self.cells)]
+            cells = self.cells
+            if self.blobs is not None:
+                new_blobs = [CELL_SEPARATOR.join(column[row] for column in cells) for row in positions]
+                self.blobs = splice_in(self.blobs, positions, new_blobs)
+        if self.mask is not None:
+            self.mask = bytearray(splice_in(self.mask, positions, b"\x01" * len(positions)))
+        self.row_count += len(positions)
+        self.numbers = {}
+        self.recheck = set()
+        self.last_terms = None
+
+    def remove_rows_at(self, rows):
+        """Drop scattered rows (ascending, row numbers before the removal)"""
+        if self.cells is not None:
+            self.cells = [splice_out(cells, rows) for cells in self.cells]
+            if self.blobs is not None:
+                self.blobs = splice_out(self.blobs, rows)
+        if self.mask is not None:
+            self.mask = splice_out(self.mask, rows)
+        self.row_count -= len(rows)
+        self.numbers = {}
+        self.recheck = set()
+        self.last_terms = None
+
+    def insert_columns(self, first, count):
+        """Index newly inserted columns; row blobs are rejoined by the next search that needs them"""
+        if self.cells is not None:
+            for col in range(first, first + count):
+                self.cells.insert(col, self.column_cells(col))
+            self.blobs = None
+        self.numbers = {}
+        self.column_count += count
+        self.last_terms = None
+
+    def remove_columns(self, first, last):
+        if self.cells is not None:
+            del self.cells[first:last + 1]
+            self.blobs = None
+        self.numbers = {}
+        self.column_count -= last - first + 1
+        self.last_terms = None
+
+    def number_column(self, column):
+        numbers = self.numbers.get(column)
+        if numbers is None:
+            numbers = [to_number(text) for text in self.cells[column]]
+            self.numbers[column] = numbers
+        return numbers
+
+    def search(self, terms):
+        """Apply a parsed query and return the new row mask (None = show all)"""
+        if not terms:
+            self.mask = None
+            self.last_terms = None
+            self.recheck = set()
+            return None
+
+        self.ensure_built()
+
+        # Narrow from the previous result when the new query is stricter
+        if (self.mask is not None and self.last_terms is not None
+                and all(any(new.implies(old) for new in terms) for old in self.last_terms)):
+            candidates = set(compress(range(self.row_count), self.mask))
+            candidates.update(row for row in self.recheck if row < self.row_count)
+            candidates = sorted(candidates)
+            if METRICS.enabled:
+                METRICS.count("searches narrowed from the last result")
+        else:
+            candidates = range(self.row_count)
+            if METRICS.enabled:
+                METRICS.count("searches over every row")
+
+        for term in terms:
+            candidates = self.filter_rows(term, candidates)
+
+        mask = bytearray(self.row_count)
+        for row in candidates:
+            mask[row] = 1
+        self.mask = mask
+        self.last_terms = list(terms)
+        self.recheck = set()
+        return mask
+
+    def filter_rows(self, term, rows):
+        """Return the rows (in order) that satisfy one term"""
+        if term.column is None:
+            if term.op == ":" and CELL_SEPARATOR not in term.value:
+                value, blobs = term.value, self.row_blobs()
+                return [row for row in rows if value in blobs[row]]
+            columns = range(self.column_count)
+            cells = self.cells
+            return [row for row in rows
+                    if any(term.matches_text(cells[col][row]) for col in columns)]
+
+        if term.op in NUMERIC_OPS:
+            numbers = self.number_column(term.column)
+            matches_number = term.matches_number
+            return [row for row in rows if matches_number(numbers[row])]
+
+        cells = self.cells[term.column]
+        if term.op == ":":
+            value = term.value
+            return [row for row in rows if value in cells[row]]
+        matches_text = term.matches_text
+        return [row for row in rows if matches_text(cells[row])]
@@ -0,0 +1,195 @@
+"""Binary snapshot of a parsed catalog, kept next to the file.
+
+Parsing a large catalog and building its typed columns is the slowest
+part of opening it. After a parse, the ColumnStore is written to
+.<name>.snapshot as marshal data: column arrays as raw bytes, enum value
+tables, key orders and column schemas. On the next open the snapshot is
+memory-mapped and, when its header still matches the source file's size
+and mtime (or, if only the mtime moved, its SHA-1), the store is rebuilt
+from it without touching the JSON.
+
+A snapshot that does not match (or cannot be read) is ignored and the file
+is parsed again. Only object catalogs are snapshotted; inventory arrays
+load as CompactRecords and are left to the normal path. No Qt required.
+"""
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from catalog_core import LAYOUT_ARRAY, file_signature, read_catalog
+from catalog_metrics import METRICS
+from catalog_schema import MISSING, ColumnSchema, ColumnStore, EnumColumn, IntColumn, ObjectColumn
+
+# Magic (with format version), source size, source mtime_ns, source SHA-1
+SNAPSHOT_HEADER = struct.Struct("<8sQq20s")
+SNAPSHOT_MAGIC = b"ICSNAP01"
+
+# Array layouts differ between platforms; such snapshots are simply rebuilt
+PLATFORM = (sys.byteorder, array("I").itemsize, array("q").itemsize)
+
+
+def snapshot_path(catalog_path):
+    directory, name = os.path.split(os.path.abspath(catalog_path))
+    return os.path.join(directory, f".{name}.snapshot")
+
+
+def source_digest(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def pack_column(column):
+    if type(column) is EnumColumn:
+        return ("enum", column.codes.tobytes(), column.table[1:])
+    if type(column) is IntColumn:
+        return ("int", column.values.tobytes(), bytes(column.states), column.other)
+    present = bytes(value is not MISSING for value in column.values)
+    return ("objects", present, [value for value in column.values if value is not MISSING])
+
+
+def unpack_column(state):
+    kind = state[0]
+    if kind == "enum":
+        column = EnumColumn()
+        column.codes.frombytes(state[1])
+        column.table += state[2]
+        lookup = column.lookup
+        for code, value in enumerate(column.table):
+            if code:
+                try:
+                    lookup.setdefault((value.__class__, value), code)
+                except TypeError:
+                    pass
+        return column
+    if kind == "int":
+        column = IntColumn()
+        column.values.frombytes(state[1])
+        column.states = bytearray(state[2])
+        column.other = state[3]
+        return column
+    column = ObjectColumn()
+    values = iter(state[2])
+    column.values = [next(values) if present else MISSING for present in state[1]]
+    return column
+
+
+def pack_store(store, layout):
+    """Everything needed to rebuild a ColumnStore, as marshal-friendly values"""
+    return {
+        "platform": PLATFORM,
+        "layout": layout,
+        "ids": list(store.slots),
+        "slots": array("q", store.slots.values()).tobytes(),
+        "size": store.size,
+        "free": store.free,
+        "columns": [(key, store.schema[key].kind, store.schema[key].choices, pack_column(column))
+                    for key, column in store.columns.items()],
+        "orders": store.orders,
+        "loose": store.loose,
+    }
+
+
+def unpack_store(state):
+    store = ColumnStore()
+    slots = array("q")
+    slots.frombytes(state["slots"])
+    store.slots = dict(zip(state["ids"], slots))
+    store.size = state["size"]
+    store.free = state.get("free", [])
+    for position, (key, kind, choices, column_state) in enumerate(state["columns"]):
+        store.columns[key] = unpack_column(column_state)
+        store.positions[key] = position
+        store.schema[key] = ColumnSchema(key, kind, choices)
+    store.orders = state["orders"]
+    store.loose = state["loose"]
+    return store
+
+
+def load_snapshot(catalog_path):
+    """(items, layout) from a snapshot that matches the file, or None"""
+    cached = read_snapshot(catalog_path)
+    if METRICS.enabled:
+        METRICS.count("snapshot hits" if cached is not None else "snapshot misses")
+    return cached
+
+
+def read_snapshot(catalog_path):
+    signature = file_signature(catalog_path)
+    if signature is None:
+        return None
+    try:
+        with open(snapshot_path(catalog_path), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if len(mapped) < SNAPSHOT_HEADER.size:
+                    return None
+                magic, size, mtime_ns, digest = SNAPSHOT_HEADER.unpack_from(mapped)
+                if magic != SNAPSHOT_MAGIC or size != signature[0]:
+                    return None
+                # A touched (or copied) but unchanged file still matches by content
+                if mtime_ns != signature[1] and digest != source_digest(catalog_path):
+                    return None
+                with memoryview(mapped) as view:
+                    state = marshal.loads(view[SNAPSHOT_HEADER.size:])
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if not isinstance(state, dict) or state.get("platform") != PLATFORM:
+        return None
+    try:
+        return unpack_store(state), state["layout"]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def write_snapshot(catalog_path, items, layout, signature):
+    """Save items as the snapshot of catalog_path, if the file is still as it
+    was when signature was taken. Returns True if a snapshot was written."""
+    if layout == LAYOUT_ARRAY or not isinstance(items, ColumnStore):
+        return False
+    try:
+        digest = source_digest(catalog_path)
+        if signature is None or file_signature(catalog_path) != signature:
+            return False  # Changed while it was being read
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, signature[0], signature[1], digest)
+        payload = marshal.dumps(pack_store(items, layout))
+    except (OSError, ValueError):
+        return False
+
+    path = snapshot_path(catalog_path)
+    try:
+        fd, temp_path = tempfile.mkstemp(prefix=".snapshot-", suffix=".tmp", dir=os.path.dirname(path))
+    except OSError:
+        return False  # Read-only folder: no cache
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def read_catalog_cached(catalog_path):
+    """read_catalog through the snapshot: (items, layout, from_snapshot).
+
+    A parse refreshes the snapshot so the next open is fast.
+    """
+    cached = load_snapshot(catalog_path)
+    if cached is not None:
+        return cached[0], cached[1], True
+    signature = file_signature(catalog_path)
+    items, layout = read_catalog(catalog_path)
+    write_snapshot(catalog_path, items, layout, signature)
+    return items, layout, False
@@ -0,0 +1,340 @@
+"""Validation of item catalogs, many files at a time.
+
+validate_files() checks each catalog in a worker process (a
+ProcessPoolExecutor with one worker per CPU by default) and returns a
+JSON-friendly report:
+
+    {"files": {path: {"items": 301, "problems": [{"id": ..., "field": ...,
+                       "message": ...}], "error": None, "cached": False}},
+     "summary": {"files": 1, "failed": 0, "problems": 0, "cached": 0}}
+
+Files are read the way the editor opens them (any format in
+catalog_formats). Each item is checked for:
+
+- a unique, non-empty ID;
+- declared column types: enums (category, rarity, attachment_type) and
+  whole numbers (maxStackSize, maxDurability);
+- maxStackSize not negative, maxDurability -1 (unbreakable) or positive;
+- an icon that exists in the icons folder next to the catalog;
+- attachment_type and attachment_weapon set together, only on
+  attachments, with a known weapon class.
+
+Results are cached by the SHA-1 of the file, the icons folder listing and
+VALIDATOR_VERSION, so unchanged files are not read again. The cache is one
+file in the user's cache folder (CACHE_FILE). No Qt required.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog_core import LAYOUT_ARRAY, RECORD_ID_FIELD, file_signature, read_catalog
+from catalog_formats import format_for_path
+from catalog_schema import DECLARED_COLUMNS
+
+# Bump when the checks change, so cached results are not reused
+VALIDATOR_VERSION = 1
+
+
+def default_cache_path():
+    """Per-user results cache, e.g. ~/.cache/itemConfigsEditor/validate-cache.json"""
+    base = os.environ.get("LOCALAPPDATA" if os.name == "nt" else "XDG_CACHE_HOME")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "itemConfigsEditor", "validate-cache.json")
+
+
+# Cache file used when none is given
+CACHE_FILE = default_cache_path()
+
+# Weapon classes an attachment can be made for
+ATTACHMENT_WEAPONS = ("all", "light", "medium", "heavy", "noheavy", "shotgun", "scanner")
+
+ATTACHMENT_CATEGORY = "attachments"
+
+
+class Problem:
+    """Something wrong with one item (item_id None: with the file as a whole)"""
+
+    __slots__ = ("item_id", "field", "message")
+
+    def __init__(self, item_id, field, message):
+        self.item_id = item_id
+        self.field = field
+        self.message = message
+
+    def to_dict(self):
+        return {"id": self.item_id, "field": self.field, "message": self.message}
+
+    def describe(self):
+        return self.message if self.item_id is None else f"{self.item_id}: {self.message}"
+
+    def __repr__(self):
+        return f"Problem({self.item_id!r}, {self.field!r}, {self.message!r})"
+
+
+def check_item(item_id, item, icon_files=None):
+    """Problems of one item; icon_files is the set of names in the icons
+    folder (None skips the icon check)"""
+    problems = []
+    if not str(item_id).strip():
+        problems.append(Problem(item_id, None, "empty item ID"))
+    if not isinstance(item, Mapping):
+        problems.append(Problem(item_id, None, "item is not an object"))
+        return problems
+
+    for key, schema in DECLARED_COLUMNS.items():
+        if key in item:
+            message = schema.problem(item[key], icon_files)
+            if message is not None:
+                problems.append(Problem(item_id, key, message))
+
+    stack = item.get("maxStackSize")
+    if type(stack) is int and stack < 0:
+        problems.append(Problem(item_id, "maxStackSize", f"maxStackSize is negative ({stack})"))
+    durability = item.get("maxDurability")
+    if type(durability) is int and durability != -1 and durability <= 0:
+        problems.append(Problem(item_id, "maxDurability",
+                                f"maxDurability must be -1 (unbreakable) or positive, not {durability}"))
+
+    problems += check_attachment(item_id, item)
+    return problems
+
+
+def check_attachment(item_id, item):
+    """attachment_type and attachment_weapon belong together, and only on attachments"""
+    if "attachment_type" not in item and "attachment_weapon" not in item:
+        return []
+    kind = item.get("attachment_type") or ""
+    weapon = item.get("attachment_weapon") or ""
+    problems = []
+    if item.get("category") == ATTACHMENT_CATEGORY:
+        if not kind:
+            problems.append(Problem(item_id, "attachment_type", "attachment has no attachment_type"))
+        if not weapon:
+            problems.append(Problem(item_id, "attachment_weapon", "attachment has no attachment_weapon"))
+    elif kind or weapon:
+        field = "attachment_type" if kind else "attachment_weapon"
+        problems.append(Problem(item_id, field, f"{field} is set on a non-attachment "
+                                                f"({item.get('category') or 'no category'})"))
+    if weapon and weapon not in ATTACHMENT_WEAPONS:
+        problems.append(Problem(item_id, "attachment_weapon",
+                                f"{weapon!r} is not a known attachment_weapon ({', '.join(ATTACHMENT_WEAPONS)})"))
+    if (kind == "scanner") != (weapon == "scanner") and kind and weapon:
+        problems.append(Problem(item_id, "attachment_weapon",
+                                "scanner attachments go with the scanner weapon class, and only they do"))
+    return problems
+
+
+def read_checked(path):
+    """(items, layout, duplicate IDs) of a catalog, read as the editor would.
+
+    JSON files are streamed by read_catalog, which notices IDs given more
+    than once (json.load would keep only the last); other formats are
+    read item by item.
+    """
+    duplicates = []
+    catalog_format = format_for_path(path)
+    if catalog_format.name == "json":
+        items, layout = read_catalog(path, duplicates)
+        return items, layout, duplicates
+    layout, _, pairs = catalog_format.read_items(path)
+    items = {}
+    for item_id, item in pairs:
+        if item_id in items:
+            duplicates.append(item_id)
+        items[item_id] = item
+    return items, layout, duplicates
+
+
+def duplicate_record_ids(items):
+    """itemIds used by more than one record of an array catalog"""
+    seen, duplicates = set(), []
+    for record in items.values():
+        item_id = record.get(RECORD_ID_FIELD) if isinstance(record, Mapping) else None
+        if isinstance(item_id, str):
+            if item_id in seen:
+                duplicates.append(item_id)
+            seen.add(item_id)
+    return duplicates
+
+
+def icons_dir_for(path):
+    """Icons folder next to a catalog, as the editor uses it"""
+    return os.path.join(os.path.dirname(os.path.abspath(path)), "icons")
+
+
+def list_icons(icons_dir):
+    """Names in an icons folder, or None if there is no such folder"""
+    try:
+        return frozenset(os.listdir(icons_dir))
+    except OSError:
+        return None
+
+
+def validate_file(path, icon_files=None):
+    """Check one catalog; returns {"items", "problems", "error"} (JSON-friendly).
+
+    icon_files defaults to the names in the icons folder next to path.
+    """
+    if icon_files is None:
+        icon_files = list_icons(icons_dir_for(path))
+    try:
+        items, layout, duplicates = read_checked(path)
+    except (OSError, ValueError) as e:
+        return {"items": 0, "problems": [], "error": f"cannot load: {e}"}
+
+    problems = [Problem(item_id, None, "duplicate ID") for item_id in duplicates]
+    if layout == LAYOUT_ARRAY:
+        problems += [Problem(item_id, RECORD_ID_FIELD, "duplicate itemId") for item_id in duplicate_record_ids(items)]
+    else:
+        for item_id, item in items.items():
+            problems += check_item(item_id, item, icon_files)
+    return {"items": len(items), "problems": [problem.to_dict() for problem in problems], "error": None}
+
+
+def validate_job(job):
+    path, icon_names = job
+    return validate_file(path, None if icon_names is None else frozenset(icon_names))
+
+
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Validation results by content key, kept in one JSON file.
+
+    A file's key covers its bytes, its icons folder listing and
+    VALIDATOR_VERSION. Digests are remembered per path with the file's
+    (size, mtime), so an untouched file is not even hashed again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.digests = {}  # absolute path -> [size, mtime_ns, sha1]
+        self.results = {}  # key -> result
+        self.used = set()
+        self.changed = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == VALIDATOR_VERSION:
+                self.digests = state["digests"]
+                self.results = state["results"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass  # Missing or unreadable: start empty
+
+    def key(self, path, icons_key):
+        """Content key of a file, or None if it cannot be read"""
+        full_path = os.path.abspath(path)
+        signature = file_signature(full_path)
+        if signature is None:
+            return None
+        known = self.digests.get(full_path)
+        if known is not None and known[:2] == list(signature):
+            digest = known[2]
+        else:
+            try:
+                digest = file_digest(full_path)
+            except OSError:
+                return None
+            self.digests[full_path] = [signature[0], signature[1], digest]
+            self.changed = True
+        return f"{digest}:{icons_key}"
+
+    def get(self, key):
+        result = self.results.get(key)
+        if result is not None:
+            self.used.add(key)
+        return result
+
+    def put(self, key, result):
+        self.results[key] = result
+        self.used.add(key)
+        self.changed = True
+
+    def save(self):
+        """Write the cache, keeping only results used in this run and files that exist"""
+        if not self.changed and len(self.used) == len(self.results):
+            return
+        state = {
+            "version": VALIDATOR_VERSION,
+            "digests": {path: entry for path, entry in self.digests.items() if os.path.exists(path)},
+            "results": {key: result for key, result in self.results.items() if key in self.used},
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".validate-", suffix=".tmp", dir=directory)
+        except OSError:
+            return  # Read-only folder: no cache
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def icons_key(icon_names):
+    if icon_names is None:
+        return "no-icons"
+    return hashlib.sha1("\n".join(sorted(icon_names)).encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def validate_files(paths, jobs=None, cache_path=CACHE_FILE):
+    """Validate catalogs in parallel; returns the report (see the module docstring).
+
+    jobs is the number of worker processes (default: one per CPU; 1 checks
+    in this process). cache_path None disables the cache.
+    """
+    cache = ResultCache(cache_path) if cache_path else None
+    icons = {}  # icons folder -> (names, key)
+    results, todo = {}, []
+    for path in dict.fromkeys(paths):
+        folder = icons_dir_for(path)
+        if folder not in icons:
+            names = list_icons(folder)
+            icons[folder] = (names, icons_key(names))
+        names, key = icons[folder]
+        cache_key = cache.key(path, key) if cache is not None else None
+        cached = cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            results[path] = dict(cached, cached=True)
+        else:
+            todo.append((path, names, cache_key))
+
+    jobs = jobs or os.cpu_count() or 1
+    work = [(path, None if names is None else sorted(names)) for path, names, _ in todo]
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as executor:
+            checked = list(executor.map(validate_job, work))
+    else:
+        checked = [validate_job(job) for job in work]
+    for (path, _, cache_key), result in zip(todo, checked):
+        results[path] = dict(result, cached=False)
+        if cache is not None and cache_key is not None and result["error"] is None:
+            cache.put(cache_key, result)
+    if cache is not None:
+        cache.save()
+
+    files = {path: results[path] for path in dict.fromkeys(paths)}
+    return {
+        "files": files,
+        "summary": {
+            "files": len(files),
+            "failed": sum(1 for result in files.values() if result["problems"] or result["error"]),
+            "problems": sum(len(result["problems"]) for result in files.values()),
+            "cached": sum(1 for result in files.values() if result["cached"]),
+        },
+    }
@@ -0,0 +1,159 @@
+"""Background watching of the loaded catalog file.
+
+A QFileSystemWatcher reports changes, which are debounced so a tool that
+rewrites the file in several steps triggers one read. The file is parsed
+and fingerprinted on a worker thread; the editor only receives the result
+and applies the difference (see catalog_core.plan_reload).
+
+Saves made by the editor itself are recognised by the file's size and
+mtime and reported as such, so they refresh the fingerprints without
+being applied back. Tools that replace the file by renaming a new one
+over it make the watcher drop the path; it is added again as soon as the
+file reappears.
+"""
+import os
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from catalog_core import catalog_digests, file_signature, read_catalog_source
+from catalog_snapshot import read_catalog_cached
+
+# Quiet time after the last change notification before the file is read
+WATCH_DEBOUNCE_MS = 300
+
+
+class CatalogReadSignals(QObject):
+    # generation, snapshot dict (items, layout, digests, signature, source)
+    read = pyqtSignal(int, object)
+    # generation, error message
+    failed = pyqtSignal(int, str)
+
+
+class CatalogReadJob(QRunnable):
+    """Parse and fingerprint a catalog file off the GUI thread.
+
+    With keep_source the file is streamed to keep its text as well (a
+    CatalogSource for CatalogWriter.seed); otherwise a snapshot spares the
+    parse and source is None. A parse writes a new snapshot here too, so
+    the editor never serializes one on the GUI thread.
+    """
+
+    def __init__(self, signals, path, generation, keep_source=False):
+        super().__init__()
+        self.signals = signals
+        self.path = path
+        self.generation = generation
+        self.keep_source = keep_source
+
+    def run(self):
+        try:
+            signature = file_signature(self.path)
+            if self.keep_source:
+                items, layout, source = read_catalog_source(self.path)
+            else:
+                # A snapshot spares the parse; a real change refreshes it
+                items, layout, _ = read_catalog_cached(self.path)
+                source = None
+            snapshot = {
+                "items": items,
+                "layout": layout,
+                "digests": catalog_digests(items),
+                "signature": signature,
+                "source": source,
+            }
+        except (OSError, ValueError) as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.read.emit(self.generation, snapshot)
+
+
+class CatalogWatcher(QObject):
+    """Watches one catalog file and re-reads it in the background on change.
+
+    file_read(snapshot, own_save) fires with the parsed file; own_save is
+    True when the file is exactly what the editor last wrote.
+    """
+
+    file_read = pyqtSignal(object, bool)
+    read_failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.path = None
+        self.generation = 0
+        self.saved_signature = None
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(WATCH_DEBOUNCE_MS)
+        self.debounce.timeout.connect(self.read_now)
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.signals = CatalogReadSignals()
+        self.signals.read.connect(self.on_read)
+        self.signals.failed.connect(self.on_failed)
+
+    def watch(self, path):
+        """Watch path (and its folder, to notice the file being replaced)"""
+        self.unwatch()
+        self.path = os.path.abspath(path)
+        self.watcher.addPath(os.path.dirname(self.path))
+        if os.path.exists(self.path):
+            self.watcher.addPath(self.path)
+
+    def unwatch(self):
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.debounce.stop()
+        self.path = None
+        self.saved_signature = None
+        self.generation += 1  # Results of reads still running are dropped
+
+    def note_saved(self):
+        """Remember the file the editor just wrote, so its own save is recognised"""
+        if self.path is not None:
+            self.saved_signature = file_signature(self.path)
+
+    def on_file_changed(self, path):
+        if path == self.path:
+            self.debounce.start()
+
+    def on_directory_changed(self, directory):
+        if self.path is None:
+            return
+        if self.path not in self.watcher.files() and os.path.exists(self.path):
+            # Replaced by a rename: watch the new file and read it
+            self.watcher.addPath(self.path)
+            self.debounce.start()
+
+    def schedule(self):
+        """Read the file after the debounce delay"""
+        if self.path is not None:
+            self.debounce.start()
+
+    def read_now(self, keep_source=False):
+        """Read the file in the background now (keeping its text, see CatalogReadJob)"""
+        self.debounce.stop()
+        if self.path is None:
+            return
+        if self.path not in self.watcher.files() and os.path.exists(self.path):
+            self.watcher.addPath(self.path)
+        self.generation += 1
+        self.pool.start(CatalogReadJob(self.signals, self.path, self.generation, keep_source))
+
+    def on_read(self, generation, snapshot):
+        if generation != self.generation:
+            return  # A newer read is queued, or the file is no longer watched
+        own_save = snapshot["signature"] is not None and snapshot["signature"] == self.saved_signature
+        self.file_read.emit(snapshot, own_save)
+
+    def on_failed(self, generation, message):
+        # A tool may still be writing the file; a later change will trigger another read
+        if generation == self.generation:
+            self.read_failed.emit(message)
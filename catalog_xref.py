@@ -0,0 +1,201 @@
+"""Cross-reference index between item configs, inventories and icons.
+
+Answers, from hash maps kept in memory:
+
+* which configs no inventory record uses,
+* which inventory records point at a baseItemId with no config,
+* which config icons are missing from icons/, and
+* which files in icons/ no config refers to.
+
+Each source file contributes its own entries to shared reference counts.
+refresh() stats every source and only re-reads the ones whose size or
+mtime changed, subtracting their old contribution first; the icons folder
+is rescanned only when its mtime changes. No Qt required.
+"""
+import os
+from collections import Counter
+
+from catalog_core import LAYOUT_ARRAY, CatalogStream, file_signature, read_catalog
+
+CONFIG_FILES = ("itemConfigs.json", "_itemConfigs.json")
+INVENTORY_FILES = ("itemIds.json",)
+ICONS_DIR = "icons"
+
+INVENTORY_REF_FIELD = "baseItemId"
+
+
+class ConfigSource:
+    """Config IDs and their icons from one itemConfigs file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = None
+        self.icons = {}  # config_id -> icon filename ("" if none)
+        self.error = None
+
+    def read(self):
+        items, layout = read_catalog(self.path)
+        if layout == LAYOUT_ARRAY:
+            raise ValueError("expected an itemConfigs object, found an array")
+        self.icons = {
+            config_id: str(item.get("icon", "")).strip() if hasattr(item, "get") else ""
+            for config_id, item in items.items()
+        }
+
+
+class InventorySource:
+    """baseItemId references from one inventory file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = None
+        self.records = []  # (row ID, baseItemId)
+        self.error = None
+
+    def read(self):
+        records = []
+        stream = CatalogStream(self.path)
+        for record_id, record in stream:
+            base_id = record.get(INVENTORY_REF_FIELD) if hasattr(record, "get") else None
+            if base_id is not None:
+                records.append((record_id, str(base_id)))
+        if stream.layout != LAYOUT_ARRAY:
+            raise ValueError("expected an array of inventory records")
+        self.records = records
+
+
+class CrossReference:
+    """Incrementally maintained index over one game data folder"""
+
+    def __init__(self, folder, config_files=CONFIG_FILES, inventory_files=INVENTORY_FILES,
+                 icons_dir=ICONS_DIR):
+        self.folder = folder
+        self.configs = [ConfigSource(os.path.join(folder, name)) for name in config_files]
+        self.inventories = [InventorySource(os.path.join(folder, name)) for name in inventory_files]
+        self.icons_dir = os.path.join(folder, icons_dir)
+        self.icons_signature = None
+        self.icon_files = set()
+
+        self.config_counts = Counter()     # config_id -> number of config files defining it
+        self.reference_counts = Counter()  # baseItemId -> number of inventory records using it
+        self.icon_refs = Counter()         # icon filename -> number of configs using it
+
+    def refresh(self):
+        """Re-read the sources that changed since the last refresh.
+
+        Returns the paths that were re-read.
+        """
+        changed = []
+        for source in self.configs:
+            if self.refresh_source(source, self.add_config, self.remove_config):
+                changed.append(source.path)
+        for source in self.inventories:
+            if self.refresh_source(source, self.add_inventory, self.remove_inventory):
+                changed.append(source.path)
+        if self.refresh_icons():
+            changed.append(self.icons_dir)
+        return changed
+
+    def refresh_source(self, source, add, remove):
+        signature = file_signature(source.path)
+        if signature == source.signature:
+            return False
+        remove(source)
+        source.signature = signature
+        source.error = None
+        if signature is not None:
+            try:
+                source.read()
+            except (OSError, ValueError) as e:
+                source.error = str(e)
+        add(source)
+        return True
+
+    def add_config(self, source):
+        self.config_counts.update(source.icons.keys())
+        self.icon_refs.update(icon for icon in source.icons.values() if icon)
+
+    def remove_config(self, source):
+        self.config_counts.subtract(source.icons.keys())
+        self.icon_refs.subtract(icon for icon in source.icons.values() if icon)
+        source.icons = {}
+        self.drop_zero_counts(self.config_counts, self.icon_refs)
+
+    def add_inventory(self, source):
+        self.reference_counts.update(base_id for _, base_id in source.records)
+
+    def remove_inventory(self, source):
+        self.reference_counts.subtract(base_id for _, base_id in source.records)
+        source.records = []
+        self.drop_zero_counts(self.reference_counts)
+
+    @staticmethod
+    def drop_zero_counts(*counters):
+        for counter in counters:
+            for key in [key for key, count in counter.items() if count <= 0]:
+                del counter[key]
+
+    def refresh_icons(self):
+        """Rescan icons/ only when entries were added, removed or renamed"""
+        signature = file_signature(self.icons_dir)
+        if signature == self.icons_signature:
+            return False
+        self.icons_signature = signature
+        files = set()
+        if signature is not None:
+            try:
+                with os.scandir(self.icons_dir) as entries:
+                    files = {entry.name for entry in entries if entry.is_file()}
+            except OSError:
+                files = set()
+        self.icon_files = files
+        return True
+
+    # Queries
+
+    def unused_configs(self):
+        """Config IDs no inventory record uses"""
+        references = self.reference_counts
+        return sorted(config_id for config_id in self.config_counts if config_id not in references)
+
+    def missing_configs(self):
+        """(inventory path, record ID, baseItemId) for references with no config"""
+        configs = self.config_counts
+        return [(source.path, record_id, base_id)
+                for source in self.inventories
+                for record_id, base_id in source.records
+                if base_id not in configs]
+
+    def missing_icons(self):
+        """(config path, config ID, icon) for icons not found in icons/"""
+        files = self.icon_files
+        return [(source.path, config_id, icon)
+                for source in self.configs
+                for config_id, icon in source.icons.items()
+                if icon and icon not in files]
+
+    def orphaned_icons(self):
+        """Files in icons/ that no config refers to"""
+        references = self.icon_refs
+        return sorted(name for name in self.icon_files if name not in references)
+
+    def errors(self):
+        """(path, message) for sources that exist but could not be read"""
+        return [(source.path, source.error) for source in self.configs + self.inventories
+                if source.error]
+
+    def report(self):
+        """All query results as a JSON-friendly dict"""
+        return {
+            "unused_configs": self.unused_configs(),
+            "missing_configs": [
+                {"file": os.path.basename(path), "id": record_id, "baseItemId": base_id}
+                for path, record_id, base_id in self.missing_configs()
+            ],
+            "missing_icons": [
+                {"file": os.path.basename(path), "id": config_id, "icon": icon}
+                for path, config_id, icon in self.missing_icons()
+            ],
+            "orphaned_icons": self.orphaned_icons(),
+            "errors": [{"file": os.path.basename(path), "error": error} for path, error in self.errors()],
+        }
@@ -0,0 +1,294 @@
+"""Background, deduplicating import of icon files into the icons folder.
+
+Dropped files are read, optionally downscaled and written on a thread
+pool, so large or many images never block the table. Each file is
+identified by a hash of the bytes that would be written: if the icons
+folder already holds an identical file (or another file of the same batch
+produced it), that name is reused instead of writing a copy. Only existing
+files of the same size are ever hashed. New files never overwrite a
+different image; a numbered name is picked instead.
+
+The editor is told the outcome of the whole batch at once, so it can
+update the affected cells as a single undoable edit.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImageReader
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".svg")
+
+# Sources larger than this (in either dimension) are scaled down on import;
+# None keeps every image as it is
+ICON_MAX_SIZE = 512
+
+# Formats copied byte for byte: scaling would drop vector data or animation
+KEEP_AS_IS = (".svg", ".gif")
+
+JPEG_QUALITY = 90
+
+
+def is_image_file(path):
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def expand_sources(paths):
+    """Image files among paths, with folders searched recursively, in a stable order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(folder, name) for name in sorted(names) if is_image_file(name))
+        elif is_image_file(path):
+            files.append(path)
+    return files
+
+
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IconLibrary:
+    """Content-addressed view of one icons folder, shared by the import jobs"""
+
+    def __init__(self, icons_dir):
+        self.icons_dir = icons_dir
+        self.lock = threading.Lock()
+        self.by_size = None   # file size -> names, listed on first use
+        self.digests = {}     # name -> (size, mtime_ns, digest)
+        self.placed = {}      # digest -> name written or reused by this batch
+
+    def place(self, data, preferred_name):
+        """Store data under preferred_name (or a free variant of it) unless an
+        identical file exists. Returns (name, reused)."""
+        digest = hashlib.sha1(data).hexdigest()
+        with self.lock:
+            if self.by_size is None:
+                self.scan()
+            name = self.placed.get(digest) or self.find(len(data), digest)
+            if name is not None:
+                self.placed[digest] = name
+                return name, True
+            name = self.free_name(preferred_name)
+            self.placed[digest] = name
+            self.by_size.setdefault(len(data), set()).add(name)
+            self.digests[name] = (len(data), None, digest)
+        self.write(name, data)
+        return name, False
+
+    def scan(self):
+        self.by_size = {}
+        try:
+            with os.scandir(self.icons_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        self.by_size.setdefault(entry.stat().st_size, set()).add(entry.name)
+        except OSError:
+            pass  # The folder is created by the first write
+
+    def find(self, size, digest):
+        """Name of an existing file with this content, or None"""
+        for name in sorted(self.by_size.get(size, ())):
+            cached = self.digests.get(name)
+            if cached is not None and cached[1] is None:
+                if cached[2] == digest:
+                    return name  # Written earlier in this batch
+                continue
+            path = os.path.join(self.icons_dir, name)
+            try:
+                stat = os.stat(path)
+                if cached is None or cached[:2] != (stat.st_size, stat.st_mtime_ns):
+                    cached = (stat.st_size, stat.st_mtime_ns, file_digest(path))
+                    self.digests[name] = cached
+            except OSError:
+                continue
+            if cached[2] == digest:
+                return name
+        return None
+
+    def free_name(self, name):
+        stem, ext = os.path.splitext(name)
+        candidate, number = name, 2
+        taken = {taken.lower() for names in self.by_size.values() for taken in names}
+        while candidate.lower() in taken or os.path.exists(os.path.join(self.icons_dir, candidate)):
+            candidate = f"{stem}_{number}{ext}"
+            number += 1
+        return candidate
+
+    def write(self, name, data):
+        """Write a new icon atomically so a half-written file is never shown"""
+        os.makedirs(self.icons_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".import-", suffix=".tmp", dir=self.icons_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, os.path.join(self.icons_dir, name))
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+
+class IconImportSignals(QObject):
+    # batch id, source path, icon name, reused an identical file
+    imported = pyqtSignal(int, str, str, bool)
+    # batch id, source path, error message
+    failed = pyqtSignal(int, str, str)
+
+
+class IconImportJob(QRunnable):
+    """Prepare one source image and place it in the icons folder"""
+
+    def __init__(self, batch, source_path, preferred_name):
+        super().__init__()
+        self.batch = batch
+        self.source_path = source_path
+        self.preferred_name = preferred_name
+
+    def run(self):
+        batch = self.batch
+        if batch.cancelled:
+            batch.signals.failed.emit(batch.batch_id, self.source_path, "cancelled")
+            return
+        try:
+            data, ext = self.prepare()
+            stem = os.path.splitext(self.preferred_name)[0]
+            name, reused = batch.library.place(data, stem + ext)
+        except (OSError, ValueError) as e:
+            batch.signals.failed.emit(batch.batch_id, self.source_path, str(e))
+            return
+        batch.signals.imported.emit(batch.batch_id, self.source_path, name, reused)
+
+    def prepare(self):
+        """Bytes to store and their extension, scaled down if oversized"""
+        ext = os.path.splitext(self.source_path)[1].lower()
+        with open(self.source_path, "rb") as f:
+            data = f.read()
+        limit = self.batch.max_size
+        if limit is None or ext in KEEP_AS_IS:
+            return data, ext
+
+        source = QBuffer()
+        source.setData(QByteArray(data))
+        source.open(QIODevice.OpenModeFlag.ReadOnly)
+        reader = QImageReader(source)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if not size.isValid():
+            raise ValueError(f"not a readable image ({reader.errorString()})")
+        if size.width() <= limit and size.height() <= limit:
+            return data, ext
+
+        reader.setScaledSize(size.scaled(limit, limit, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            raise ValueError(reader.errorString())
+        target = QBuffer()
+        target.open(QIODevice.OpenModeFlag.WriteOnly)
+        if ext in (".jpg", ".jpeg"):
+            saved = image.save(target, "JPG", JPEG_QUALITY)
+        else:
+            ext = ".png"  # Lossless for everything else
+            saved = image.save(target, "PNG")
+        if not saved:
+            raise ValueError("could not re-encode the scaled image")
+        return bytes(target.data()), ext
+
+
+class IconImportBatch:
+    """Sources of one import and what became of them"""
+
+    def __init__(self, batch_id, icons_dir, sources, max_size, signals):
+        self.batch_id = batch_id
+        self.sources = sources  # [(source path, preferred name)]
+        self.max_size = max_size
+        self.signals = signals
+        self.library = IconLibrary(icons_dir)
+        self.cancelled = False
+        self.names = {}    # source path -> icon name
+        self.reused = set()
+        self.errors = {}   # source path -> message
+
+    @property
+    def done(self):
+        return len(self.names) + len(self.errors)
+
+    @property
+    def total(self):
+        return len(self.sources)
+
+
+class IconImporter(QObject):
+    """Runs one icon import at a time on a small thread pool.
+
+    progress(done, total) fires as files complete and finished(batch) once
+    every file was placed or failed.
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+
+    def __init__(self, max_size=ICON_MAX_SIZE, parent=None):
+        super().__init__(parent)
+        self.max_size = max_size
+        self.batch = None
+        self.batch_count = 0
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(4, QThreadPool.globalInstance().maxThreadCount())))
+        self.signals = IconImportSignals()
+        self.signals.imported.connect(self.on_imported)
+        self.signals.failed.connect(self.on_failed)
+
+    def busy(self):
+        return self.batch is not None
+
+    def start(self, sources, icons_dir):
+        """Import [(source path, preferred icon name)] into icons_dir; returns the batch"""
+        self.batch_count += 1
+        batch = IconImportBatch(self.batch_count, icons_dir, sources, self.max_size, self.signals)
+        self.batch = batch
+        for source_path, preferred_name in sources:
+            self.pool.start(IconImportJob(batch, source_path, preferred_name))
+        if not sources:
+            self.finish()
+        return batch
+
+    def cancel(self):
+        """Skip the files not started yet; the batch still finishes"""
+        if self.batch is not None:
+            self.batch.cancelled = True
+
+    def on_imported(self, batch_id, source_path, name, reused):
+        batch = self.batch
+        if batch is None or batch.batch_id != batch_id:
+            return
+        batch.names[source_path] = name
+        if reused:
+            batch.reused.add(source_path)
+        self.step()
+
+    def on_failed(self, batch_id, source_path, message):
+        batch = self.batch
+        if batch is None or batch.batch_id != batch_id:
+            return
+        batch.errors[source_path] = message
+        self.step()
+
+    def step(self):
+        self.progress.emit(self.batch.done, self.batch.total)
+        if self.batch.done >= self.batch.total:
+            self.finish()
+
+    def finish(self):
+        batch, self.batch = self.batch, None
+        self.finished.emit(batch)
@@ -0,0 +1,208 @@
+"""Lazy, cached icon thumbnails.
+
+Icons are decoded on a background thread pool only when a view asks for
+them, downscaled once while decoding, and kept in two caches:
+
+* an in-memory LRU of small QPixmaps bounded by a byte budget, and
+* an on-disk PNG cache keyed by a hash of the source path, size and mtime,
+  so the next session skips decoding the full-size originals entirely.
+
+Full-resolution images only ever exist briefly inside a worker thread.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt6.QtCore import QObject, QRunnable, QStandardPaths, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+from catalog_metrics import METRICS
+
+# Pool priority of decodes queued ahead of need; visible icons go first
+PREFETCH_PRIORITY = -1
+
+
+def thumbnail_cache_dir():
+    """Directory for on-disk thumbnails, shared by every editor instance"""
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache", "itemConfigsEditor")
+    return os.path.join(base, "thumbnails")
+
+
+class ThumbnailSignals(QObject):
+    # name, decoded thumbnail (null image if the file could not be read)
+    decoded = pyqtSignal(str, QImage)
+
+
+class ThumbnailJob(QRunnable):
+    """Decode one icon into a thumbnail, using the disk cache when possible"""
+
+    def __init__(self, cache, name, source_path):
+        super().__init__()
+        self.cache = cache
+        self.name = name
+        self.source_path = source_path
+        self.started = False
+
+    def run(self):
+        with self.cache.lock:
+            if self.cache.pending.get(self.name) is not self:
+                return  # Cancelled while queued
+            self.started = True
+
+        image = QImage()
+        try:
+            stat = os.stat(self.source_path)
+            disk_path = self.cache.disk_path(self.source_path, stat)
+            if os.path.exists(disk_path):
+                image.load(disk_path)
+            if image.isNull():
+                with METRICS.timed("icon decode"):
+                    image = self.decode_scaled()
+                if not image.isNull():
+                    self.cache.store_on_disk(image, disk_path)
+        except OSError:
+            image = QImage()
+        self.cache.signals.decoded.emit(self.name, image)
+
+    def decode_scaled(self):
+        reader = QImageReader(self.source_path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        limit = self.cache.size
+        if size.isValid() and (size.width() > limit or size.height() > limit):
+            # Lets decoders that support it (JPEG, SVG) skip full-size decoding
+            reader.setScaledSize(size.scaled(limit, limit, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return image
+        if image.width() > limit or image.height() > limit:
+            image = image.scaled(limit, limit, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        return image
+
+
+class ThumbnailCache(QObject):
+    """Size-bounded LRU of icon thumbnails backed by a background decoder.
+
+    get() never blocks: it returns the cached pixmap or None and queues a
+    decode; thumbnail_ready(name) fires once the pixmap is available.
+    """
+
+    thumbnail_ready = pyqtSignal(str)
+
+    def __init__(self, icons_dir, size=32, max_bytes=16 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.icons_dir = icons_dir
+        self.size = size
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.pixmaps = OrderedDict()
+        self.failed = set()
+        self.pending = {}
+        self.lock = threading.Lock()
+
+        self.disk_dir = os.path.join(thumbnail_cache_dir(), str(size))
+        os.makedirs(self.disk_dir, exist_ok=True)
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, QThreadPool.globalInstance().maxThreadCount() - 1))
+
+        self.signals = ThumbnailSignals()
+        self.signals.decoded.connect(self.on_decoded)
+
+    def set_icons_dir(self, icons_dir):
+        """Point the cache at another icons folder, dropping what was cached"""
+        if os.path.abspath(icons_dir) == os.path.abspath(self.icons_dir):
+            return
+        self.cancel_queued()
+        self.icons_dir = icons_dir
+        self.pixmaps.clear()
+        self.used_bytes = 0
+        self.failed.clear()
+
+    def get(self, name):
+        """Return the thumbnail for an icon filename, or None while it loads"""
+        pixmap = self.pixmaps.get(name)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(name)
+            if METRICS.enabled:
+                METRICS.count("thumbnail cache hits")
+            return pixmap
+        if METRICS.enabled:
+            METRICS.count("thumbnail cache misses")
+        self.request(name)
+        return None
+
+    def prefetch(self, names):
+        """Queue decodes for icons that are likely to be shown soon"""
+        for name in names:
+            if name not in self.pixmaps:
+                self.request(name, PREFETCH_PRIORITY)
+
+    def request(self, name, priority=0):
+        if not name or name in self.failed:
+            return
+        with self.lock:
+            if name in self.pending:
+                return
+            job = ThumbnailJob(self, name, os.path.join(self.icons_dir, name))
+            self.pending[name] = job
+        self.pool.start(job, priority)
+
+    def cancel_queued(self):
+        """Drop decodes that have not started, e.g. for rows scrolled out of view"""
+        if not self.pending:
+            return  # Called on every scroll step; clearing an idle pool is not free
+        self.pool.clear()
+        with self.lock:
+            for name, job in list(self.pending.items()):
+                if not job.started:
+                    del self.pending[name]
+
+    def invalidate(self, name):
+        """Forget a thumbnail whose source file was replaced"""
+        pixmap = self.pixmaps.pop(name, None)
+        if pixmap is not None:
+            self.used_bytes -= self.pixmap_bytes(pixmap)
+        self.failed.discard(name)
+
+    def on_decoded(self, name, image):
+        with self.lock:
+            self.pending.pop(name, None)
+        if image.isNull():
+            self.failed.add(name)
+            return
+
+        pixmap = QPixmap.fromImage(image)
+        self.pixmaps[name] = pixmap
+        self.used_bytes += self.pixmap_bytes(pixmap)
+        while self.used_bytes > self.max_bytes and len(self.pixmaps) > 1:
+            _, evicted = self.pixmaps.popitem(last=False)
+            self.used_bytes -= self.pixmap_bytes(evicted)
+        self.thumbnail_ready.emit(name)
+
+    def disk_path(self, source_path, stat):
+        key = f"{os.path.abspath(source_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return os.path.join(self.disk_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def store_on_disk(self, image, disk_path):
+        """Write a thumbnail atomically so a half-written file is never read"""
+        temp_path = f"{disk_path}.{threading.get_ident()}.tmp"
+        try:
+            if image.save(temp_path, "PNG"):
+                os.replace(temp_path, disk_path)
+        except OSError:
+            pass
+        finally:
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
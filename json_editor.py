@@ -1,27 +1,1121 @@
-import sys, json, os, shutil
+import sys, os, time, json, hashlib
+
+# Process start as seen by the editor, for the time-to-first-paint report
+STARTED = time.perf_counter()
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QMessageBox,
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
-    QTableWidgetItem, QAbstractItemView, QLineEdit, QLabel,
-    QInputDialog, QHeaderView, QComboBox, QMenu
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView,
+    QAbstractItemView, QLineEdit, QLabel,
+    QInputDialog, QHeaderView, QComboBox, QMenu, QProgressBar,
+    QDialog, QDialogButtonBox, QTabWidget, QListWidget, QListWidgetItem,
+    QStyledItemDelegate, QToolTip, QDockWidget, QTableWidget, QTableWidgetItem, QListView
 )
-from PyQt6.QtCore import Qt, QMimeData
-from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QPixmap, QAction
+from PyQt6.QtCore import (
+    Qt, QMimeData, QAbstractTableModel, QAbstractProxyModel, QModelIndex, QSortFilterProxyModel, QTimer, QSize,
+    QObject, QEvent, QPoint, QRect, QSettings, pyqtSignal
+)
+from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QPixmap, QAction, QKeySequence, QColor, QPen
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from itertools import compress
+
+from catalog_core import (
+    LAYOUT_ARRAY, LAYOUT_ITEM_CONFIGS, NUMERIC_FIELDS, CatalogStream, CatalogWriter, EditJournal, catalog_columns,
+    catalog_digests, cell_text, coerce_value, compile_expression, duplicate_records, encode_records, extend_columns,
+    file_signature, json_default, peek_json_start, plan_reload, read_catalog_source, scale_records, set_records,
+    value_text
+)
+from catalog_diff import ADDED, CHANGED, REMOVED, diff_catalogs
+from catalog_formats import FORMATS, SqliteItems, export_catalog, file_filters, format_for_path, read_any
+from catalog_metrics import METRICS, NULL_TIMER, OPERATIONS
+from catalog_schema import KIND_ENUM, KIND_PATH, MISSING, ColumnStore, column_schema, detach
+from catalog_search import SearchIndex, parse_query
+from catalog_snapshot import load_snapshot
+from catalog_watch import CatalogWatcher
+from catalog_xref import CrossReference
+from icon_import import IconImporter, expand_sources, is_image_file
+from icon_thumbnails import ThumbnailCache
+from undo_commands import EditCellCommand, RecordCommand, UndoHistory
+
+# Above this many separate row ranges, bulk inserts/removes reset the model once
+BATCH_RESET_RANGES = 64
+
+# Approximate memory the undo history may hold before old steps are dropped
+UNDO_MEMORY_LIMIT = 64 * 1024 * 1024
+
+# Files above this size (and all top-level arrays) are loaded in the background
+STREAM_LOAD_BYTES = 1024 * 1024
+
+# Time the streaming loader may hold the event loop per step
+STREAM_STEP_SECONDS = 0.03
+
+# Settings group holding each file's column order and widths
+COLUMN_LAYOUT_GROUP = "columnLayouts"
+
+# Text color of cells whose value does not fit the column's schema
+PROBLEM_COLOR = QColor(200, 30, 30)
+
+# Gallery tiles: thumbnail edge and tile size in pixels
+GALLERY_THUMBNAIL_SIZE = 96
+GALLERY_TILE_SIZE = QSize(128, 136)
+
+# Tile frame per rarity (unknown rarities get a thin neutral frame)
+RARITY_COLORS = {
+    "common": QColor(150, 150, 150),
+    "uncommon": QColor(60, 170, 70),
+    "rare": QColor(50, 120, 220),
+    "epic": QColor(150, 70, 200),
+    "legendary": QColor(235, 150, 20),
+    "exotic": QColor(220, 50, 60),
+}
+RARITY_PENS = {rarity: QPen(color, 3) for rarity, color in RARITY_COLORS.items()}
+
+# Row tints of the compare view
+DIFF_COLORS = {
+    ADDED: QColor(220, 245, 220),
+    REMOVED: QColor(255, 225, 225),
+    CHANGED: QColor(255, 243, 205),
+}
+
+class ItemTableModel(QAbstractTableModel):
+    """Table model that reads item configs straight from the editor's data dict.
+
+    Cell text is produced on demand for the cells the view asks for, so no
+    per-cell objects are allocated when a catalog is loaded. Edits are
+    parsed by the column's schema (see catalog_schema); values that do not
+    fit are refused with edit_rejected, and stored ones are flagged in place.
+    """
+
+    # Source index and message of an edit the column's type refused
+    edit_rejected = pyqtSignal(QModelIndex, str)
 
-class DragDropTableWidget(QTableWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.item_data = {}
+        self.store = None  # item_data when it is a typed ColumnStore
+        self.icon_files = None  # Names in the icons folder, for flagging missing icons
+        self.item_ids = []  # Row order; item_data is only used for lookups
+        self.columns = ["ID"] + catalog_columns({})
+        self.thumbnails = None  # ThumbnailCache for the icon column, if any
+        self.writer = CatalogWriter()  # Tracks dirty items for incremental saves
+        self.undo_stack = None  # Edits are pushed here as commands when set
+        self.journal = None  # EditJournal receiving every applied edit
+        self.id_rows = None  # item_id -> row, rebuilt lazily after row moves
+        self.changed_cells = None  # [top, left, bottom, right] touched while applying a batch
+        self.reset_rows = None  # ("insert"/"remove", rows) while a batch reset is announced
+        self.sort_cache = {}  # column key (None for IDs) -> sort key of every row
+
+    def set_thumbnail_cache(self, thumbnails):
+        """Show icon thumbnails from a ThumbnailCache in the icon column"""
+        self.thumbnails = thumbnails
+        thumbnails.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+    def on_thumbnail_ready(self, name):
+        # Views only repaint the visible cells, so announcing the whole column is cheap
+        col = self.column_of("icon")
+        if col != -1 and self.item_ids:
+            self.dataChanged.emit(self.index(0, col), self.index(len(self.item_ids) - 1, col),
+                                  [Qt.ItemDataRole.DecorationRole])
+
+    def set_icon_files(self, icon_files):
+        """Names in the icons folder (None skips the check); icon cells are re-checked"""
+        self.icon_files = icon_files
+        col = self.column_of("icon")
+        if col != -1 and self.item_ids:
+            self.dataChanged.emit(self.index(0, col), self.index(len(self.item_ids) - 1, col),
+                                  [Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.ToolTipRole])
+
+    def set_item_data(self, item_data, layout=None):
+        """Point the model at a new item dict and rebuild the column list"""
+        self.beginResetModel()
+        self.item_data = item_data if item_data is not None else {}
+        self.store = self.item_data if isinstance(self.item_data, ColumnStore) else None
+        self.item_ids = list(self.item_data.keys())
+        self.id_rows = None
+        self.sort_cache = {}
+        self.writer.reset(layout)
+        # Standard columns plus any additional keys found in the data
+        self.columns = ["ID"] + catalog_columns(self.item_data, self.writer.layout)
+        self.endResetModel()
+
+    def add_columns_for(self, items):
+        """Add columns for keys of items that have none yet (no edit is recorded)"""
+        new_columns = extend_columns(list(self.columns), items)
+        if len(new_columns) > len(self.columns):
+            first = len(self.columns)
+            self.beginInsertColumns(QModelIndex(), first, len(new_columns) - 1)
+            self.columns = new_columns
+            self.endInsertColumns()
+
+    def append_items(self, pairs):
+        """Append (item_id, item) pairs at the end, e.g. as a file streams in.
+
+        Loaded items are not edits, so the writer is not marked.
+        """
+        self.add_columns_for(item for _, item in pairs)
+
+        pairs = [(item_id, item) for item_id, item in pairs if item_id not in self.item_data]
+        if not pairs:
+            return
+        first = len(self.item_ids)
+        with METRICS.timed("populate"):
+            self.beginInsertRows(QModelIndex(), first, first + len(pairs) - 1)
+            if self.store is not None:
+                self.store.extend(pairs)  # Fills each typed column in one pass
+            else:
+                for item_id, item in pairs:
+                    self.item_data[item_id] = item
+            for item_id, _ in pairs:
+                self.item_ids.append(item_id)
+                if self.id_rows is not None:
+                    self.id_rows[item_id] = len(self.item_ids) - 1
+            self.sort_cache = {}
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.item_ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self.cell_text(index.row(), index.column())
+        if (role == Qt.ItemDataRole.DecorationRole and self.thumbnails is not None
+                and self.columns[index.column()] == "icon"):
+            # Only cells being painted get here, so only visible icons are decoded
+            return self.thumbnails.get(self.cell_text(index.row(), index.column()).strip())
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return PROBLEM_COLOR if self.cell_problem(index.row(), index.column()) else None
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.cell_problem(index.row(), index.column())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.columns[section] if 0 <= section < len(self.columns) else None
+        return str(section + 1)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if index.column() == 0 and self.writer.layout == LAYOUT_ARRAY:
+            # Array rows are keyed by position; their IDs are not saved
+            return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        return (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+                | Qt.ItemFlag.ItemIsEditable)
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        row, col = index.row(), index.column()
+        item_id = self.item_ids[row]
+
+        if col == 0:
+            # Renaming an item keeps its position in the row order
+            new_id = str(value).strip()
+            if not new_id or (new_id != item_id and new_id in self.item_data):
+                return False
+            if new_id == item_id:
+                return True
+            self.push_records([{"op": "rename", "id": item_id, "to": new_id}], f"Rename {item_id}")
+            return True
+
+        key = self.columns[col]
+        item = self.item_data.get(item_id)
+        current = item.get(key) if isinstance(item, Mapping) else None
+        try:
+            new_value = coerce_value(key, value, current, self.column_schema(key))
+        except ValueError as e:
+            self.edit_rejected.emit(index, str(e))
+            return False
+        if (isinstance(item, Mapping) and key in item and item[key] == new_value
+                and type(item[key]) is type(new_value)):
+            return True  # Editor closed without a change
+        record = {"op": "set", "id": item_id, "key": key, "value": new_value}
+        self.push_records([record], f"Edit {key} of {item_id}", EditCellCommand)
+        return True
+
+    def apply_external(self, records, item_ids, new_items):
+        """Apply changes read from the file on disk (see plan_reload).
+
+        They are not undoable or journaled, and the touched items count as
+        saved again; modified items take the file's version so its key
+        order is kept.
+        """
+        self.add_columns_for(new_items[item_id] for item_id in item_ids if item_id in new_items)
+        self.apply_records(records)
+        for item_id in item_ids:
+            if item_id in self.item_data and item_id in new_items:
+                self.item_data[item_id] = new_items[item_id]
+        self.sort_cache = {}
+        self.writer.mark_clean(item_ids)
+
+    def cell_text(self, row, col):
+        """Return the display text of a cell"""
+        item_id = self.item_ids[row]
+        if col == 0:
+            return str(item_id)
+        if self.store is not None:
+            return value_text(self.store.value(item_id, self.columns[col]))
+        return cell_text(self.item_data.get(item_id), self.columns[col])
+
+    def field_text(self, row, key):
+        """Display text of one field of a row by key ("" if it has none)"""
+        item_id = self.item_ids[row]
+        if self.store is not None:
+            return value_text(self.store.value(item_id, key))
+        return cell_text(self.item_data.get(item_id), key)
+
+    def column_texts(self, col):
+        """Display text of every row of a column, read column-wise from a ColumnStore"""
+        if col == 0:
+            return [str(item_id) for item_id in self.item_ids]
+        key = self.columns[col]
+        if self.store is not None:
+            return self.store.column_values(key, self.item_ids, value_text)
+        get = self.item_data.get
+        return [cell_text(get(item_id), key) for item_id in self.item_ids]
+
+    def cell_value(self, row, col, default=None):
+        """Return the stored value of a cell (default when the item has none)"""
+        item_id = self.item_ids[row]
+        if self.store is not None:
+            return self.store.value(item_id, self.columns[col], default)
+        item = self.item_data.get(item_id)
+        return item.get(self.columns[col], default) if isinstance(item, Mapping) else default
+
+    def column_schema(self, key):
+        """ColumnSchema of a column: inferred from the data, or the declared one"""
+        if self.store is not None and key in self.store.schema:
+            return self.store.schema[key]
+        return column_schema(key)
+
+    def column_choices(self, col):
+        """Values offered when editing an enum column (None for other columns)"""
+        if col < 1:
+            return None
+        key = self.columns[col]
+        if self.column_schema(key).kind != KIND_ENUM:
+            return None
+        if self.store is not None:
+            return self.store.choices(key)
+        return list(self.column_schema(key).choices)
+
+    def cell_problem(self, row, col):
+        """Why a cell's value does not fit its column, or None"""
+        if col < 1:
+            return None
+        value = self.cell_value(row, col, None)
+        if value is None:
+            return None
+        schema = self.column_schema(self.columns[col])
+        return schema.problem(value, self.icon_files if schema.kind == KIND_PATH else None)
+
+    def sort_keys(self, col):
+        """Sort key of every row of a column: numbers for numeric columns, text otherwise.
+
+        Keys are built column-wise once and cached until rows are added or
+        removed; edits update their own entry.
+        """
+        key = self.columns[col] if col > 0 else None
+        keys = self.sort_cache.get(key)
+        if keys is None:
+            keys = self.sort_cache[key] = self.build_sort_keys(col)
+            if METRICS.enabled:
+                METRICS.count("sort keys built", len(keys))
+        return keys
+
+    def build_sort_keys(self, col):
+        if col > 0:
+            key = self.columns[col]
+            schema = self.column_schema(key)
+            if schema.sort_key(None) is not None:
+                if self.store is not None:
+                    return self.store.column_values(key, self.item_ids, schema.sort_key, None)
+                return [schema.sort_key(self.cell_value(row, col)) for row in range(len(self.item_ids))]
+        return self.column_texts(col)
+
+    def update_sort_key(self, row, key):
+        """Refresh the cached sort key of one cell after an edit"""
+        keys = self.sort_cache.get(key)
+        if keys is None:
+            return
+        col = self.column_of(key) if key is not None else 0
+        if col == -1:
+            del self.sort_cache[key]
+            return
+        schema = self.column_schema(key) if col > 0 else None
+        sort_key = schema.sort_key(self.cell_value(row, col)) if schema is not None else None
+        if sort_key is None:
+            sort_key = self.cell_text(row, col)
+        if (type(sort_key) is str) != (type(keys[0]) is str):
+            del self.sort_cache[key]  # The column's type changed; rebuild when next sorted
+            return
+        keys[row] = sort_key
+
+    def column_of(self, name):
+        """Return the column index for a header name, or -1"""
+        try:
+            return self.columns.index(name)
+        except ValueError:
+            return -1
+
+    def row_for(self, item_id):
+        """Return the row of an item ID, or -1"""
+        if self.id_rows is None:
+            self.id_rows = {item_id: row for row, item_id in enumerate(self.item_ids)}
+        return self.id_rows.get(item_id, -1)
+
+    def push_records(self, records, text, command_class=RecordCommand):
+        """Apply edit records through the undo stack (or directly without one)"""
+        if self.undo_stack is not None:
+            self.undo_stack.push(command_class(self, records, text))
+        else:
+            self.apply_records(records)
+
+    def journal_records(self, records):
+        """Append applied records to the edit journal; returns their encoded size"""
+        encoded = encode_records(records)
+        if self.journal is not None:
+            self.journal.append(encoded)
+        return len(encoded)
+
+    def apply_records(self, records):
+        """Apply edit records and return the records that undo them.
+
+        Records are plain dicts so they can be journaled as JSON:
+            {"op": "set", "id": ..., "key": ..., "value": ...}
+            {"op": "unset", "id": ..., "key": ...}
+            {"op": "rename", "id": ..., "to": ...}
+            {"op": "remove", "ids": [...]}
+            {"op": "insert", "rows": [[position, id, item], ...]}
+            {"op": "add_column", "name": ..., "position": ..., "values": {id: value}}
+            {"op": "remove_column", "name": ...}
+            {"op": "rename_column", "name": ..., "to": ...}
+        Records that no longer apply (e.g. an unknown ID while replaying a
+        journal) are skipped.
+        """
+        inverse = []
+        # Cell changes are announced once for the whole batch, not per record
+        self.changed_cells = [] if len(records) > 1 else None
+        try:
+            for record in records:
+                undo_record = self.apply_record(record)
+                if undo_record is not None:
+                    inverse.append(undo_record)
+        finally:
+            self.flush_changed_cells()
+            self.changed_cells = None
+        inverse.reverse()
+        return inverse
+
+    def flush_changed_cells(self):
+        """Emit one dataChanged covering the cells changed since the last flush"""
+        if not self.changed_cells:
+            return
+        top, left, bottom, right = self.changed_cells
+        self.dataChanged.emit(self.index(top, left), self.index(bottom, right),
+                              [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        self.changed_cells = []
+
+    def apply_record(self, record):
+        op = record["op"]
+        if op in ("set", "unset"):
+            return self.apply_set(record)
+        # Row numbers collected so far would be stale after rows move
+        self.flush_changed_cells()
+        if op == "rename":
+            return self.rename_item(record["id"], record["to"])
+        if op == "remove":
+            return self.remove_items(record["ids"])
+        if op == "insert":
+            return self.insert_items(record["rows"])
+        if op == "add_column":
+            return self.insert_column(record["name"], record.get("position"), record.get("values"))
+        if op == "remove_column":
+            return self.remove_column(record["name"])
+        if op == "rename_column":
+            return self.rename_column(record["name"], record["to"])
+        raise ValueError(f"Unknown edit record: {op}")
+
+    def apply_set(self, record):
+        item_id, key = record["id"], record["key"]
+        row = self.row_for(item_id)
+        if row == -1:
+            return None
+        item = self.item_data.get(item_id)
+        if not isinstance(item, Mapping):
+            self.item_data[item_id] = {}
+            item = self.item_data[item_id]  # A ColumnStore keeps its own copy
+
+        if METRICS.enabled:
+            METRICS.count("rows touched")
+        if key in item:
+            inverse = {"op": "set", "id": item_id, "key": key, "value": item[key]}
+        else:
+            inverse = {"op": "unset", "id": item_id, "key": key}
+        if record["op"] == "set":
+            item[key] = record["value"]
+        else:
+            item.pop(key, None)
+        self.writer.mark_cell(item_id, key)
+        self.update_sort_key(row, key)
+
+        col = self.column_of(key)
+        if col != -1:
+            cells = self.changed_cells
+            if cells:
+                cells[:] = min(cells[0], row), min(cells[1], col), max(cells[2], row), max(cells[3], col)
+            elif cells is not None:
+                cells[:] = row, col, row, col
+            else:
+                index = self.index(row, col)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        return inverse
+
+    def rename_item(self, item_id, new_id):
+        row = self.row_for(item_id)
+        if row == -1 or new_id in self.item_data:
+            return None
+        self.item_data[new_id] = self.item_data.pop(item_id)
+        self.item_ids[row] = new_id
+        self.id_rows.pop(item_id, None)
+        self.id_rows[new_id] = row
+        self.writer.mark_renamed(item_id, new_id)
+        self.update_sort_key(row, None)
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        return {"op": "rename", "id": new_id, "to": item_id}
+
+    def remove_items(self, item_ids):
+        """Remove rows by ID; many scattered rows are removed in one model reset"""
+        rows = sorted(row for row in map(self.row_for, item_ids) if row != -1)
+        if not rows:
+            return None
+        # Snapshots: a removed item's slot in a ColumnStore does not keep its values
+        removed = [[row, self.item_ids[row], detach(self.item_data.get(self.item_ids[row]))] for row in rows]
+        if METRICS.enabled:
+            METRICS.count("rows touched", len(rows))
+
+        ranges = contiguous_ranges(rows)
+        if len(ranges) > BATCH_RESET_RANGES:
+            # One pass over the row list instead of one removal per range
+            self.beginResetModel()
+            for _, item_id, _ in removed:
+                self.item_data.pop(item_id, None)
+                self.writer.mark_removed(item_id)
+            removed_rows = set(rows)
+            self.item_ids = [item_id for row, item_id in enumerate(self.item_ids) if row not in removed_rows]
+            self.id_rows = None
+            self.sort_cache = {}
+            self.end_batch_reset("remove", rows)
+            return {"op": "insert", "rows": removed}
+
+        for first, last in reversed(ranges):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for item_id in self.item_ids[first:last + 1]:
+                self.item_data.pop(item_id, None)
+                self.writer.mark_removed(item_id)
+            del self.item_ids[first:last + 1]
+            self.id_rows = None
+            self.sort_cache = {}
+            self.endRemoveRows()
+        return {"op": "insert", "rows": removed}
+
+    def insert_items(self, rows):
+        """Insert [position, id, item] rows, given in ascending position order"""
+        rows = [entry for entry in rows if entry[1] not in self.item_data]
+        if not rows:
+            return None
+        if METRICS.enabled:
+            METRICS.count("rows touched", len(rows))
+
+        for _, item_id, item in rows:
+            self.item_data[item_id] = item if item is not None else {}
+            self.writer.mark_item(item_id)
+
+        ranges = contiguous_ranges([position for position, _, _ in rows])
+        if len(ranges) > BATCH_RESET_RANGES:
+            # Merge the new IDs into the row list in one pass
+            self.beginResetModel()
+            old_ids = iter(self.item_ids)
+            item_ids, positions = [], []
+            for position, item_id, _ in rows:
+                while len(item_ids) < position:
+                    existing = next(old_ids, None)
+                    if existing is None:
+                        break
+                    item_ids.append(existing)
+                positions.append(len(item_ids))
+                item_ids.append(item_id)
+            item_ids.extend(old_ids)
+            self.item_ids = item_ids
+            self.id_rows = None
+            self.sort_cache = {}
+            self.end_batch_reset("insert", positions)
+            return {"op": "remove", "ids": [item_id for _, item_id, _ in rows]}
+
+        offset = 0
+        for first, last in ranges:
+            count = last - first + 1
+            entries = rows[offset:offset + count]
+            offset += count
+            first = min(first, len(self.item_ids))
+            self.beginInsertRows(QModelIndex(), first, first + count - 1)
+            self.item_ids[first:first] = [item_id for _, item_id, _ in entries]
+            self.id_rows = None
+            self.sort_cache = {}
+            self.endInsertRows()
+        return {"op": "remove", "ids": [item_id for _, item_id, _ in rows]}
+
+    def end_batch_reset(self, op, rows):
+        """End a reset that only inserted or removed rows, telling listeners which.
+
+        reset_rows is set while modelReset is emitted, so e.g. the search
+        index can splice rows instead of re-reading the whole table.
+        """
+        self.reset_rows = (op, rows)
+        try:
+            self.endResetModel()
+        finally:
+            self.reset_rows = None
+
+    def insert_column(self, name, position=None, values=None):
+        if name in self.columns:
+            return None
+        if position is None or not 1 <= position <= len(self.columns):
+            position = len(self.columns)
+        self.beginInsertColumns(QModelIndex(), position, position)
+        self.columns.insert(position, name)
+        self.sort_cache.pop(name, None)
+        if self.store is not None and name not in self.store.columns:
+            self.store.fill_column(name, values)
+        else:
+            for item_id, value in (values or {}).items():
+                item = self.item_data.get(item_id)
+                if isinstance(item, Mapping):
+                    item[name] = value
+        self.endInsertColumns()
+        # Saved items carry every column, so all of them gain the new key
+        self.writer.mark_all(self.item_ids)
+        return {"op": "remove_column", "name": name}
+
+    def remove_column(self, name):
+        position = self.column_of(name)
+        if position < 1:
+            return None
+        if self.store is not None and name in self.store.columns:
+            values = self.store.drop_column(name)  # Column-wise, without touching each row
+        else:
+            values = {}
+            for item_id, item in self.item_data.items():
+                if isinstance(item, Mapping) and name in item:
+                    values[item_id] = item.pop(name)
+        self.sort_cache.pop(name, None)
+        self.beginRemoveColumns(QModelIndex(), position, position)
+        self.columns.pop(position)
+        self.endRemoveColumns()
+        self.writer.mark_all(self.item_ids)
+        return {"op": "add_column", "name": name, "position": position, "values": values}
+
+    def rename_column(self, name, new_name):
+        """Rename a column's key in every item, keeping its place and values"""
+        position = self.column_of(name)
+        if position < 1 or new_name in self.columns:
+            return None
+        if self.store is not None:
+            if name in self.store.columns:
+                self.store.rename_column(name, new_name)
+        else:
+            for item_id, item in self.item_data.items():
+                if isinstance(item, Mapping) and name in item:
+                    # Rebuilt so the key keeps its place in the item
+                    self.item_data[item_id] = {new_name if key == name else key: value
+                                               for key, value in item.items()}
+        self.columns[position] = new_name
+        self.sort_cache.pop(name, None)  # The new name may have another declared type
+        self.writer.mark_all(self.item_ids)
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, position, position)
+        return {"op": "rename_column", "name": new_name, "to": name}
+
+def contiguous_ranges(rows):
+    """Group sorted row numbers into (first, last) runs"""
+    ranges = []
+    for row in rows:
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return ranges
+
+class StreamingLoad(QObject):
+    """Reads a catalog with CatalogStream in short steps on the event loop.
+
+    Each step parses for at most STREAM_STEP_SECONDS and hands the records
+    over in one chunk, so the table fills in while the window keeps
+    repainting and responding to input.
+    """
+
+    chunk_loaded = pyqtSignal(object)  # list of (item_id, item)
+    progress = pyqtSignal(int, int)    # bytes read, total bytes
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.stream = CatalogStream(file_path, keep_source=True)
+        self.records = iter(self.stream)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.step)
+
+    @property
+    def layout(self):
+        return self.stream.layout
+
+    def start(self):
+        self.timer.start(0)
+
+    def cancel(self):
+        self.timer.stop()
+        self.records.close()
+
+    def step(self):
+        chunk = []
+        deadline = time.perf_counter() + STREAM_STEP_SECONDS
+        try:
+            with METRICS.timed("parse"):
+                for pair in self.records:
+                    chunk.append(pair)
+                    if len(chunk) % 256 == 0 and time.perf_counter() > deadline:
+                        break
+                else:
+                    self.timer.stop()
+        except (OSError, ValueError) as e:
+            self.timer.stop()
+            self.failed.emit(str(e))
+            return
+        if chunk:
+            self.chunk_loaded.emit(chunk)
+        self.progress.emit(self.stream.bytes_read, self.stream.total_bytes)
+        if not self.timer.isActive():
+            self.finished.emit()
+
+class ItemFilterProxyModel(QAbstractProxyModel):
+    """Sorted, filtered view of the item model, kept as a list of source rows.
+
+    Rows shown are those set in a search mask, in the order of the sort
+    column's typed keys (ItemTableModel.sort_keys). A sort is one Python
+    sort over a cached key list instead of a data() call per comparison,
+    and mask or sort changes are announced as one layout change, which
+    keeps the selection. While sorting is suspended (bulk loads) new rows
+    are appended and the sort is applied once on resume.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.mask = None
+        self.rows = []           # proxy row -> source row
+        self.positions = None    # source row -> proxy row (-1 if hidden), built on demand
+        self.sorted_rows = None  # All source rows in sort order, reused while only the mask changes
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        self.sorting_suspended = False
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self.on_source_reset)
+        model.rowsInserted.connect(self.on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self.on_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self.on_rows_removed)
+        model.columnsAboutToBeInserted.connect(
+            lambda parent, first, last: self.beginInsertColumns(QModelIndex(), first, last))
+        model.columnsInserted.connect(self.on_columns_inserted)
+        model.columnsAboutToBeRemoved.connect(
+            lambda parent, first, last: self.beginRemoveColumns(QModelIndex(), first, last))
+        model.columnsRemoved.connect(self.on_columns_removed)
+        model.dataChanged.connect(self.on_data_changed)
+        model.headerDataChanged.connect(self.on_header_changed)
+        self.beginResetModel()
+        self.on_source_reset()
+
+    def set_mask(self, mask):
+        if mask is None and self.mask is None:
+            return
+        self.mask = mask
+        self.relayout()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.sorted_rows = None
+        if not self.sorting_suspended:
+            self.relayout()
+
+    def suspend_sorting(self):
+        """Append inserted rows unsorted until resume_sorting()"""
+        self.sorting_suspended = True
+
+    def resume_sorting(self):
+        if self.sorting_suspended:
+            self.sorting_suspended = False
+            if self.sort_column >= 0:
+                self.relayout()
+
+    def is_sorted(self):
+        return self.sort_column >= 0 and not self.sorting_suspended
+
+    def visible_rows(self):
+        """Source rows to show, in display order"""
+        model = self.sourceModel()
+        count = model.rowCount()
+        mask = self.mask
+        if self.sort_column >= 0 and not self.sorting_suspended and self.sort_column < model.columnCount():
+            order = self.sorted_rows
+            if order is None or len(order) != count:
+                with METRICS.timed("sort"):
+                    keys = model.sort_keys(self.sort_column)
+                    order = self.sorted_rows = sorted(range(count), key=keys.__getitem__,
+                                                      reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
+            if mask is None:
+                return list(order)
+            size = len(mask)
+            return [row for row in order if row >= size or mask[row]]
+        if mask is None:
+            return list(range(count))
+        return list(compress(range(count), mask)) + list(range(len(mask), count))
+
+    def relayout(self):
+        """Recompute the shown rows, moving persistent indexes (selection, current) along"""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        rows = self.rows
+        sources = [(rows[index.row()], index.column()) for index in persistent]
+        self.rows = self.visible_rows()
+        self.positions = None
+        positions = self.source_positions()
+        self.changePersistentIndexList(
+            persistent, [self.createIndex(positions[row], col) if positions[row] >= 0 else QModelIndex()
+                         for row, col in sources])
+        self.layoutChanged.emit()
+
+    def source_positions(self):
+        if self.positions is None:
+            positions = array("q", [-1]) * self.sourceModel().rowCount()
+            for position, row in enumerate(self.rows):
+                positions[row] = position
+            self.positions = positions
+        return self.positions
+
+    def on_source_reset(self):
+        if self.sort_column >= self.sourceModel().columnCount():
+            self.sort_column = -1
+        self.sorted_rows = None
+        self.rows = self.visible_rows()
+        self.positions = None
+        self.endResetModel()
+
+    def on_rows_inserted(self, parent, first, last):
+        count = last - first + 1
+        rows = self.rows
+        self.sorted_rows = None
+        if first < self.sourceModel().rowCount() - count:
+            rows = [row + count if row >= first else row for row in rows]
+        mask = self.mask
+        new_rows = [row for row in range(first, last + 1) if mask is None or row >= len(mask) or mask[row]]
+        if not new_rows:
+            self.rows = rows
+            self.positions = None
+            return
+        if self.is_sorted():
+            # The shifted rows still describe the current layout; the re-sort places the new ones
+            self.rows = rows
+            self.relayout()
+            return
+        # Unsorted rows keep source order; with a suspended sort new rows simply go last
+        position = len(rows) if self.sort_column >= 0 else bisect_left(rows, first)
+        self.beginInsertRows(QModelIndex(), position, position + len(new_rows) - 1)
+        self.rows = rows[:position] + new_rows + rows[position:]
+        self.positions = None
+        self.endInsertRows()
+
+    def on_rows_about_to_be_removed(self, parent, first, last):
+        positions = sorted(position for position, row in enumerate(self.rows) if first <= row <= last)
+        for start, end in reversed(contiguous_ranges(positions)):
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self.rows[start:end + 1]
+            self.positions = None
+            self.endRemoveRows()
+
+    def on_rows_removed(self, parent, first, last):
+        count = last - first + 1
+        self.rows = [row - count if row > last else row for row in self.rows]
+        self.positions = None
+        self.sorted_rows = None
+
+    def on_columns_inserted(self, parent, first, last):
+        if self.sort_column >= first:
+            self.sort_column += last - first + 1
+        self.endInsertColumns()
+
+    def on_columns_removed(self, parent, first, last):
+        if first <= self.sort_column <= last:
+            self.sort_column = -1  # Rows keep their current order
+            self.sorted_rows = None
+        elif self.sort_column > last:
+            self.sort_column -= last - first + 1
+        self.endRemoveColumns()
+
+    def on_header_changed(self, orientation, first, last):
+        if orientation == Qt.Orientation.Horizontal:
+            self.headerDataChanged.emit(orientation, first, last)
+
+    def on_data_changed(self, top_left, bottom_right, roles):
+        if not self.rows:
+            return
+        left, right = top_left.column(), bottom_right.column()
+        if top_left.row() == bottom_right.row():
+            position = self.source_positions()[top_left.row()]
+            if position < 0:
+                return
+            self.dataChanged.emit(self.index(position, left), self.index(position, right), roles)
+        else:
+            self.dataChanged.emit(self.index(0, left), self.index(len(self.rows) - 1, right), roles)
+        if (self.is_sorted() and left <= self.sort_column <= right
+                and (not roles or Qt.ItemDataRole.DisplayRole in roles)):
+            self.sorted_rows = None
+            self.relayout()  # Edited sort keys move their rows
+
+    def mapToSource(self, index):
+        if not index.isValid() or index.row() >= len(self.rows):
+            return QModelIndex()
+        return self.sourceModel().index(self.rows[index.row()], index.column())
+
+    def mapFromSource(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        position = self.source_positions()[index.row()]
+        return self.createIndex(position, index.column()) if position >= 0 else QModelIndex()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self.rows) or not 0 <= column < self.columnCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        if index is None:
+            return QObject.parent(self)
+        return QModelIndex()
+
+    def sibling(self, row, column, index):
+        return self.index(row, column)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.sourceModel().columnCount()
+
+    def hasChildren(self, parent=QModelIndex()):
+        return not parent.isValid() and bool(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        model = self.sourceModel()
+        return model.data(model.index(self.rows[index.row()], index.column()), role)
+
+class SchemaDelegate(QStyledItemDelegate):
+    """Edits enum columns with a combo box of their known values"""
+
+    def column_choices(self, index):
+        model = index.model()
+        if isinstance(model, QAbstractProxyModel):
+            index = model.mapToSource(index)
+            model = model.sourceModel()
+        return model.column_choices(index.column())
+
+    def createEditor(self, parent, option, index):
+        choices = self.column_choices(index)
+        if choices is None:
+            return super().createEditor(parent, option, index)
+        editor = QComboBox(parent)
+        editor.setEditable(True)  # New values are allowed, and flagged if not declared
+        editor.addItems(choices)
+        return editor
+
+    def setEditorData(self, editor, index):
+        if isinstance(editor, QComboBox):
+            editor.setCurrentText(index.data(Qt.ItemDataRole.EditRole))
+        else:
+            super().setEditorData(editor, index)
+
+    def setModelData(self, editor, model, index):
+        if isinstance(editor, QComboBox):
+            model.setData(index, editor.currentText())
+        else:
+            super().setModelData(editor, model, index)
+
+class GalleryDelegate(QStyledItemDelegate):
+    """Paints one gallery tile: thumbnail, displayName and a rarity colored frame.
+
+    Tiles read the item straight from the table model, so nothing is
+    allocated per item; only tiles being painted ask for a thumbnail.
+    """
+
+    # Painted for every visible tile on every scroll step, so kept out of paint()
+    TEXT_ALIGNMENT = Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop
+    ELIDE = Qt.TextElideMode.ElideRight
+
+    def __init__(self, model, thumbnails, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.thumbnails = thumbnails
+
+    def sizeHint(self, option, index):
+        return GALLERY_TILE_SIZE
+
+    def paint(self, painter, option, index):
+        view = self.parent()
+        row = view.model().mapToSource(index).row()
+        model = self.model
+        if row < 0 or row >= len(model.item_ids):
+            return
+        field_text = model.field_text
+        palette = option.palette
+        rect = option.rect.adjusted(3, 3, -3, -3)
+        # Selected in the table counts too: the views share one selection model
+        selected = view.selectionModel().rowIntersectsSelection(index.row(), QModelIndex())
+        painter.save()
+        if selected:
+            painter.fillRect(rect, palette.highlight())
+        pen = RARITY_PENS.get(field_text(row, "rarity").strip().lower())
+        painter.setPen(pen if pen is not None else palette.mid().color())
+        painter.drawRoundedRect(rect, 6, 6)
+
+        size = GALLERY_THUMBNAIL_SIZE
+        image_rect = QRect(rect.left() + (rect.width() - size) // 2, rect.top() + 6, size, size)
+        icon = field_text(row, "icon").strip()
+        pixmap = self.thumbnails.get(icon) if icon else None
+        if pixmap is not None:
+            x = image_rect.left() + (size - pixmap.width()) // 2
+            y = image_rect.top() + (size - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+        else:
+            painter.fillRect(image_rect, palette.alternateBase())
+
+        name = field_text(row, "displayName") or str(model.item_ids[row])
+        text_rect = QRect(rect.left() + 4, image_rect.bottom() + 4, rect.width() - 8,
+                          rect.bottom() - image_rect.bottom() - 6)
+        painter.setPen(palette.highlightedText().color() if selected else palette.text().color())
+        painter.drawText(text_rect, self.TEXT_ALIGNMENT,
+                         option.fontMetrics.elidedText(name, self.ELIDE, text_rect.width()))
+        painter.restore()
+
+
+class ItemGalleryView(QListView):
+    """Icon grid over the table's proxy model, so it follows the same search
+    and sort. Only visible tiles are laid out and painted; thumbnails for the
+    next screen in the scroll direction are decoded ahead of time.
+    """
+
+    def __init__(self, model, thumbnails, parent=None):
+        super().__init__(parent)
+        self.source_model = model
+        self.thumbnails = thumbnails
+        self.last_scroll = 0
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(1000)
+        self.setGridSize(GALLERY_TILE_SIZE)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setItemDelegate(GalleryDelegate(model, thumbnails, self))
+        self.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+        thumbnails.thumbnail_ready.connect(lambda name: self.viewport().update())
+
+    def on_scrolled(self, value):
+        forward = value >= self.last_scroll
+        self.last_scroll = value
+        # Decodes for tiles that scrolled past are no longer worth doing
+        self.thumbnails.cancel_queued()
+        self.prefetch(forward)
+
+    def visible_rows(self):
+        """(first, last) proxy rows on screen, or None"""
+        rect = self.viewport().rect()
+        first = self.indexAt(QPoint(rect.left() + 1, rect.top() + 1))
+        if not first.isValid():
+            return None
+        # First tile of the bottom line, plus the rest of that line
+        last = self.indexAt(QPoint(rect.left() + 1, rect.bottom() - 1))
+        if not last.isValid():
+            return first.row(), self.model().rowCount() - 1
+        per_line = max(1, rect.width() // GALLERY_TILE_SIZE.width())
+        return first.row(), min(self.model().rowCount() - 1, last.row() + per_line - 1)
+
+    def prefetch(self, forward):
+        """Queue thumbnails for one screen beyond the visible tiles"""
+        visible = self.visible_rows()
+        if visible is None:
+            return
+        first, last = visible
+        page = last - first + 1
+        proxy = self.model()
+        if forward:
+            rows = range(last + 1, min(proxy.rowCount(), last + 1 + page))
+        else:
+            rows = range(first - 1, max(-1, first - 1 - page), -1)
+        model = self.source_model
+        names = []
+        for row in rows:
+            source_row = proxy.mapToSource(proxy.index(row, 0)).row()
+            name = model.field_text(source_row, "icon").strip()
+            if name:
+                names.append(name)
+        self.thumbnails.prefetch(names)
+
+
+class DragDropTableWidget(QTableView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAcceptDrops(True)
         self.parent_editor = parent
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
-        
+
+    def source_index(self, index):
+        """Map a view index through the sort/filter proxy to the item model"""
+        model = self.model()
+        if isinstance(model, QAbstractProxyModel):
+            return model.mapToSource(index)
+        return index
+
+    def item_model(self):
+        """Return the ItemTableModel behind the view"""
+        model = self.model()
+        if isinstance(model, QAbstractProxyModel):
+            return model.sourceModel()
+        return model
+
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
-            # Check if any of the URLs are image files
+            # Accept image files and folders that may hold them
             for url in event.mimeData().urls():
                 file_path = url.toLocalFile()
-                if file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg')):
+                if is_image_file(file_path) or os.path.isdir(file_path):
                     event.acceptProposedAction()
                     return
         event.ignore()
@@ -33,84 +1127,404 @@ class DragDropTableWidget(QTableWidget):
             event.ignore()
     
     def dropEvent(self, event: QDropEvent):
-        if event.mimeData().hasUrls():
-            # Get the item at the drop position
-            item = self.itemAt(event.position().toPoint())
-            if item is None:
-                event.ignore()
-                return
-                
-            row = item.row()
-            col = item.column()
-            
-            # Check if this is the icon column (assuming it's column 5 based on original code)
-            if col == 5:  # Icon column
-                for url in event.mimeData().urls():
-                    file_path = url.toLocalFile()
-                    if file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg')):
-                        try:
-                            # Create icons directory if it doesn't exist
-                            icons_dir = "./icons"
-                            if not os.path.exists(icons_dir):
-                                os.makedirs(icons_dir)
-                            
-                            # Get the file extension
-                            _, ext = os.path.splitext(file_path)
-                            
-                            # Generate a filename based on the item ID or create a unique name
-                            item_id_item = self.item(row, 0)  # Assuming column 0 is the ID
-                            if item_id_item and item_id_item.text().strip():
-                                new_filename = f"{item_id_item.text().strip()}{ext}"
-                            else:
-                                # Generate unique filename if no ID
-                                base_name = os.path.splitext(os.path.basename(file_path))[0]
-                                new_filename = f"{base_name}{ext}"
-                            
-                            destination = os.path.join(icons_dir, new_filename)
-                            
-                            # Copy the file
-                            shutil.copy2(file_path, destination)
-                            
-                            # Update the table cell with the new filename
-                            self.setItem(row, col, QTableWidgetItem(new_filename))
-                            
-                            if self.parent_editor:
-                                self.parent_editor.show_status(f"Image copied to {destination}")
-                            
-                        except Exception as e:
-                            QMessageBox.critical(self, "Error", f"Failed to copy image: {str(e)}")
-                        break  # Only handle the first valid image
-                
-                event.acceptProposedAction()
-            else:
-                event.ignore()
-        else:
+        if not event.mimeData().hasUrls() or not self.parent_editor:
+            event.ignore()
+            return
+        # Get the cell at the drop position
+        view_index = self.indexAt(event.position().toPoint())
+        index = self.source_index(view_index)
+        if not index.isValid() or index.column() != self.item_model().column_of("icon"):
             event.ignore()
+            return
+        
+        # A single image goes to the row it was dropped on, or to every
+        # selected row when dropped inside the selection
+        rows = [index.row()]
+        if self.selectionModel().isSelected(view_index):
+            rows = self.selected_source_rows() or rows
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        self.parent_editor.import_icons(paths, rows)
+        event.acceptProposedAction()
+    
+    def selected_source_rows(self):
+        """Item model rows that have a selected cell, in ascending order"""
+        model = self.model()
+        rows = set()
+        for selection_range in self.selectionModel().selection():
+            for view_row in range(selection_range.top(), selection_range.bottom() + 1):
+                rows.add(self.source_index(model.index(view_row, 0)).row())
+        return sorted(rows)
     
     def show_context_menu(self, position):
         """Show context menu for row operations"""
-        item = self.itemAt(position)
-        if item is None:
+        view_index = self.indexAt(position)
+        index = self.source_index(view_index)
+        if not index.isValid():
             return
             
-        row = item.row()
+        # Act on the whole selection when the click is inside it
+        rows = [index.row()]
+        if self.selectionModel().isSelected(view_index):
+            rows = self.selected_source_rows() or rows
         
-        # Get item ID for display in menu
-        id_item = self.item(row, 0)
-        item_id = id_item.text() if id_item else f"Row {row + 1}"
+        if len(rows) == 1:
+            # Get item ID for display in menu
+            label = self.item_model().cell_text(rows[0], 0) or f"Row {rows[0] + 1}"
+            delete_text = f"🗑️ Delete Row: {label}"
+        else:
+            label = f"{len(rows)} Rows"
+            delete_text = f"🗑️ Delete {label}"
         
         menu = QMenu(self)
         
-        delete_action = QAction(f"🗑️ Delete Row: {item_id}", self)
-        delete_action.triggered.connect(lambda: self.delete_row_with_confirmation(row, item_id))
+        delete_action = QAction(delete_text, self)
+        delete_action.triggered.connect(lambda: self.delete_rows(rows))
         menu.addAction(delete_action)
         
+        if self.parent_editor:
+            editor = self.parent_editor
+            menu.addSeparator()
+            for text, handler in (
+                (f"✏️ Set Field on {label}...", editor.bulk_set_field),
+                (f"✖️ Scale Numeric Field on {label}...", editor.bulk_scale_field),
+                (f"📑 Duplicate {label}...", editor.bulk_duplicate),
+            ):
+                action = QAction(text, self)
+                action.triggered.connect(lambda checked=False, handler=handler: handler(rows))
+                menu.addAction(action)
+        
         menu.exec(self.mapToGlobal(position))
     
-    def delete_row_with_confirmation(self, row, item_id):
-        """Delete a row with double confirmation"""
+    def delete_rows(self, rows):
+        """Delete rows (undoable, so no confirmation is needed)"""
         if self.parent_editor:
-            self.parent_editor.delete_row_with_confirmation(row, item_id)
+            self.parent_editor.delete_rows(rows)
+
+class CrossReferenceDialog(QDialog):
+    """Lists dangling references found by a CrossReference index.
+
+    Double-clicking an entry that belongs to the loaded file selects its row.
+    """
+
+    def __init__(self, xref, editor):
+        super().__init__(editor)
+        self.editor = editor
+        self.setWindowTitle("Cross-Check")
+        self.resize(640, 480)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"Saved files in {os.path.abspath(xref.folder)} (unsaved edits are not included)"))
+        
+        tabs = QTabWidget()
+        self.add_tab(tabs, "Unused configs",
+                     [(None, config_id, config_id) for config_id in xref.unused_configs()])
+        self.add_tab(tabs, "Missing configs",
+                     [(path, record_id, f"{os.path.basename(path)}: {record_id} → {base_id}")
+                      for path, record_id, base_id in xref.missing_configs()])
+        self.add_tab(tabs, "Missing icons",
+                     [(path, config_id, f"{os.path.basename(path)}: {config_id} → {icon}")
+                      for path, config_id, icon in xref.missing_icons()])
+        self.add_tab(tabs, "Orphaned icons",
+                     [(None, None, name) for name in xref.orphaned_icons()])
+        layout.addWidget(tabs, 1)
+        
+        for path, error in xref.errors():
+            layout.addWidget(QLabel(f"❌ {os.path.basename(path)}: {error}"))
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        
+    def add_tab(self, tabs, title, entries):
+        """entries are (source path or None, item ID or None, text)"""
+        view = QListWidget()
+        for path, item_id, text in entries:
+            entry = QListWidgetItem(text)
+            entry.setData(Qt.ItemDataRole.UserRole, (path, item_id))
+            view.addItem(entry)
+        view.itemDoubleClicked.connect(self.show_item)
+        tabs.addTab(view, f"{title} ({len(entries)})")
+        
+    def show_item(self, entry):
+        path, item_id = entry.data(Qt.ItemDataRole.UserRole)
+        if item_id is None:
+            return
+        if path is not None and os.path.abspath(path) != os.path.abspath(self.editor.file_path or ""):
+            self.editor.show_status(f"{item_id} is in {os.path.basename(path)}, which is not the loaded file")
+            return
+        self.editor.select_item(item_id)
+
+def diff_text(value):
+    """Cell text of one side of a difference; empty where the side has nothing"""
+    if value is MISSING:
+        return ""
+    if isinstance(value, Mapping) and type(value) is not dict:
+        value = json_default(value)
+    return value_text(value)
+
+
+class DiffTableModel(QAbstractTableModel):
+    """One row per changed field, or per item that only one side has"""
+
+    def __init__(self, this_name, other_name, parent=None):
+        super().__init__(parent)
+        self.headers = ["Change", "Item ID", "Field", this_name, other_name]
+        self.kind_names = {ADDED: f"Only in {other_name}", REMOVED: f"Only in {this_name}", CHANGED: "Changed"}
+        self.rows = []  # (kind, item_id, key or None, this value, other value)
+
+    def set_diff(self, diff):
+        rows = []
+        for change in diff.changes:
+            item_id = change.item_id
+            if change.kind == ADDED:
+                rows.append((ADDED, item_id, None, MISSING, diff.new_items[item_id]))
+            elif change.kind == REMOVED:
+                rows.append((REMOVED, item_id, None, diff.old_items[item_id], MISSING))
+            else:
+                rows += [(CHANGED, item_id, key, old, new) for key, old, new in change.fields]
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        kind, item_id, key, this_value, other_value = self.rows[index.row()]
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return DIFF_COLORS[kind]
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        col = index.column()
+        if col == 0:
+            return self.kind_names[kind]
+        if col == 1:
+            return str(item_id)
+        if col == 2:
+            return key or ""
+        return diff_text(this_value if col == 3 else other_value)
+
+
+class CatalogDiffDialog(QDialog):
+    """Review of the differences between the loaded catalog (with unsaved
+    edits) and another file.
+
+    Double-clicking a row selects the item; the other file's version of the
+    selected rows can be taken over as one undoable step.
+    """
+
+    def __init__(self, other_path, other_items, editor):
+        super().__init__(editor)
+        self.editor = editor
+        self.other_path = other_path
+        self.other_items = other_items
+        self.other_digests = catalog_digests(other_items)
+        self.setWindowTitle(f"Compare with {os.path.basename(other_path)}")
+        self.resize(900, 560)
+        layout = QVBoxLayout(self)
+
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter by ID, field or value...")
+        layout.addWidget(self.filter_input)
+
+        this_name = os.path.basename(editor.file_path or "") or "This file"
+        self.model = DiffTableModel(this_name, os.path.basename(other_path), self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterKeyColumn(-1)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.filter_input.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.view = QTableView()
+        self.view.setModel(self.proxy)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.setSortingEnabled(True)
+        self.view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.doubleClicked.connect(self.show_item)
+        layout.addWidget(self.view, 1)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        take_btn = buttons.addButton("Take Other Version", QDialogButtonBox.ButtonRole.ActionRole)
+        take_btn.setToolTip("Copy the other file's version of the selected rows into this file")
+        take_btn.clicked.connect(self.take_selected)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.refresh()
+
+    def refresh(self):
+        """Compare again against the loaded catalog as it is now"""
+        model = self.editor.model
+        diff = diff_catalogs(model.item_data, self.other_items, None, self.other_digests)
+        self.model.set_diff(diff)
+        counts = diff.counts()
+        self.summary.setText(
+            f"{counts[CHANGED]} changed item(s) ({diff.field_count()} field(s)), "
+            f"{counts[REMOVED]} only in this file, {counts[ADDED]} only in {os.path.basename(self.other_path)}"
+            " (unsaved edits are included)")
+
+    def selected_rows(self):
+        rows = {self.proxy.mapToSource(index).row() for index in self.view.selectionModel().selectedRows()}
+        return [self.model.rows[row] for row in sorted(rows)]
+
+    def show_item(self, index):
+        kind, item_id = self.model.rows[self.proxy.mapToSource(index).row()][:2]
+        if kind == ADDED:
+            self.editor.show_status(f"{item_id} is only in {os.path.basename(self.other_path)}")
+            return
+        self.editor.select_item(item_id)
+
+    def take_selected(self):
+        rows = self.selected_rows()
+        if not rows:
+            return
+        model = self.editor.model
+        new_columns, records, removed, added = [], [], [], []
+        for kind, item_id, key, _, other_value in rows:
+            if kind == CHANGED:
+                if other_value is MISSING:
+                    records.append({"op": "unset", "id": item_id, "key": key})
+                else:
+                    records.append({"op": "set", "id": item_id, "key": key, "value": other_value})
+                    new_columns.append(key)
+            elif kind == REMOVED:
+                removed.append(item_id)
+            else:
+                item = other_value if type(other_value) is dict else json_default(other_value)
+                added.append((item_id, item))
+                new_columns += list(item) if isinstance(item, Mapping) else []
+        # Keys the table has no column for yet
+        columns = []
+        for key in new_columns:
+            if model.column_of(key) == -1 and key not in columns:
+                columns.append(key)
+        records = [{"op": "add_column", "name": key} for key in columns] + records
+        if removed:
+            records.append({"op": "remove", "ids": removed})
+        if added:
+            first = len(model.item_ids) - len(removed)
+            records.append({"op": "insert", "rows": [[first + offset, item_id, item]
+                                                      for offset, (item_id, item) in enumerate(added)]})
+        text = f"Take {len(rows)} change(s) from {os.path.basename(self.other_path)}"
+        model.push_records(records, text)
+        self.editor.show_status(f"✅ {text} (Ctrl+Z to undo)")
+        self.refresh()
+
+
+class DiagnosticsDock(QDockWidget):
+    """Timings and counters from catalog_metrics, collected only while shown.
+
+    A cProfile capture of the next run of one operation can be saved to a
+    .prof file for pstats or snakeviz.
+    """
+
+    def __init__(self, editor):
+        super().__init__("Diagnostics", editor)
+        self.editor = editor
+        self.setObjectName("diagnostics")
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        self.timings_table = self.make_table(["Operation", "Calls", "Total ms", "Last ms", "Max ms"])
+        self.counters_table = self.make_table(["Counter", "Count"])
+        layout.addWidget(QLabel("Timings"))
+        layout.addWidget(self.timings_table, 1)
+        layout.addWidget(QLabel("Counters"))
+        layout.addWidget(self.counters_table, 1)
+
+        profile_layout = QHBoxLayout()
+        self.profile_operation = QComboBox()
+        self.profile_operation.addItems(OPERATIONS)
+        profile_btn = QPushButton("Profile Next...")
+        profile_btn.setToolTip("Capture a cProfile of the next run of the chosen operation")
+        profile_btn.clicked.connect(self.profile_next)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        profile_layout.addWidget(self.profile_operation, 1)
+        profile_layout.addWidget(profile_btn)
+        profile_layout.addWidget(reset_btn)
+        layout.addLayout(profile_layout)
+        self.profile_label = QLabel("")
+        self.profile_label.setWordWrap(True)
+        layout.addWidget(self.profile_label)
+        self.setWidget(widget)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    @staticmethod
+    def make_table(headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.verticalHeader().hide()
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def on_visibility_changed(self, visible):
+        METRICS.enabled = visible
+        if visible:
+            self.refresh()
+            self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+
+    def refresh(self):
+        timings, counters = METRICS.report()
+        self.fill(self.timings_table, [
+            (name, str(calls), f"{total * 1000:.1f}", f"{last * 1000:.1f}", f"{worst * 1000:.1f}")
+            for name, calls, total, last, worst in timings
+        ])
+        self.fill(self.counters_table, [(name, f"{count:,}") for name, count in counters])
+        for operation, path, error in METRICS.take_finished_profiles():
+            if error:
+                self.profile_label.setText(f"❌ Profile of {operation} failed: {error}")
+            else:
+                self.profile_label.setText(f"✅ Profile of {operation} saved to {path}")
+                self.editor.show_status(f"📊 Saved profile of {operation} to {os.path.basename(path)}")
+
+    @staticmethod
+    def fill(table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, text in enumerate(values):
+                cell = table.item(row, col)
+                if cell is None:
+                    cell = QTableWidgetItem()
+                    if col:
+                        cell.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                    table.setItem(row, col, cell)
+                cell.setText(text)
+
+    def profile_next(self):
+        operation = self.profile_operation.currentText()
+        path, _ = QFileDialog.getSaveFileName(
+            self, f"Save Profile of Next {operation}", f"{operation.replace(' ', '_')}.prof",
+            "Profile Stats (*.prof);;All Files (*)")
+        if not path:
+            return
+        METRICS.profile_next(operation, path)
+        self.profile_label.setText(f"⏺ Waiting for the next {operation}...")
+
+    def reset(self):
+        METRICS.reset()
+        self.refresh()
+
 
 class ItemConfigsEditor(QMainWindow):
     def __init__(self):
@@ -118,8 +1532,18 @@ class ItemConfigsEditor(QMainWindow):
         self.setWindowTitle("itemConfigs Editor - Enhanced")
         self.resize(1200, 700)
         self.file_path = None
+        self.file_format = "json"  # catalog_formats name the file is saved back in
         self.data = None
-        self.original_data = None  # Store original data for search filtering
+        self.loader = None  # StreamingLoad while a large file is coming in
+        self.pending_journal = None  # Journal edits to offer once loading ends
+        self.xref = None  # CrossReference for the loaded file's folder
+        self.disk_digests = None  # Fingerprints of the file as last read or saved
+        self.loaded_signature = None  # (size, mtime) of the file when it was loaded
+        self.loaded_from_snapshot = False  # Last load skipped the JSON thanks to a snapshot
+        self.first_paint_message = None  # Status to complete once the loaded table is painted
+        self.load_timer = NULL_TIMER  # Times a load from its start until finish_load
+        self.settings = QSettings("itemConfigs Editor", "itemConfigs Editor")
+        self.restoring_layout = False  # Header changes are not saved while a layout is applied
         
         self.setup_ui()
         
@@ -147,10 +1571,66 @@ class ItemConfigsEditor(QMainWindow):
         add_column_btn = QPushButton("➕ Add Column")
         add_column_btn.clicked.connect(self.add_column)
         
+        xref_btn = QPushButton("🔗 Cross-Check")
+        xref_btn.setToolTip("Find unused configs, inventory records without a config,\n"
+                            "missing icons and orphaned icon files")
+        xref_btn.clicked.connect(self.show_cross_reference)
+        
+        compare_btn = QPushButton("🔀 Compare...")
+        compare_btn.setToolTip("List items added, removed or changed between this file\n"
+                               "(with unsaved edits) and another catalog")
+        compare_btn.clicked.connect(self.compare_with_file)
+        
+        export_btn = QPushButton("📤 Export...")
+        export_btn.setToolTip("Write the catalog (with unsaved edits) as CSV, TSV, SQLite,\n"
+                              "columnar or JSON Lines, e.g. for spreadsheets and SQL")
+        export_btn.clicked.connect(self.export_catalog)
+        
+        # Timings and counters are only collected while the dock is shown
+        self.diagnostics = DiagnosticsDock(self)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.diagnostics)
+        self.diagnostics.hide()
+        diagnostics_action = self.diagnostics.toggleViewAction()
+        diagnostics_action.setShortcut(QKeySequence("F12"))
+        self.addAction(diagnostics_action)
+        diagnostics_btn = QPushButton("📊 Diagnostics")
+        diagnostics_btn.setCheckable(True)
+        diagnostics_btn.setToolTip("Show timings, counters and profiling for load, filter, save... (F12)")
+        diagnostics_btn.clicked.connect(diagnostics_action.trigger)
+        diagnostics_action.toggled.connect(diagnostics_btn.setChecked)
+        
+        # Undo/redo for every edit, delete, column add and icon drop
+        self.undo_stack = UndoHistory(UNDO_MEMORY_LIMIT, self)
+        
+        undo_action = self.undo_stack.createUndoAction(self, "Undo")
+        undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        redo_action = self.undo_stack.createRedoAction(self, "Redo")
+        redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        self.addAction(undo_action)
+        self.addAction(redo_action)
+        
+        undo_btn = QPushButton("↶ Undo")
+        undo_btn.setEnabled(False)
+        undo_btn.clicked.connect(self.undo_stack.undo)
+        self.undo_stack.canUndoChanged.connect(undo_btn.setEnabled)
+        undo_btn.setToolTip("Undo the last change (Ctrl+Z)")
+        
+        redo_btn = QPushButton("↷ Redo")
+        redo_btn.setEnabled(False)
+        redo_btn.clicked.connect(self.undo_stack.redo)
+        self.undo_stack.canRedoChanged.connect(redo_btn.setEnabled)
+        redo_btn.setToolTip("Redo the last undone change (Ctrl+Y)")
+        
         top_layout.addWidget(reload_btn)
         top_layout.addWidget(load_btn)
         top_layout.addWidget(save_btn)
         top_layout.addWidget(add_column_btn)
+        top_layout.addWidget(xref_btn)
+        top_layout.addWidget(compare_btn)
+        top_layout.addWidget(export_btn)
+        top_layout.addWidget(diagnostics_btn)
+        top_layout.addWidget(undo_btn)
+        top_layout.addWidget(redo_btn)
         top_layout.addStretch()  # Push buttons to the left
         
         # Search layout
@@ -158,7 +1638,17 @@ class ItemConfigsEditor(QMainWindow):
         search_label = QLabel("Search:")
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search by ID, name, category, or any field...")
-        self.search_input.textChanged.connect(self.filter_table)
+        self.search_input.setToolTip(
+            "Plain text, or field terms such as:\n"
+            "category:armor  rarity=epic  maxStackSize>50  displayName:\"weak stim\""
+        )
+        self.search_input.textChanged.connect(self.schedule_filter)
+        
+        # Debounce keystrokes so a fast typist triggers one search, not one per key
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.filter_table)
         
         self.search_column = QComboBox()
         self.search_column.addItem("All Columns")
@@ -173,47 +1663,166 @@ class ItemConfigsEditor(QMainWindow):
         search_layout.addWidget(self.search_column)
         search_layout.addWidget(clear_search_btn)
         
-        # Table
+        # Table (model/view: cells are read from self.data on demand)
+        self.model = ItemTableModel(self)
+        self.model.undo_stack = self.undo_stack
+        self.proxy = ItemFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.model.edit_rejected.connect(self.on_edit_rejected)
+        
+        # Search index follows the model so edits never force a full rescan
+        self.search_index = SearchIndex(self.model.cell_text, self.model.column_texts)
+        self.model.modelReset.connect(self.on_model_reset)
+        self.model.dataChanged.connect(self.on_model_data_changed)
+        self.model.rowsAboutToBeInserted.connect(
+            lambda parent, first, last: self.search_index.reserve_rows(first, last - first + 1))
+        self.model.rowsInserted.connect(
+            lambda parent, first, last: self.search_index.index_rows(first, last - first + 1))
+        self.model.rowsRemoved.connect(
+            lambda parent, first, last: self.search_index.remove_rows(first, last))
+        self.model.columnsInserted.connect(
+            lambda parent, first, last: self.search_index.insert_columns(first, last - first + 1))
+        self.model.columnsRemoved.connect(
+            lambda parent, first, last: self.search_index.remove_columns(first, last))
+        self.model.columnsInserted.connect(self.update_search_columns)
+        self.model.columnsRemoved.connect(self.update_search_columns)
+        self.model.headerDataChanged.connect(self.update_search_columns)
+        
+        # External changes to the loaded file are merged in, not reloaded
+        self.watcher = CatalogWatcher(self)
+        self.watcher.file_read.connect(self.on_file_read)
+        self.watcher.read_failed.connect(
+            lambda error: self.show_status(f"⚠️ Could not read the changed file: {error}"))
+        
+        # Icon thumbnails are decoded in the background for visible rows only
+        self.thumbnails = ThumbnailCache(self.icons_dir(), size=32, parent=self)
+        self.model.set_thumbnail_cache(self.thumbnails)
+        
+        # Dropped icons are copied (and deduplicated) on a thread pool
+        self.icon_importer = IconImporter(parent=self)
+        self.icon_importer.progress.connect(self.on_icon_import_progress)
+        self.icon_importer.finished.connect(self.on_icons_imported)
+        self.icon_import_targets = {}  # source path -> item IDs whose icon it becomes
+        self.icon_import_file = None   # Catalog the targets belong to
+        
         self.table = DragDropTableWidget(self)
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(["ID", "displayName", "category", "rarity", "maxDurability", "icon", "maxStackSize"])
+        self.table.setModel(self.proxy)
+        self.table.setItemDelegate(SchemaDelegate(self.table))
+        self.table.setIconSize(QSize(32, 32))
+        self.table.verticalHeader().setDefaultSectionSize(36)
+        # Skip queued decodes for rows that scrolled out of view
+        self.table.verticalScrollBar().valueChanged.connect(self.thumbnails.cancel_queued)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.AllEditTriggers)
+        # Keep file order until a header is clicked
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
         self.table.setSortingEnabled(True)
         
+        # Delete removes every selected row as one undoable step
+        delete_action = QAction("Delete Selected Rows", self.table)
+        delete_action.setShortcut(QKeySequence.StandardKey.Delete)
+        delete_action.setShortcutContext(Qt.ShortcutContext.WidgetShortcut)
+        delete_action.triggered.connect(self.delete_selected_rows)
+        self.table.addAction(delete_action)
+        
         # Make table headers resizable
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         header.setStretchLastSection(True)
+        # Dragging a header only moves it on screen; the order is remembered per file
+        header.setSectionsMovable(True)
+        header.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        header.customContextMenuRequested.connect(self.show_header_menu)
+        self.layout_timer = QTimer(self)
+        self.layout_timer.setSingleShot(True)
+        self.layout_timer.setInterval(500)
+        self.layout_timer.timeout.connect(self.save_column_layout)
+        header.sectionMoved.connect(self.on_column_layout_changed)
+        header.sectionResized.connect(self.on_column_layout_changed)
+        
+        # Gallery: the same rows as tiles, sharing the table's search, sort and selection
+        self.gallery_thumbnails = ThumbnailCache(self.icons_dir(), size=GALLERY_THUMBNAIL_SIZE,
+                                                 max_bytes=64 * 1024 * 1024, parent=self)
+        self.gallery = ItemGalleryView(self.model, self.gallery_thumbnails, self)
+        self.gallery.setModel(self.proxy)
+        self.gallery.setSelectionModel(self.table.selectionModel())
+        self.gallery.doubleClicked.connect(self.show_in_table)
+        
+        self.views = QTabWidget()
+        self.views.addTab(self.table, "📋 Table")
+        self.views.addTab(self.gallery, "🖼️ Gallery")
+        self.views.currentChanged.connect(self.on_view_changed)
         
         # Status bar
         self.status_label = QLabel("Ready")
+        self.load_progress = QProgressBar()
+        self.load_progress.setRange(0, 1000)
+        self.load_progress.setTextVisible(False)
+        self.load_progress.setMaximumWidth(240)
+        self.load_progress.hide()
+        self.import_progress = QProgressBar()
+        self.import_progress.setMaximumWidth(240)
+        self.import_progress.setFormat("Icons %v/%m")
+        self.import_progress.hide()
+        status_layout = QHBoxLayout()
+        status_layout.addWidget(self.status_label, 1)
+        status_layout.addWidget(self.import_progress)
+        status_layout.addWidget(self.load_progress)
         
         # Add all to layout
         layout.addLayout(top_layout)
         layout.addLayout(search_layout)
-        layout.addWidget(self.table, 1)  # Give table most of the space
-        layout.addWidget(self.status_label)
+        layout.addWidget(self.views, 1)  # Give the views most of the space
+        layout.addLayout(status_layout)
         
     def show_status(self, message):
         """Show status message"""
         self.status_label.setText(message)
-        QApplication.processEvents()  # Update UI immediately
+        # Paint the label now without re-entering the event loop mid-operation
+        self.status_label.repaint()
+        
+    def report_first_paint(self, message):
+        """Show message with the time from start-up until the loaded table is first painted"""
+        self.show_status(message)
+        self.first_paint_message = message
+        self.table.viewport().installEventFilter(self)
+        self.table.viewport().update()
+        
+    def eventFilter(self, watched, event):
+        if (event.type() == QEvent.Type.Paint and self.first_paint_message is not None
+                and watched is self.table.viewport()):
+            watched.removeEventFilter(self)
+            # Measured once this paint has been handled
+            QTimer.singleShot(0, self.show_first_paint)
+        return super().eventFilter(watched, event)
+        
+    def show_first_paint(self):
+        message, self.first_paint_message = self.first_paint_message, None
+        if message is None or self.status_label.text() != message:
+            return  # A newer status took over
+        elapsed = (time.perf_counter() - STARTED) * 1000
+        source = "warm, from snapshot" if self.loaded_from_snapshot else "cold, parsed JSON"
+        self.status_label.setText(f"{message} · first paint after {elapsed:.0f} ms ({source})")
         
     def auto_load_config(self):
         """Automatically load itemConfigs.json from the same folder"""
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "itemConfigs.json")
         
         if os.path.exists(config_path):
-            try:
-                self.load_json_file(config_path)
-                self.show_status(f"✅ Auto-loaded itemConfigs.json ({len(self.data)} items)")
-            except Exception as e:
-                self.show_status(f"❌ Failed to auto-load itemConfigs.json: {str(e)}")
+            def loaded():
+                self.report_first_paint(f"✅ Auto-loaded itemConfigs.json ({len(self.data)} items)")
+            
+            def failed(error):
+                self.show_status(f"❌ Failed to auto-load itemConfigs.json: {error}")
                 QMessageBox.warning(
                     self, 
                     "Auto-load Failed", 
-                    f"Found itemConfigs.json but failed to load it:\n{str(e)}\n\nPlease use 'Load Different File' to select manually."
+                    f"Found itemConfigs.json but failed to load it:\n{error}\n\nPlease use 'Load Different File' to select manually."
                 )
+            
+            try:
+                self.load_json_file(config_path, loaded, failed)
+            except Exception as e:
+                failed(str(e))
         else:
             self.show_status("⚠️ No itemConfigs.json found in current folder - use 'Load Different File' to select one")
     
@@ -221,14 +1830,23 @@ class ItemConfigsEditor(QMainWindow):
         """Reload itemConfigs.json from the same folder"""
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "itemConfigs.json")
         
-        if os.path.exists(config_path):
-            try:
-                self.load_json_file(config_path)
+        if os.path.exists(config_path) and self.file_path == config_path and self.loader is None:
+            # Already open: merge what changed on disk, keeping unsaved edits
+            self.watcher.read_now()
+            self.show_status("🔄 Checking itemConfigs.json for changes...")
+        elif os.path.exists(config_path):
+            def loaded():
                 self.show_status(f"🔄 Reloaded itemConfigs.json ({len(self.data)} items)")
                 QMessageBox.information(self, "Reload Complete", f"Successfully reloaded itemConfigs.json\n{len(self.data)} items loaded")
+            
+            def failed(error):
+                self.show_status(f"❌ Failed to reload itemConfigs.json: {error}")
+                QMessageBox.critical(self, "Reload Failed", f"Failed to reload itemConfigs.json:\n{error}")
+            
+            try:
+                self.load_json_file(config_path, loaded, failed)
             except Exception as e:
-                self.show_status(f"❌ Failed to reload itemConfigs.json: {str(e)}")
-                QMessageBox.critical(self, "Reload Failed", f"Failed to reload itemConfigs.json:\n{str(e)}")
+                failed(str(e))
         else:
             QMessageBox.warning(
                 self, 
@@ -236,127 +1854,433 @@ class ItemConfigsEditor(QMainWindow):
                 "itemConfigs.json not found in the current folder.\n\nPlease use 'Load Different File' to select a file manually."
             )
     
-    def load_json_file(self, file_path):
-        """Load JSON file from given path"""
-        with open(file_path, "r", encoding="utf-8") as f:
-            raw_data = json.load(f)
-            
-        # Handle different JSON structures
-        if "itemConfigs" in raw_data:
-            self.data = raw_data["itemConfigs"]
-        elif isinstance(raw_data, dict):
-            self.data = raw_data
+    def load_json_file(self, file_path, on_loaded=None, on_failed=None):
+        """Load JSON file from given path.
+        
+        Small object files are read at once and on_loaded runs before this
+        returns (errors are raised). Top-level arrays and large files stream
+        in the background; on_loaded or on_failed(message) runs when done.
+        """
+        self.cancel_loading()
+        self.load_timer = METRICS.start("load")
+        signature = file_signature(file_path)
+        catalog_format = format_for_path(file_path)
+        if catalog_format.name == "sqlite":
+            # Rows are paged in from the database as they are shown
+            self.loaded_from_snapshot = False
+            data = SqliteItems(file_path)
+            self.begin_load(file_path, data, data.layout, signature, catalog_format.name)
+            self.finish_load(on_loaded)
+            return
+        # An up-to-date snapshot from an earlier parse replaces the JSON entirely
+        cached = load_snapshot(file_path)
+        self.loaded_from_snapshot = cached is not None
+        if cached is not None:
+            self.begin_load(file_path, cached[0], cached[1], signature, catalog_format.name)
+            self.finish_load(on_loaded)
+            return
+        if catalog_format.name != "json":
+            data, layout = catalog_format.read(file_path)
+            self.begin_load(file_path, data, layout, signature, catalog_format.name)
+            self.finish_load(on_loaded)
+            return
+        
+        is_array = peek_json_start(file_path) == "["
+        if is_array or os.path.getsize(file_path) > STREAM_LOAD_BYTES:
+            # Object catalogs stream into typed columns; inventory records stay CompactRecords
+            items = {} if is_array else ColumnStore()
+            self.begin_load(file_path, items, LAYOUT_ARRAY if is_array else LAYOUT_ITEM_CONFIGS, signature)
+            self.loader = StreamingLoad(file_path, self)
+            self.proxy.suspend_sorting()  # Sorted once, when the last row is in
+            self.loader.chunk_loaded.connect(self.model.append_items)
+            self.loader.progress.connect(self.on_load_progress)
+            self.loader.finished.connect(lambda: self.finish_load(on_loaded))
+            self.loader.failed.connect(lambda error: self.abort_load(error, on_failed))
+            self.load_progress.setValue(0)
+            self.load_progress.show()
+            self.loader.start()
+            return
+        
+        # Handles {"itemConfigs": {...}}, direct object and array files
+        data, layout, source = read_catalog_source(file_path)
+        self.begin_load(file_path, data, layout, signature)
+        self.model.writer.seed(source)  # Untouched items are saved as they are in the file
+        self.finish_load(on_loaded)
+        
+    def begin_load(self, file_path, data, layout, signature=None, file_format="json"):
+        """Switch the editor to a new file holding data (empty while streaming)"""
+        if self.layout_timer.isActive():
+            self.save_column_layout()  # Still the previous file's columns
+        if file_format == "json":
+            self.watcher.watch(file_path)
         else:
-            raise ValueError("Invalid JSON structure. Expected object with 'itemConfigs' key or direct object.")
-            
-        self.original_data = self.data.copy()
+            self.watcher.unwatch()  # Changes on disk are only merged for JSON files
+        self.disk_digests = None
+        self.loaded_signature = signature
+        if isinstance(self.data, SqliteItems):
+            self.data.close()
+        self.data = data
+        self.file_format = file_format
+        
+        # Undo history and journal belong to the previously loaded data
+        self.undo_stack.clear()
+        if self.model.journal is not None:
+            if self.file_path == file_path:
+                self.model.journal.discard()  # Reloading throws away the edits
+            else:
+                self.model.journal.close()  # Offered for recovery when reopened
+        journal = EditJournal(file_path)
+        self.pending_journal = journal.read_pending()
+        if self.pending_journal:
+            journal.set_aside(self.pending_journal)  # Kept until the recovery prompt is answered
+        journal.start()
+        self.model.journal = journal
+        
         self.file_path = file_path
-        self.populate_table()
+        self.thumbnails.set_icons_dir(self.icons_dir())
+        self.gallery_thumbnails.set_icons_dir(self.icons_dir())
+        self.scan_icon_files()
+        self.populate_table(layout)
         self.update_search_columns()
         
         # Update window title to show current file
         filename = os.path.basename(file_path)
         self.setWindowTitle(f"itemConfigs Editor - {filename}")
         
+    def finish_load(self, on_loaded=None):
+        """Wrap up a load: re-run the search and offer journal recovery"""
+        self.load_timer.stop()
+        if self.loader is not None:
+            self.model.writer.layout = self.loader.layout or self.model.writer.layout
+            self.model.writer.seed(self.loader.stream.source)
+            self.loader.deleteLater()
+            self.loader = None
+            self.load_progress.hide()
+            self.proxy.resume_sorting()
+            if self.search_input.text().strip():
+                self.filter_table()  # Rows streamed in after the last search
+        self.restore_column_layout()
+        # Fingerprint the file in the background so later changes can be diffed.
+        # That read parses its own copy, so it also writes the snapshot for the
+        # next open; after a snapshot load it gives the writer the file's text
+        self.watcher.read_now(keep_source=self.loaded_from_snapshot)
+        if on_loaded is not None:
+            on_loaded()
+        pending, self.pending_journal = self.pending_journal, None
+        if pending:
+            self.offer_journal_recovery(self.model.journal, *pending)
+        
+    def abort_load(self, error, on_failed=None):
+        """A streaming load failed part way; drop the partial catalog so it
+        cannot be saved over the file"""
+        self.load_timer.stop()
+        self.cancel_loading()
+        self.pending_journal = None
+        self.watcher.unwatch()
+        if self.model.journal is not None:
+            self.model.journal.close()
+            self.model.journal = None
+        self.file_path = None
+        self.file_format = "json"
+        self.data = {}
+        self.undo_stack.clear()
+        self.populate_table()
+        self.setWindowTitle("itemConfigs Editor - Enhanced")
+        if on_failed is not None:
+            on_failed(error)
+        else:
+            QMessageBox.critical(self, "Error Loading File", f"Failed to load JSON file:\n{error}")
+            self.show_status("❌ Failed to load file")
+        
+    def cancel_loading(self):
+        """Stop a streaming load that is still running"""
+        if self.loader is None:
+            return
+        self.loader.cancel()
+        self.loader.deleteLater()
+        self.loader = None
+        self.load_progress.hide()
+        self.proxy.resume_sorting()
+        
+    def on_load_progress(self, done, total):
+        self.load_progress.setValue(int(1000 * done / total) if total else 1000)
+        # Not show_status: processing events here would re-enter the loader
+        self.status_label.setText(
+            f"⏳ Loading {os.path.basename(self.file_path)}... {len(self.model.item_ids)} items"
+        )
+        
+    def on_file_read(self, snapshot, own_save):
+        """The watched file was read in the background: merge what changed"""
+        if self.loader is not None:
+            self.watcher.schedule()  # Still streaming the previous version
+            return
+        if own_save or (self.disk_digests is None and snapshot["signature"] == self.loaded_signature):
+            # Same content as what is loaded or was just saved; only remember it
+            self.disk_digests = snapshot["digests"]
+            if not own_save:
+                self.model.writer.seed(snapshot["source"])
+            return
+        if (snapshot["layout"] == LAYOUT_ARRAY) != (self.model.writer.layout == LAYOUT_ARRAY):
+            self.show_status("⚠️ The file on disk changed shape - use Reload to open it again")
+            return
+        
+        items = snapshot["items"]
+        old_digests, self.disk_digests = self.disk_digests, snapshot["digests"]
+        records, reloaded, conflicts = plan_reload(
+            self.model.item_ids, self.model.item_data, items, old_digests, self.disk_digests,
+            self.model.writer.changed_ids()
+        )
+        self.model.apply_external(records, reloaded, items)
+        
+        filename = os.path.basename(self.file_path)
+        if reloaded:
+            self.show_status(f"🔄 {filename} changed on disk: {len(reloaded)} item(s) updated")
+        if conflicts:
+            self.resolve_reload_conflicts(conflicts, items, old_digests)
+        
+    def resolve_reload_conflicts(self, conflicts, items, old_digests):
+        """Ask whether unsaved edits or the file's version win for items changed on both sides"""
+        names = ", ".join(conflicts[:5]) + ("..." if len(conflicts) > 5 else "")
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Icon.Warning)
+        box.setWindowTitle("File Changed on Disk")
+        box.setText(
+            f"{len(conflicts)} item(s) changed on disk and also have unsaved edits here:\n{names}\n\n"
+            "Keep your edits (they replace the file's version when you save), "
+            "or take the version from disk?"
+        )
+        keep_btn = box.addButton("Keep Mine", QMessageBox.ButtonRole.RejectRole)
+        take_btn = box.addButton("Take Theirs", QMessageBox.ButtonRole.AcceptRole)
+        box.setDefaultButton(keep_btn)
+        box.exec()
+        if box.clickedButton() is not take_btn:
+            self.show_status(f"⚠️ Kept unsaved edits for {len(conflicts)} item(s) changed on disk")
+            return
+        
+        changed_locally = self.model.writer.changed_ids() - set(conflicts)
+        records, reloaded, _ = plan_reload(
+            self.model.item_ids, self.model.item_data, items, old_digests, self.disk_digests, changed_locally
+        )
+        self.model.apply_external(records, reloaded, items)
+        self.show_status(f"🔄 Took the file's version of {len(conflicts)} item(s)")
+        
+    def offer_journal_recovery(self, journal, header, batches):
+        """Replay unsaved edits left in the journal by a previous session"""
+        records = [record for batch in batches for record in batch]
+        message = f"Found {len(records)} unsaved edit(s) from a previous session of this file."
+        if not journal.matches_catalog(header):
+            message += "\n\n⚠️ The file has changed on disk since then; some edits may not apply."
+        reply = QMessageBox.question(
+            self,
+            "Recover Unsaved Edits",
+            message + "\n\nRecover them?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            journal.resolve_pending()
+            return
+        self.model.push_records(records, "Recover unsaved edits")  # Journaled again as new edits
+        journal.resolve_pending()
+        self.show_status(f"♻️ Recovered {len(records)} unsaved edit(s) - save to keep them")
+        
+    def icons_dir(self):
+        """Icons folder next to the loaded file (or next to the editor)"""
+        base = self.file_path if self.file_path else os.path.abspath(__file__)
+        return os.path.join(os.path.dirname(os.path.abspath(base)), "icons")
+        
+    def scan_icon_files(self):
+        """List the icons folder so icon cells naming a missing file are flagged"""
+        try:
+            with os.scandir(self.icons_dir()) as entries:
+                files = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            files = None  # No icons folder yet: nothing to check against
+        self.model.set_icon_files(files)
+        
+    def import_icons(self, paths, rows):
+        """Import dropped image files and folders into the icons folder.
+        
+        One image is assigned to the given rows. Several images (or a
+        folder) are matched to items by file name, e.g. CombatHelmet.png
+        to the item CombatHelmet; unmatched ones are only copied.
+        """
+        if self.icon_importer.busy():
+            self.show_status("⏳ Still importing icons - try again when it finishes")
+            return
+        files = expand_sources(paths)
+        if not files:
+            self.show_status("No image files found in what was dropped")
+            return
+        
+        item_ids = [self.model.item_ids[row] for row in rows if 0 <= row < len(self.model.item_ids)]
+        targets = {}
+        sources = []
+        if len(files) == 1 and not any(os.path.isdir(path) for path in paths):
+            source = files[0]
+            if len(item_ids) == 1 and str(item_ids[0]).strip():
+                # Named after the item, as single drops always were
+                name = str(item_ids[0]).strip() + os.path.splitext(source)[1]
+            else:
+                name = os.path.basename(source)
+            sources.append((source, name))
+            targets[source] = item_ids
+        else:
+            by_name = {str(item_id).lower(): item_id for item_id in self.model.item_ids}
+            for source in files:
+                name = os.path.basename(source)
+                sources.append((source, name))
+                item_id = by_name.get(os.path.splitext(name)[0].lower())
+                if item_id is not None:
+                    targets[source] = [item_id]
+        
+        self.icon_import_targets = targets
+        self.icon_import_file = self.file_path
+        self.import_progress.setRange(0, len(sources))
+        self.import_progress.setValue(0)
+        self.import_progress.show()
+        self.show_status(f"🖼️ Importing {len(sources)} icon(s)...")
+        self.icon_importer.start(sources, self.icons_dir())
+        
+    def on_icon_import_progress(self, done, total):
+        self.import_progress.setValue(done)
+        
+    def on_icons_imported(self, batch):
+        """Point the matched items at their imported icons in one undoable step"""
+        self.import_progress.hide()
+        for name in set(batch.names.values()):
+            self.thumbnails.invalidate(name)
+            self.gallery_thumbnails.invalidate(name)
+        self.scan_icon_files()
+        
+        records = []
+        if self.icon_import_file == self.file_path and self.loader is None:
+            for source, name in batch.names.items():
+                item_ids = [item_id for item_id in self.icon_import_targets.get(source, ())
+                            if item_id in self.model.item_data]
+                records += set_records(item_ids, self.model.item_data, "icon", name)
+        self.icon_import_targets = {}
+        if records:
+            self.model.push_records(records, f"Set icon of {len(records)} items")
+        
+        copied = len(batch.names) - len(batch.reused)
+        message = f"🖼️ Imported {copied} new icon(s)"
+        if batch.reused:
+            message += f", {len(batch.reused)} matched an existing file"
+        message += f"; {len(records)} item(s) updated"
+        errors = {source: error for source, error in batch.errors.items() if error != "cancelled"}
+        if errors:
+            message += f"; {len(errors)} failed"
+            details = "\n".join(f"{os.path.basename(source)}: {error}" for source, error in list(errors.items())[:10])
+            QMessageBox.warning(self, "Icon Import", f"{len(errors)} file(s) could not be imported:\n\n{details}")
+        self.show_status(message)
+        
+    def on_edit_rejected(self, index, message):
+        """Explain a refused edit next to the cell"""
+        self.show_status(f"⚠️ {message}")
+        rect = self.table.visualRect(self.proxy.mapFromSource(index))
+        QToolTip.showText(self.table.viewport().mapToGlobal(rect.bottomLeft()), message, self.table)
+        
     def load_json(self):
         """Load a different JSON file via file dialog"""
         file_name, _ = QFileDialog.getOpenFileName(
-            self, "Open itemConfigs JSON", "", "JSON Files (*.json);;All Files (*)"
+            self, "Open itemConfigs Catalog", "", file_filters()
         )
         if file_name:
-            try:
-                self.load_json_file(file_name)
+            def loaded():
                 self.show_status(f"📁 Loaded {len(self.data)} items from {os.path.basename(file_name)}")
-                
-            except Exception as e:
-                QMessageBox.critical(self, "Error Loading File", f"Failed to load JSON file:\n{str(e)}")
+            
+            def failed(error):
+                QMessageBox.critical(self, "Error Loading File", f"Failed to load JSON file:\n{error}")
                 self.show_status("❌ Failed to load file")
+            
+            try:
+                self.load_json_file(file_name, loaded, failed)
+            except Exception as e:
+                failed(str(e))
 
     def update_search_columns(self):
         """Update the search column dropdown with current table headers"""
+        current = self.search_column.currentText()
+        self.search_column.blockSignals(True)
         self.search_column.clear()
         self.search_column.addItem("All Columns")
         
-        for col in range(self.table.columnCount()):
-            header_item = self.table.horizontalHeaderItem(col)
-            if header_item:
-                self.search_column.addItem(header_item.text())
+        for column in self.model.columns:
+            self.search_column.addItem(column)
+        
+        # Keep the selected column if it still exists
+        self.search_column.setCurrentIndex(max(0, self.search_column.findText(current)))
+        self.search_column.blockSignals(False)
+        if self.search_column.currentText() != current:
+            self.filter_table()
 
-    def populate_table(self):
+    def populate_table(self, layout=None):
         """Populate the table with data"""
-        if not self.data:
+        if self.data is None:
             return
             
-        self.table.setRowCount(len(self.data))
-        
-        # Get all possible keys from all items to determine columns needed
-        all_keys = set()
-        for item in self.data.values():
-            if isinstance(item, dict):
-                all_keys.update(item.keys())
-        
-        # Standard columns
-        standard_columns = ["displayName", "category", "rarity", "maxDurability", "icon", "maxStackSize"]
-        
-        # Add any additional columns found in the data
-        additional_columns = list(all_keys - set(standard_columns))
-        all_columns = standard_columns + additional_columns
-        
-        # Update table columns if needed
-        if self.table.columnCount() != len(all_columns) + 1:  # +1 for ID column
-            self.table.setColumnCount(len(all_columns) + 1)
-            headers = ["ID"] + all_columns
-            self.table.setHorizontalHeaderLabels(headers)
-        
-        # Populate rows
-        for row_idx, (item_id, item) in enumerate(self.data.items()):
-            # ID column
-            self.table.setItem(row_idx, 0, QTableWidgetItem(str(item_id)))
-            
-            # Data columns
-            for col_idx, key in enumerate(all_columns, 1):
-                value = item.get(key, "") if isinstance(item, dict) else ""
-                self.table.setItem(row_idx, col_idx, QTableWidgetItem(str(value)))
+        # The model reads cells from self.data lazily, so this is O(columns)
+        with METRICS.timed("populate"):
+            self.model.set_item_data(self.data, layout)
         
         self.show_status(f"Displaying {len(self.data)} items")
 
+    def on_model_reset(self):
+        """Start a fresh search index and re-apply the current search"""
+        if self.model.reset_rows is not None:
+            # Bulk insert/delete: only the affected rows change in the index
+            op, rows = self.model.reset_rows
+            if op == "insert":
+                self.search_index.insert_rows_at(rows)
+            else:
+                self.search_index.remove_rows_at(rows)
+        else:
+            self.search_index.reset(self.model.rowCount(), self.model.columnCount())
+        if self.search_input.text().strip():
+            self.filter_table()
+        else:
+            self.proxy.set_mask(None)
+
+    def on_model_data_changed(self, top_left, bottom_right, roles=None):
+        """Keep the search index in step with edited cells"""
+        if roles and Qt.ItemDataRole.DisplayRole not in roles:
+            return  # e.g. a thumbnail finished decoding
+        rows = range(top_left.row(), bottom_right.row() + 1)
+        columns = range(top_left.column(), bottom_right.column() + 1)
+        if len(rows) * len(columns) > 1000:
+            self.search_index.update_block(rows[0], columns[0], rows[-1], columns[-1])
+            return
+        for row in rows:
+            for col in columns:
+                self.search_index.update_cell(row, col)
+
+    def schedule_filter(self):
+        """Restart the debounce timer; the search runs once typing pauses"""
+        self.search_timer.start()
+
     def filter_table(self):
         """Filter table based on search input"""
-        search_text = self.search_input.text().lower()
-        search_column = self.search_column.currentText()
+        self.search_timer.stop()
+        search_text = self.search_input.text()
         
-        if not search_text:
-            # Show all rows if search is empty
-            for row in range(self.table.rowCount()):
-                self.table.setRowHidden(row, False)
-            return
+        # Plain terms are limited to the selected column, if any
+        col_index = self.search_column.currentIndex() - 1  # -1 because "All Columns" is first
+        default_column = col_index if 0 <= col_index < self.model.columnCount() else None
         
-        # Hide/show rows based on search
-        for row in range(self.table.rowCount()):
-            should_show = False
-            
-            if search_column == "All Columns":
-                # Search in all columns
-                for col in range(self.table.columnCount()):
-                    item = self.table.item(row, col)
-                    if item and search_text in item.text().lower():
-                        should_show = True
-                        break
-            else:
-                # Search in specific column
-                col_index = self.search_column.currentIndex() - 1  # -1 because "All Columns" is first
-                if col_index >= 0 and col_index < self.table.columnCount():
-                    item = self.table.item(row, col_index)
-                    if item and search_text in item.text().lower():
-                        should_show = True
+        with METRICS.timed("filter"):
+            terms = parse_query(search_text, self.model.columns, default_column)
+            mask = self.search_index.search(terms)
             
-            self.table.setRowHidden(row, not should_show)
+            # Show/hide all rows in one batch through the proxy
+            self.proxy.set_mask(mask)
+        if mask is not None:
+            self.show_status(f"🔍 {self.proxy.rowCount()} of {self.model.rowCount()} items match")
 
     def clear_search(self):
         """Clear search input and show all rows"""
         self.search_input.clear()
-        for row in range(self.table.rowCount()):
-            self.table.setRowHidden(row, False)
+        self.filter_table()
 
     def add_column(self):
         """Add a new column to the table"""
@@ -367,75 +2291,331 @@ class ItemConfigsEditor(QMainWindow):
         if ok and column_name.strip():
             column_name = column_name.strip()
             
-            # Add column to table
-            current_columns = self.table.columnCount()
-            self.table.setColumnCount(current_columns + 1)
-            
-            # Update headers
-            headers = []
-            for col in range(current_columns):
-                header_item = self.table.horizontalHeaderItem(col)
-                headers.append(header_item.text() if header_item else f"Column {col}")
-            headers.append(column_name)
-            
-            self.table.setHorizontalHeaderLabels(headers)
-            
-            # Add empty cells for existing rows
-            for row in range(self.table.rowCount()):
-                self.table.setItem(row, current_columns, QTableWidgetItem(""))
+            if self.model.column_of(column_name) != -1:
+                QMessageBox.warning(self, "Add Column", f"Column '{column_name}' already exists.")
+                return
             
-            # Update search columns
-            self.update_search_columns()
+            # Add column to the model; cells read as empty until edited
+            self.model.push_records([{"op": "add_column", "name": column_name}], f"Add column {column_name}")
             self.show_status(f"Added column: {column_name}")
 
-    def delete_row_with_confirmation(self, row, item_id):
-        """Delete a single row with double confirmation"""
-        # First confirmation
-        reply1 = QMessageBox.question(
-            self, 
-            "Delete Row - First Confirmation",
-            f"Are you sure you want to delete the row for:\n\n'{item_id}'?\n\nThis action cannot be undone.",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-            QMessageBox.StandardButton.No
+    def show_header_menu(self, position):
+        """Column operations for the header section under the cursor"""
+        header = self.table.horizontalHeader()
+        col = header.logicalIndexAt(position)
+        name = self.model.columns[col] if col > 0 else None
+        menu = QMenu(self)
+        if name is not None:
+            rename_action = menu.addAction(f"✏️ Rename Column '{name}'...")
+            rename_action.triggered.connect(lambda: self.rename_column(name))
+            remove_action = menu.addAction(f"🗑️ Remove Column '{name}'")
+            remove_action.triggered.connect(lambda: self.remove_column(name))
+            menu.addSeparator()
+        menu.addAction("➕ Add Column...").triggered.connect(self.add_column)
+        menu.addAction("↺ Reset Column Layout").triggered.connect(self.reset_column_layout)
+        menu.exec(header.mapToGlobal(position))
+
+    def rename_column(self, name):
+        """Rename a column in every item (one undoable step)"""
+        new_name, ok = QInputDialog.getText(self, "Rename Column", f"New name for '{name}':", text=name)
+        new_name = new_name.strip()
+        if not ok or not new_name or new_name == name:
+            return
+        if self.model.column_of(new_name) != -1:
+            QMessageBox.warning(self, "Rename Column", f"Column '{new_name}' already exists.")
+            return
+        self.model.push_records([{"op": "rename_column", "name": name, "to": new_name}],
+                                f"Rename column {name} to {new_name}")
+        self.show_status(f"✏️ Renamed column {name} to {new_name}")
+
+    def remove_column(self, name):
+        """Remove a column from every item (one undoable step)"""
+        reply = QMessageBox.question(
+            self, "Remove Column", f"Remove column '{name}' from every item?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
-        
-        if reply1 != QMessageBox.StandardButton.Yes:
+        if reply != QMessageBox.StandardButton.Yes:
             return
-        
-        # Second confirmation
-        reply2 = QMessageBox.question(
-            self,
-            "Delete Row - Final Confirmation",
-            f"⚠️ FINAL CONFIRMATION ⚠️\n\nYou are about to permanently delete:\n'{item_id}'\n\nThis action CANNOT be undone!\n\nAre you absolutely sure?",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-            QMessageBox.StandardButton.No
+        self.model.push_records([{"op": "remove_column", "name": name}], f"Remove column {name}")
+        self.show_status(f"🗑️ Removed column {name}")
+
+    def on_column_layout_changed(self, *args):
+        if not self.restoring_layout and self.loader is None and self.file_path:
+            self.layout_timer.start()
+
+    def column_layout_key(self):
+        path = os.path.abspath(self.file_path)
+        return f"{COLUMN_LAYOUT_GROUP}/{hashlib.sha1(path.encode('utf-8', 'surrogatepass')).hexdigest()}"
+
+    def save_column_layout(self):
+        """Remember the open file's column order and widths"""
+        self.layout_timer.stop()
+        if not self.file_path:
+            return
+        header = self.table.horizontalHeader()
+        columns = self.model.columns
+        count = min(header.count(), len(columns))
+        state = {
+            "path": os.path.abspath(self.file_path),
+            "order": [columns[header.logicalIndex(visual)] for visual in range(count)],
+            "widths": {columns[col]: header.sectionSize(col) for col in range(count)},
+        }
+        self.settings.setValue(self.column_layout_key(), json.dumps(state))
+
+    def restore_column_layout(self):
+        """Apply the column order and widths saved for the open file, if any"""
+        order, widths = [], {}
+        if self.file_path:
+            try:
+                state = json.loads(self.settings.value(self.column_layout_key(), "") or "{}")
+                order, widths = list(state.get("order", [])), dict(state.get("widths", {}))
+            except (ValueError, TypeError, AttributeError):
+                pass  # Unreadable entry: keep the file's own order
+        self.apply_column_layout(order, widths)
+
+    def apply_column_layout(self, order, widths):
+        """Show the named columns first, in order, then the rest in file order"""
+        header = self.table.horizontalHeader()
+        # The header keeps moved sections across model resets, e.g. from the previous file
+        logical = [self.model.column_of(name) for name in order]
+        logical = list(dict.fromkeys(col for col in logical if col != -1))
+        placed = set(logical)
+        logical += [col for col in range(header.count()) if col not in placed]
+        self.restoring_layout = True
+        try:
+            for visual, col in enumerate(logical):
+                if header.visualIndex(col) != visual:
+                    header.moveSection(header.visualIndex(col), visual)
+            for name, width in widths.items():
+                col = self.model.column_of(name)
+                if col != -1 and isinstance(width, int) and width > 0:
+                    header.resizeSection(col, width)
+        finally:
+            self.restoring_layout = False
+
+    def reset_column_layout(self):
+        """Show the columns in file order again and forget the saved layout"""
+        self.apply_column_layout([], {})
+        self.layout_timer.stop()
+        if self.file_path:
+            self.settings.remove(self.column_layout_key())
+
+    def show_cross_reference(self):
+        """Check references between itemConfigs, itemIds and icons/ next to the loaded file"""
+        folder = os.path.dirname(self.icons_dir())
+        if self.xref is None or os.path.abspath(self.xref.folder) != folder:
+            self.xref = CrossReference(folder)
+        # Only files changed since the last check are read again
+        changed = self.xref.refresh()
+        self.show_status(f"🔗 Cross-checked {os.path.basename(folder) or folder} ({len(changed)} source(s) re-read)")
+        CrossReferenceDialog(self.xref, self).exec()
+
+    def compare_with_file(self):
+        """Review the differences between the loaded catalog and another file"""
+        if self.data is None or self.loader is not None:
+            self.show_status("⚠️ Load a file before comparing")
+            return
+        start_dir = os.path.dirname(self.file_path or "") or os.getcwd()
+        other_path, _ = QFileDialog.getOpenFileName(self, "Compare With", start_dir, file_filters())
+        if not other_path:
+            return
+        self.show_status(f"🔀 Comparing with {os.path.basename(other_path)}...")
+        try:
+            other_items, _ = read_any(other_path)
+        except (OSError, ValueError) as e:
+            self.show_status(f"❌ Could not read {os.path.basename(other_path)}")
+            QMessageBox.critical(self, "Compare Failed", f"Failed to read {other_path}:\n{e}")
+            return
+        dialog = CatalogDiffDialog(other_path, other_items, self)
+        self.show_status(f"🔀 {dialog.summary.text()}")
+        dialog.exec()
+
+    def export_catalog(self):
+        """Write the loaded catalog (with unsaved edits) in another format"""
+        if self.data is None or self.loader is not None:
+            self.show_status("⚠️ Load a file before exporting")
+            return
+        formats = [fmt for fmt in FORMATS.values() if fmt.name != "json"]
+        start = os.path.splitext(self.file_path or "itemConfigs.json")[0] + formats[0].extensions[0]
+        path, chosen = QFileDialog.getSaveFileName(
+            self, "Export Catalog", start, ";;".join(fmt.file_filter() for fmt in formats)
         )
+        if not path:
+            return
+        # A known extension picks the format, otherwise the chosen filter does
+        catalog_format = next((fmt for fmt in formats if fmt.file_filter() == chosen), formats[0])
+        extension = os.path.splitext(path)[1].lower()
+        if not extension:
+            path += catalog_format.extensions[0]
+        elif any(extension in fmt.extensions for fmt in FORMATS.values()):
+            catalog_format = format_for_path(path)
+        if os.path.abspath(path) == os.path.abspath(self.file_path or ""):
+            QMessageBox.warning(self, "Export", "Use Save Changes to write the open file itself.")
+            return
+        self.show_status(f"📤 Exporting {len(self.model.item_ids)} items to {os.path.basename(path)}...")
+        try:
+            export_catalog(path, self.model.item_data, self.model.item_ids, self.model.columns[1:],
+                           self.model.writer.layout, catalog_format.name)
+        except (OSError, ValueError) as e:
+            self.show_status("❌ Export failed")
+            QMessageBox.critical(self, "Export Error", f"Failed to export to {path}:\n{e}")
+            return
+        self.show_status(f"📤 Exported {len(self.model.item_ids)} items to {os.path.basename(path)} "
+                         f"({catalog_format.description})")
+
+    def on_view_changed(self, tab):
+        """Bring the current item into view when switching between table and gallery"""
+        view = self.views.widget(tab)
+        current = view.currentIndex()
+        if current.isValid():
+            view.scrollTo(current)
         
-        if reply2 == QMessageBox.StandardButton.Yes:
-            try:
-                # Get the item ID before removing the row
-                id_item = self.table.item(row, 0)
-                deleted_id = id_item.text() if id_item else f"Row {row + 1}"
-                
-                # Remove the row from table
-                self.table.removeRow(row)
-                
-                # Remove from data dict if it exists
-                if self.data and deleted_id in self.data:
-                    del self.data[deleted_id]
-                
-                self.show_status(f"Deleted row: {deleted_id}")
-                
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to delete row:\n{str(e)}")
-                self.show_status("Delete failed")
+    def show_in_table(self, index):
+        """Open a gallery tile's row in the table"""
+        self.views.setCurrentWidget(self.table)
+        self.select_item(self.model.item_ids[self.proxy.mapToSource(index).row()])
+        
+    def select_item(self, item_id):
+        """Select and scroll to an item's row, clearing a search that hides it"""
+        row = self.model.row_for(item_id)
+        if row == -1:
+            self.show_status(f"{item_id} is not in the table")
+            return
+        index = self.proxy.mapFromSource(self.model.index(row, 0))
+        if not index.isValid():
+            self.clear_search()
+            index = self.proxy.mapFromSource(self.model.index(row, 0))
+        self.table.selectRow(index.row())
+        self.table.scrollTo(index)
+        if self.views.currentWidget() is self.gallery:
+            self.gallery.scrollTo(index)
+
+    def delete_rows(self, rows):
+        """Delete rows by model row number as one undoable step"""
+        item_ids = [self.model.item_ids[row] for row in rows if 0 <= row < len(self.model.item_ids)]
+        if not item_ids:
+            return
+        text = f"Delete {item_ids[0]}" if len(item_ids) == 1 else f"Delete {len(item_ids)} rows"
+        try:
+            self.model.push_records([{"op": "remove", "ids": item_ids}], text)
+            self.show_status(f"Deleted row: {', '.join(item_ids[:3])}{'...' if len(item_ids) > 3 else ''} (Ctrl+Z to undo)")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to delete row:\n{str(e)}")
+            self.show_status("Delete failed")
 
     def delete_selected_rows(self):
-        """This method is no longer used - kept for compatibility"""
-        pass
+        """Delete every row with a selected cell"""
+        self.delete_rows(self.table.selected_source_rows())
+
+    def bulk_rows_prompt(self, rows, title):
+        """Valid rows (sorted, once each) for a bulk operation, or None when
+        nothing usable is selected"""
+        if self.loader is not None:
+            self.show_status("⏳ Still loading - try again once the file has finished loading")
+            return None
+        rows = sorted({row for row in rows if 0 <= row < len(self.model.item_ids)})
+        if not rows:
+            QMessageBox.information(self, title, "Select the rows to change first.")
+            return None
+        return rows
+
+    def bulk_set_field(self, rows):
+        """Give one field the same value on many rows, as one undoable step"""
+        rows = self.bulk_rows_prompt(rows, "Set Field")
+        if rows is None:
+            return
+        item_ids = [self.model.item_ids[row] for row in rows]
+        key, ok = QInputDialog.getItem(
+            self, "Set Field", f"Field to set on {len(item_ids)} item(s):", self.model.columns[1:], 0, False
+        )
+        if not ok:
+            return
+        text, ok = QInputDialog.getText(self, "Set Field", f"New value for {key}:")
+        if not ok:
+            return
+        # Existing values decide the type (number, nested JSON, text)
+        current = next((item[key] for item in map(self.model.item_data.get, item_ids)
+                        if isinstance(item, Mapping) and key in item), None)
+        try:
+            value = coerce_value(key, text, current, self.model.column_schema(key))
+        except ValueError as e:
+            QMessageBox.warning(self, "Set Field", f"Invalid value for {key}:\n{str(e)}")
+            return
+        records = set_records(item_ids, self.model.item_data, key, value)
+        if not records:
+            self.show_status(f"{key} already has that value on the selected items")
+            return
+        self.model.push_records(records, f"Set {key} on {len(records)} items")
+        self.show_status(f"✏️ Set {key} on {len(records)} item(s) (Ctrl+Z to undo)")
+
+    def bulk_scale_field(self, rows):
+        """Rewrite a numeric field on many rows with an expression of its value"""
+        rows = self.bulk_rows_prompt(rows, "Scale Field")
+        if rows is None:
+            return
+        item_ids = [self.model.item_ids[row] for row in rows]
+        columns = self.model.columns[1:]
+        default = next((columns.index(key) for key in NUMERIC_FIELDS if key in columns), 0)
+        key, ok = QInputDialog.getItem(
+            self, "Scale Field", f"Numeric field to change on {len(item_ids)} item(s):", columns, default, False
+        )
+        if not ok:
+            return
+        text, ok = QInputDialog.getText(
+            self, "Scale Field",
+            f"New {key} as an expression of x (the current value),\n"
+            "e.g. x * 1.5   or   max(1, round(x / 2)):",
+            text="x"
+        )
+        if not ok or not text.strip():
+            return
+        try:
+            function = compile_expression(text)
+        except ValueError as e:
+            QMessageBox.warning(self, "Scale Field", str(e))
+            return
+        records, skipped = scale_records(item_ids, self.model.item_data, key, function)
+        skipped_text = f", {skipped} without a number skipped" if skipped else ""
+        if not records:
+            self.show_status(f"No {key} values changed{skipped_text}")
+            return
+        self.model.push_records(records, f"Scale {key} on {len(records)} items")
+        self.show_status(f"✖️ Changed {key} on {len(records)} item(s){skipped_text} (Ctrl+Z to undo)")
+
+    def bulk_duplicate(self, rows):
+        """Copy rows under new IDs built from a pattern, e.g. Helmet_0{n} -> Helmet_Tactical_0{n}"""
+        rows = self.bulk_rows_prompt(rows, "Duplicate")
+        if rows is None:
+            return
+        match, ok = QInputDialog.getText(
+            self, "Duplicate",
+            f"Pattern matching the {len(rows)} ID(s); {{name}} matches any text\n"
+            "({id} is the whole ID), e.g. Helmet_0{n}:",
+            text="{id}"
+        )
+        if not ok or not match:
+            return
+        replace, ok = QInputDialog.getText(
+            self, "Duplicate", "New ID using the same placeholders, e.g. Helmet_Tactical_0{n}:",
+            text="{id}_copy" if match == "{id}" else match
+        )
+        if not ok or not replace:
+            return
+        try:
+            record = duplicate_records(rows, self.model.item_ids, self.model.item_data, match, replace)
+        except ValueError as e:
+            QMessageBox.warning(self, "Duplicate", str(e))
+            return
+        count = len(record["rows"])
+        self.model.push_records([record], f"Duplicate {count} items")
+        self.show_status(f"📑 Duplicated {count} item(s) (Ctrl+Z to undo)")
 
     def save_json(self):
         """Save the current table data back to JSON"""
+        if self.loader is not None:
+            # Saving now would drop the items that have not been read yet
+            self.show_status("⏳ Still loading - save once the file has finished loading")
+            return
         if not self.file_path:
             # If no file path, try to save to itemConfigs.json in current folder
             self.file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "itemConfigs.json")
@@ -450,62 +2630,72 @@ class ItemConfigsEditor(QMainWindow):
                 return
         
         try:
-            updated = {}
-            
-            # Get column headers
-            headers = []
-            for col in range(1, self.table.columnCount()):  # Skip ID column
-                header_item = self.table.horizontalHeaderItem(col)
-                headers.append(header_item.text() if header_item else f"column_{col}")
+            item_count, rewritten = self.write_catalog()
             
-            # Process each row
-            for row in range(self.table.rowCount()):
-                # Skip hidden rows (filtered out)
-                if self.table.isRowHidden(row):
-                    continue
-                    
-                id_item = self.table.item(row, 0)
-                if not id_item or not id_item.text().strip():
-                    continue
-                    
-                item_id = id_item.text().strip()
-                item_data = {}
-                
-                # Process each data column
-                for col_idx, header in enumerate(headers, 1):
-                    cell_item = self.table.item(row, col_idx)
-                    cell_value = cell_item.text().strip() if cell_item else ""
-                    
-                    # Try to convert numeric values
-                    if header in ["maxDurability", "maxStackSize"]:
-                        try:
-                            item_data[header] = int(cell_value) if cell_value else 0
-                        except ValueError:
-                            item_data[header] = cell_value
-                    else:
-                        item_data[header] = cell_value
-                
-                updated[item_id] = item_data
-            
-            # Save to file
-            output_data = {"itemConfigs": updated}
-            
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(output_data, f, indent=4, ensure_ascii=False)
-            
-            # Update data reference
-            self.data = updated
-            
-            QMessageBox.information(self, "Save Successful", f"File saved successfully!\n\nFile: {os.path.basename(self.file_path)}\nSaved {len(updated)} items.")
-            self.show_status(f"💾 Saved {len(updated)} items to {os.path.basename(self.file_path)}")
+            QMessageBox.information(self, "Save Successful", f"File saved successfully!\n\nFile: {os.path.basename(self.file_path)}\nSaved {item_count} items.")
+            self.show_status(f"💾 Saved {item_count} items to {os.path.basename(self.file_path)} ({rewritten} rewritten)")
             
         except Exception as e:
             QMessageBox.critical(self, "Save Error", f"Failed to save file:\n{str(e)}")
             self.show_status("❌ Save failed")
 
+    def write_catalog(self):
+        """Write all items (including rows hidden by the search) to self.file_path.
+        
+        JSON files re-serialize only the items edited since the last save and
+        are replaced atomically; a paged database gets only its edited rows,
+        other formats are rewritten in full. Returns (items saved, items rewritten).
+        """
+        model = self.model
+        if isinstance(model.item_data, SqliteItems):
+            # Only edited rows go back to the database
+            with METRICS.timed("save"):
+                rewritten = model.item_data.save(model.columns[1:])
+            model.writer.reset()
+        elif self.file_format != "json":
+            export_catalog(self.file_path, model.item_data, model.item_ids, model.columns[1:],
+                           model.writer.layout, self.file_format)
+            rewritten = len(model.item_ids)
+            model.writer.reset()
+        else:
+            with METRICS.timed("save"):
+                rewritten = model.writer.save(self.file_path, model.item_ids, model.item_data, model.columns[1:])
+        if self.file_format == "json" and self.watcher.path != os.path.abspath(self.file_path):
+            self.watcher.watch(self.file_path)
+        self.watcher.note_saved()
+        # Everything journaled so far is now in the file
+        if self.model.journal is None or self.model.journal.catalog_path != self.file_path:
+            self.model.journal = EditJournal(self.file_path)
+        self.model.journal.start()
+        return len(self.model.item_ids), rewritten
+
     def closeEvent(self, event):
         """Handle application closing"""
-        # You could add unsaved changes detection here
+        if self.model.writer.has_changes() and self.loader is None:
+            reply = QMessageBox.question(
+                self,
+                "Unsaved Changes",
+                f"{self.model.writer.change_count()} item(s) have unsaved changes.\n\nSave before closing?",
+                QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel,
+                QMessageBox.StandardButton.Save
+            )
+            if reply == QMessageBox.StandardButton.Cancel:
+                event.ignore()
+                return
+            if reply == QMessageBox.StandardButton.Save:
+                self.save_json()
+                if self.model.writer.has_changes():
+                    event.ignore()  # Save failed or was declined
+                    return
+            elif self.model.journal is not None:
+                self.model.journal.discard()
+        self.cancel_loading()
+        if self.layout_timer.isActive():
+            self.save_column_layout()
+        self.watcher.unwatch()
+        self.icon_importer.cancel()
+        if self.model.journal is not None:
+            self.model.journal.close()
         event.accept()
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from catalog_cli import main
+
+ITEMS = {
+    "Medkit": {"displayName": "Medkit", "category": "consumables", "rarity": "common",
+               "maxDurability": -1, "icon": "", "maxStackSize": 10,
+               "attachment_weapon": "", "attachment_type": ""},
+    "Scrap": {"displayName": "Scrap", "category": "materials", "rarity": "common",
+              "maxDurability": -1, "icon": "", "maxStackSize": 50,
+              "attachment_weapon": "", "attachment_type": ""},
+}
+
+
+def write_catalog(path, items):
+    path.write_text(json.dumps({"itemConfigs": items}, indent=4, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def read_items(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["itemConfigs"]
+
+
+def test_set_changes_only_matching_items(tmp_path):
+    path = write_catalog(tmp_path / "c.json", ITEMS)
+    assert main(["set", path, "--where", "category:materials", "--set", "maxStackSize=99"]) == 0
+    items = read_items(path)
+    assert items["Scrap"]["maxStackSize"] == 99
+    assert items["Medkit"] == ITEMS["Medkit"]
+
+
+def test_set_dry_run_leaves_file(tmp_path):
+    path = write_catalog(tmp_path / "c.json", ITEMS)
+    before = open(path, encoding="utf-8").read()
+    assert main(["set", path, "--set", "rarity=rare", "--dry-run"]) == 0
+    assert open(path, encoding="utf-8").read() == before
+
+
+def test_set_coerces_by_column_type(tmp_path):
+    items = {"a": {"displayName": "A", "weight": 1, "tradeable": True},
+             "b": {"displayName": "B", "weight": 2, "tradeable": True}}
+    path = write_catalog(tmp_path / "c.json", items)
+    assert main(["set", path, "--where", "displayName:B", "--set", "weight=7",
+                 "--set", "tradeable=false", "--set", "displayName=42"]) == 0
+    assert read_items(path)["b"] == {"displayName": "42", "weight": 7, "tradeable": False}
+
+
+def test_set_rejects_bad_value(tmp_path, capsys):
+    items = {"a": {"displayName": "A", "weight": 1}}
+    path = write_catalog(tmp_path / "c.json", items)
+    before = open(path, encoding="utf-8").read()
+    assert main(["set", path, "--set", "weight=heavy"]) == 2
+    assert "weight" in capsys.readouterr().err
+    assert open(path, encoding="utf-8").read() == before
+
+
+def test_set_does_not_pad_items(tmp_path):
+    items = {"a": {"displayName": "A"}, "b": {"displayName": "B", "icon": "b.png"}}
+    path = write_catalog(tmp_path / "d.json", items)
+    assert main(["set", path, "--set", "category=armor"]) == 0
+    assert read_items(path) == {"a": {"displayName": "A", "category": "armor"},
+                                "b": {"displayName": "B", "icon": "b.png", "category": "armor"}}
+
+
+@pytest.mark.parametrize("items, status", [
+    (ITEMS, 0),
+    ({**ITEMS, "Broken": {**ITEMS["Scrap"], "maxStackSize": -1}}, 1),
+])
+def test_validate_exit_status(tmp_path, items, status):
+    path = write_catalog(tmp_path / "c.json", items)
+    assert main(["validate", "--no-cache", "-j", "1", path]) == status
+
+
+def test_validate_fails_unreadable_file(tmp_path):
+    path = tmp_path / "c.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert main(["validate", "--no-cache", "-j", "1", str(path)]) == 1
+
+
+def test_validate_fails_if_any_file_fails(tmp_path):
+    good = write_catalog(tmp_path / "good.json", ITEMS)
+    bad = write_catalog(tmp_path / "bad.json", {"x": {**ITEMS["Scrap"], "category": "nonsense"}})
+    assert main(["validate", "--no-cache", "-j", "1", good, bad]) == 1
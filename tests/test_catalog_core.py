@@ -0,0 +1,333 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from catalog_core import (
+    LAYOUT_ARRAY, LAYOUT_ITEM_CONFIGS, Catalog, CatalogStream, CatalogWriter, EditJournal, catalog_digests,
+    compile_expression, duplicate_records, encode_records, plan_reload,
+)
+
+ITEMS = {
+    "Medkit": {"displayName": "Medkit", "category": "consumables", "rarity": "common",
+               "maxDurability": -1, "icon": "", "maxStackSize": 10,
+               "attachment_weapon": "", "attachment_type": ""},
+    "Scrap": {"displayName": "Scrap", "category": "materials", "rarity": "common",
+              "maxDurability": -1, "icon": "", "maxStackSize": 50,
+              "attachment_weapon": "", "attachment_type": ""},
+    "Odd": {"displayName": "Odd \"one\"", "weight": 1.5, "tradeable": True, "tags": ["a", None]},
+}
+
+ITEM_IDS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "itemIds.json")
+
+
+def canonical(items, layout=LAYOUT_ITEM_CONFIGS):
+    if layout == LAYOUT_ARRAY:
+        document = list(items.values())
+    else:
+        document = {"itemConfigs": items}
+    return json.dumps(document, indent=4, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("layout", [LAYOUT_ITEM_CONFIGS, LAYOUT_ARRAY])
+def test_round_trip_is_byte_identical(tmp_path, layout):
+    path = tmp_path / "itemConfigs.json"
+    items = ITEMS
+    if layout == LAYOUT_ARRAY:
+        items = {item_id: {"itemId": item_id, **item} for item_id, item in ITEMS.items()}
+    text = canonical(items, layout)
+    path.write_text(text, encoding="utf-8")
+    catalog = Catalog.load(str(path))
+    catalog.save(str(tmp_path / "copy.json"))
+    assert (tmp_path / "copy.json").read_text(encoding="utf-8") == text
+
+
+def test_save_rewrites_only_edited_items(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    path.write_text(canonical(ITEMS), encoding="utf-8")
+    catalog = Catalog.load(str(path))
+    catalog.save()
+    catalog.set_value("Scrap", "maxStackSize", 99)
+    assert catalog.save() == 1
+    expected = json.loads(canonical(ITEMS))
+    expected["itemConfigs"]["Scrap"]["maxStackSize"] = 99
+    assert path.read_text(encoding="utf-8") == json.dumps(expected, indent=4, ensure_ascii=False)
+    assert catalog.save() == 0
+
+
+
+@pytest.mark.parametrize("indent, newline", [(2, "\n"), (None, "\n"), ("\t", "\r\n")])
+def test_save_keeps_the_files_own_formatting(tmp_path, indent, newline):
+    path = tmp_path / "itemConfigs.json"
+    text = json.dumps({"itemConfigs": ITEMS}, indent=indent, ensure_ascii=False)
+    path.write_bytes(text.replace("\n", newline).encode("utf-8"))
+    original = path.read_bytes()
+    catalog = Catalog.load(str(path))
+    catalog.save()
+    assert path.read_bytes() == original
+    catalog.set_value("Scrap", "maxStackSize", 99)
+    assert catalog.save() == 1
+    saved = path.read_bytes()
+    assert json.loads(saved)["itemConfigs"]["Scrap"]["maxStackSize"] == 99
+    # Untouched records are the file's own text and the edited one follows its style
+    expected = json.loads(original)
+    expected["itemConfigs"]["Scrap"]["maxStackSize"] = 99
+    text = json.dumps(expected, indent=indent, ensure_ascii=False)
+    assert saved == text.replace("\n", newline).encode("utf-8")
+
+
+def test_save_keeps_untouched_array_records(tmp_path):
+    path = tmp_path / "itemIds.json"
+    records = [{"itemId": item_id, **item} for item_id, item in ITEMS.items()]
+    lines = ",\n".join("  " + json.dumps(record, ensure_ascii=False) for record in records)
+    path.write_text("[\n" + lines + "\n]\n", encoding="utf-8")
+    original = path.read_text(encoding="utf-8")
+    catalog = Catalog.load(str(path))
+    catalog.set_value("Odd", "weight", 2.5)
+    catalog.remove("Medkit")
+    catalog.save()
+    saved = path.read_text(encoding="utf-8").splitlines()
+    assert saved[0] == "[" and saved[1] == original.splitlines()[2].rstrip(",") + ","
+    assert json.loads("\n".join(saved))[1]["weight"] == 2.5
+
+
+def test_stream_keeps_item_text_across_chunks(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    text = json.dumps({"itemConfigs": ITEMS}, indent=1)
+    path.write_text(text, encoding="utf-8")
+    stream = CatalogStream(str(path), chunk_size=7, keep_source=True)
+    assert dict(stream) == ITEMS
+    source = stream.source
+    assert set(source.fragments) == set(ITEMS)
+    assert source.head + source.separator.join(source.fragments.values()) + source.tail == text
+
+
+def test_catalog_does_not_pad_items(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    path.write_text(canonical(ITEMS), encoding="utf-8")
+    catalog = Catalog.load(str(path))
+    catalog.set_value("Odd", "category", "materials")
+    catalog.save()
+    saved = json.loads(path.read_text(encoding="utf-8"))["itemConfigs"]
+    assert list(saved["Odd"]) == ["displayName", "weight", "tradeable", "tags", "category"]
+    assert saved["Medkit"] == ITEMS["Medkit"]
+
+
+def test_writer_pads_dirty_items_with_columns():
+    items = {"a": {"displayName": "A"}, "b": {"displayName": "B"}}
+    columns = ["displayName", "category"]
+    padded = CatalogWriter()
+    padded.mark_item("a")
+    written = json.loads(padded.render(list(items), items, columns))["itemConfigs"]
+    assert written == {"a": {"displayName": "A", "category": ""}, "b": {"displayName": "B"}}
+    plain = CatalogWriter(pad_columns=False)
+    plain.mark_item("a")
+    assert json.loads(plain.render(list(items), items, columns))["itemConfigs"] == items
+
+
+def test_writer_reuses_clean_fragments():
+    items = {"a": {"displayName": "A"}, "b": {"displayName": "B"}}
+    writer = CatalogWriter(LAYOUT_ARRAY, pad_columns=False)
+    first = writer.render(list(items), items, ["displayName"])
+    assert first == canonical(items, LAYOUT_ARRAY)
+    items["b"]["displayName"] = "Bee"
+    assert writer.render(list(items), items, ["displayName"]) == first
+    writer.mark_item("b")
+    assert json.loads(writer.render(list(items), items, ["displayName"]))[1]["displayName"] == "Bee"
+
+
+def test_streamed_item_ids_round_trip(tmp_path):
+    path = tmp_path / "itemIds.json"
+    shutil.copy(ITEM_IDS, path)
+    original = path.read_text(encoding="utf-8")
+    # As the editor streams it: small chunks, source kept for the writer
+    stream = CatalogStream(str(path), chunk_size=4096, keep_source=True)
+    items = dict(stream)
+    item_ids = list(items)
+    writer = CatalogWriter(stream.layout)
+    writer.seed(stream.source)
+    assert writer.save(str(path), item_ids, items, []) == 0
+    assert path.read_text(encoding="utf-8") == original
+
+    edited = item_ids[3]
+    items[edited]["amount"] = 5
+    writer.mark_item(edited)
+    assert writer.save(str(path), item_ids, items, []) == 1
+    saved = path.read_text(encoding="utf-8")
+    assert json.loads(saved)[3]["amount"] == 5
+    # Only the edited record's text differs
+    assert saved.replace(writer.fragments[edited], stream.source.fragments[edited]) == original
+
+
+@pytest.mark.parametrize("text, x, expected", [
+    ("x * 1.5", 10, 15.0),
+    ("max(1, round(x / 3))", 2, 1),
+    ("-x + 2 ** 3", 1, 7),
+    ("ceil(x) % 4", 5.2, 2),
+])
+def test_expression_evaluates(text, x, expected):
+    assert compile_expression(text)(x) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "x.real",  # Attribute access
+    "x.__class__",
+    "().__class__.__bases__[0].__subclasses__()",
+    "__import__('os').system('true')",  # Calls of anything but the listed functions
+    "open('/etc/passwd')",
+    "round.__call__(x)",
+    "max(x, key=abs)",
+    "__builtins__",  # Names other than x
+    "y + 1",
+    "'text' * x",  # Non-number constants
+    "True + x",
+    "[x][0]",
+    "lambda: x",
+    "x if x else 1",
+    "x +",  # Not an expression at all
+])
+def test_expression_rejects_everything_else(text):
+    with pytest.raises(ValueError):
+        compile_expression(text)
+
+
+def test_expression_limits_exponents():
+    with pytest.raises(ValueError):
+        compile_expression("x ** 100000")(10)
+
+
+def test_duplicate_records_copy_after_originals():
+    item_ids = ["Helmet_01", "Vest", "Helmet_02"]
+    item_data = {item_id: {"displayName": item_id, "tags": ["a"]} for item_id in item_ids}
+    record = duplicate_records([2, 0], item_ids, item_data, "Helmet_{n}", "Helmet_Tactical_{n}")
+    assert record["op"] == "insert"
+    assert [row[:2] for row in record["rows"]] == [[1, "Helmet_Tactical_01"], [4, "Helmet_Tactical_02"]]
+    copy = record["rows"][0][2]
+    copy["tags"].append("b")
+    assert item_data["Helmet_01"]["tags"] == ["a"]
+
+
+@pytest.mark.parametrize("match, replace", [
+    ("Helmet_{n}", "Helmet_{n}"),  # The originals' own IDs
+    ("Helmet_{n}", "Vest"),  # An ID already in the catalog
+    ("Helmet_{n}", "Copy"),  # Two copies would get the same ID
+    ("Helmet_{n}", ""),
+])
+def test_duplicate_records_refuses_taken_ids(match, replace):
+    item_ids = ["Helmet_01", "Vest", "Helmet_02"]
+    item_data = {item_id: {} for item_id in item_ids}
+    with pytest.raises(ValueError, match="already exists"):
+        duplicate_records([0, 2], item_ids, item_data, match, replace)
+
+
+def test_duplicate_records_refuses_unmatched_ids():
+    with pytest.raises(ValueError, match="does not match"):
+        duplicate_records([0], ["Vest"], {"Vest": {}}, "Helmet_{n}", "Helmet_{n}_copy")
+    with pytest.raises(ValueError, match="Invalid new ID pattern"):
+        duplicate_records([0], ["Vest"], {"Vest": {}}, "{id}", "{other}")
+
+
+def reload_plan(loaded, on_disk, last_read, changed_locally=()):
+    """plan_reload for the editor holding loaded, with last_read the file as it was read"""
+    return plan_reload(list(loaded), loaded, on_disk, catalog_digests(last_read),
+                       catalog_digests(on_disk), set(changed_locally))
+
+
+def test_reload_keeps_local_only_changes():
+    last_read = {"a": {"x": 1}, "b": {"x": 2}}
+    loaded = {"a": {"x": 10}, "c": {"x": 3}}  # a edited, b removed, c added here
+    assert reload_plan(loaded, last_read, last_read, {"a", "b", "c"}) == ([], [], [])
+
+
+def test_reload_applies_disk_only_changes():
+    last_read = {"a": {"x": 1, "y": 1}, "b": {"x": 2}, "c": {"x": 3}}
+    on_disk = {"a": {"x": 5}, "n": {"x": 9}, "c": {"x": 3}, "z": {"x": 0}}
+    records, reloaded, conflicts = reload_plan(dict(last_read), on_disk, last_read)
+    assert records == [
+        {"op": "remove", "ids": ["b"]},
+        {"op": "insert", "rows": [[1, "n", {"x": 9}], [3, "z", {"x": 0}]]},
+        {"op": "set", "id": "a", "key": "x", "value": 5},
+        {"op": "unset", "id": "a", "key": "y"},
+    ]
+    assert reloaded == ["b", "n", "z", "a"] and conflicts == []
+
+
+def test_reload_reports_changes_on_both_sides_as_conflicts():
+    last_read = {"a": {"x": 1}, "b": {"x": 2}, "c": {"x": 3}}
+    loaded = {"a": {"x": 10}, "b": {"x": 20}, "c": {"x": 3}}
+    on_disk = {"a": {"x": 11}, "c": {"x": 4}}  # a changed and b removed on disk too
+    records, reloaded, conflicts = reload_plan(loaded, on_disk, last_read, {"a", "b"})
+    assert conflicts == ["a", "b"]
+    assert records == [{"op": "set", "id": "c", "key": "x", "value": 4}] and reloaded == ["c"]
+
+
+def test_reload_skips_items_already_equal():
+    last_read = {"a": {"x": 1}}
+    loaded = on_disk = {"a": {"x": 2}}  # Same change made in both places
+    assert reload_plan(loaded, on_disk, last_read, {"a"}) == ([], [], [])
+
+
+def test_reload_without_earlier_digests_compares_everything():
+    loaded = {"a": {"x": 1}, "b": {"x": 2}}
+    on_disk = {"a": {"x": 1}, "b": {"x": 3}}
+    records, reloaded, _ = plan_reload(list(loaded), loaded, on_disk, None, catalog_digests(on_disk), set())
+    assert records == [{"op": "set", "id": "b", "key": "x", "value": 3}] and reloaded == ["b"]
+
+
+def journal_for(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    path.write_text(canonical(ITEMS), encoding="utf-8")
+    journal = EditJournal(str(path))
+    journal.start()
+    return journal
+
+
+def test_journal_replays_up_to_a_torn_write(tmp_path):
+    journal = journal_for(tmp_path)
+    first = [{"op": "set", "id": "Scrap", "key": "maxStackSize", "value": 99}]
+    second = [{"op": "remove", "ids": ["Odd"]}]
+    journal.append(encode_records(first))
+    journal.append(encode_records(second))
+    journal.file.write(encode_records([{"op": "rename", "id": "Medkit", "to": "Med"}])[:-7])  # Crash mid-line
+    journal.close()
+
+    reopened = EditJournal(journal.catalog_path)
+    header, batches = reopened.read_pending()
+    assert batches == [first, second]
+    assert reopened.matches_catalog(header)
+    (tmp_path / "itemConfigs.json").write_text(canonical(ITEMS) + "\n", encoding="utf-8")
+    assert not reopened.matches_catalog(header)  # The file changed since: offer, don't replay blindly
+
+
+def test_journal_with_only_a_header_has_no_edits(tmp_path):
+    journal = journal_for(tmp_path)
+    journal.append(encode_records([]))
+    journal.close()
+    with open(journal.path, "r+", encoding="utf-8") as f:
+        f.truncate(len(f.readline()) - 1)  # Torn after the header
+    assert EditJournal(journal.catalog_path).read_pending() is None
+
+
+def test_pending_edits_survive_until_resolved(tmp_path):
+    journal = journal_for(tmp_path)
+    first = [{"op": "set", "id": "Scrap", "key": "maxStackSize", "value": 99}]
+    journal.append(encode_records(first))
+    journal.close()
+
+    # Reopened: the old edits are set aside before the new journal starts
+    reopened = EditJournal(journal.catalog_path)
+    pending = reopened.read_pending()
+    reopened.set_aside(pending)
+    reopened.start()
+    later = [{"op": "unset", "id": "Medkit", "key": "icon"}]
+    reopened.append(encode_records(later))
+    reopened.close()
+
+    # A crash before the prompt was answered loses nothing, in order
+    header, batches = EditJournal(journal.catalog_path).read_pending()
+    assert header == pending[0] and batches == [first, later]
+    reopened.resolve_pending()
+    assert EditJournal(journal.catalog_path).read_pending()[1] == [later]
+    reopened.discard()
+    assert EditJournal(journal.catalog_path).read_pending() is None
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from catalog_cli import main
+from catalog_diff import (MARKER_BASE, MARKER_OURS, MARKER_THEIRS, RESOLVE_MARKERS, RESOLVE_OURS,
+                          RESOLVE_THEIRS, merge_catalogs)
+from catalog_schema import MISSING
+
+BASE = {
+    "a": {"displayName": "A", "maxStackSize": 1, "icon": "a.png"},
+    "b": {"displayName": "B", "maxStackSize": 1},
+    "c": {"displayName": "C", "maxStackSize": 1},
+}
+
+
+def changed(items, item_id, **fields):
+    items = {key: dict(item) for key, item in items.items()}
+    items[item_id].update(fields)
+    return items
+
+
+def test_one_sided_changes_merge_cleanly():
+    ours = changed(BASE, "a", displayName="Ours")
+    ours["new_ours"] = {"displayName": "Mine"}
+    theirs = changed(BASE, "a", maxStackSize=5)
+    del theirs["c"]
+    theirs = {"a": theirs["a"], "new_theirs": {"displayName": "Theirs"}, "b": theirs["b"]}
+    result = merge_catalogs(BASE, ours, theirs)
+    assert result.conflicts == []
+    assert list(result.items) == ["a", "new_theirs", "b", "new_ours"]
+    assert result.items["a"] == {"displayName": "Ours", "maxStackSize": 5, "icon": "a.png"}
+
+
+@pytest.mark.parametrize("resolve, value", [
+    (RESOLVE_OURS, 5),
+    (RESOLVE_THEIRS, 10),
+    (RESOLVE_MARKERS, {MARKER_OURS: 5, MARKER_BASE: 1, MARKER_THEIRS: 10}),
+])
+def test_same_field_conflict(resolve, value):
+    ours = changed(BASE, "a", maxStackSize=5, displayName="Ours")
+    theirs = changed(BASE, "a", maxStackSize=10)
+    result = merge_catalogs(BASE, ours, theirs, resolve)
+    assert [(c.item_id, c.key, c.base, c.ours, c.theirs) for c in result.conflicts] == [
+        ("a", "maxStackSize", 1, 5, 10)]
+    assert result.conflicts[0].describe() == "a.maxStackSize: ours 5, theirs 10, base 1"
+    assert result.items["a"] == {"displayName": "Ours", "maxStackSize": value, "icon": "a.png"}
+    assert result.items["b"] == BASE["b"]
+
+
+def test_same_change_on_both_sides_is_not_a_conflict():
+    ours = changed(BASE, "a", maxStackSize=5)
+    result = merge_catalogs(BASE, ours, changed(BASE, "a", maxStackSize=5))
+    assert result.conflicts == []
+    assert result.items == ours
+
+
+def test_values_of_different_types_conflict():
+    result = merge_catalogs(BASE, changed(BASE, "a", maxStackSize=2), changed(BASE, "a", maxStackSize=2.0),
+                            RESOLVE_THEIRS)
+    assert [c.key for c in result.conflicts] == ["maxStackSize"]
+    assert type(result.items["a"]["maxStackSize"]) is float
+
+
+@pytest.mark.parametrize("resolve, value", [
+    (RESOLVE_OURS, MISSING),
+    (RESOLVE_THEIRS, "theirs.png"),
+    (RESOLVE_MARKERS, {MARKER_OURS: None, MARKER_BASE: "a.png", MARKER_THEIRS: "theirs.png"}),
+])
+def test_field_removed_on_one_side_changed_on_the_other(resolve, value):
+    ours = changed(BASE, "a", displayName="Ours")
+    del ours["a"]["icon"]
+    theirs = changed(BASE, "a", icon="theirs.png")
+    result = merge_catalogs(BASE, ours, theirs, resolve)
+    conflict, = result.conflicts
+    assert (conflict.key, conflict.ours, conflict.theirs) == ("icon", MISSING, "theirs.png")
+    assert result.items["a"].get("icon", MISSING) == value
+
+
+@pytest.mark.parametrize("deleted_in, resolve, kept", [
+    ("ours", RESOLVE_OURS, False),
+    ("ours", RESOLVE_THEIRS, True),
+    ("ours", RESOLVE_MARKERS, True),
+    ("theirs", RESOLVE_OURS, True),
+    ("theirs", RESOLVE_THEIRS, False),
+    ("theirs", RESOLVE_MARKERS, True),
+])
+def test_deleted_on_one_side_modified_on_the_other(deleted_in, resolve, kept):
+    modified = changed(BASE, "b", maxStackSize=7)
+    deleted = {item_id: item for item_id, item in BASE.items() if item_id != "b"}
+    ours, theirs = (deleted, modified) if deleted_in == "ours" else (modified, deleted)
+    result = merge_catalogs(BASE, ours, theirs, resolve)
+    conflict, = result.conflicts
+    assert (conflict.item_id, conflict.key) == ("b", None)
+    assert conflict.describe() == f"b: deleted in {deleted_in}, changed in the other"
+    if kept:
+        assert result.items["b"] == modified["b"]
+    else:
+        assert "b" not in result.items
+    assert list(result.items) == [item_id for item_id in BASE if kept or item_id != "b"]
+
+
+def test_merge_command_writes_markers(tmp_path, capsys):
+    paths = []
+    for name, items in (("base", BASE), ("ours", changed(BASE, "a", maxStackSize=5)),
+                        ("theirs", changed(BASE, "a", maxStackSize=10))):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps({"itemConfigs": items}, indent=4), encoding="utf-8")
+        paths.append(str(path))
+    output = str(tmp_path / "merged.json")
+    assert main(["merge", "--base", paths[0], paths[1], paths[2], "-o", output]) == 1
+    assert "a.maxStackSize" in capsys.readouterr().out
+    with open(output, encoding="utf-8") as f:
+        merged = json.load(f)["itemConfigs"]
+    assert merged["a"]["maxStackSize"] == {MARKER_OURS: 5, MARKER_BASE: 1, MARKER_THEIRS: 10}
+    assert main(["merge", "--base", paths[0], paths[1], paths[2], "-o", output, "--conflicts", "theirs"]) == 0
+    with open(output, encoding="utf-8") as f:
+        assert json.load(f)["itemConfigs"]["a"]["maxStackSize"] == 10
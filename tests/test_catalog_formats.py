@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+import catalog_formats
+from catalog_core import LAYOUT_ARRAY, LAYOUT_ITEM_CONFIGS, catalog_columns
+from catalog_formats import FORMATS, SqliteItems, export_catalog, read_any
+
+ITEMS = {
+    "plain": {"displayName": "Plain", "category": "armor", "maxStackSize": 5, "weight": 1.5,
+              "tradeable": True},
+    "tricky": {"displayName": "true", "category": "", "maxStackSize": 1 << 70, "weight": float("nan"),
+               "tradeable": False},
+    "nested": {"displayName": "Line\nbreak, \"quoted\"\ttab", "category": None, "maxStackSize": -1,
+               "weight": 0.0, "tradeable": None, "modData": {"slots": [1, "two", None, {"x": 1.25}]}},
+    "sparse": {"displayName": "5"},
+    "clash": {"displayName": "null", "item_id": "not the ID"},
+}
+
+
+def snapshot(items):
+    """Items as JSON text, so types, key order and NaN compare exactly"""
+    return json.dumps({item_id: dict(items[item_id]) for item_id in items}, allow_nan=True)
+
+
+def write(tmp_path, name, items, layout=LAYOUT_ITEM_CONFIGS):
+    path = str(tmp_path / ("catalog" + FORMATS[name].extensions[0]))
+    export_catalog(path, items, list(items), catalog_columns(items, layout), layout, name)
+    return path
+
+
+@pytest.mark.parametrize("name", list(FORMATS))
+def test_round_trip_keeps_values_and_types(tmp_path, name):
+    path = write(tmp_path, name, ITEMS)
+    items, layout = read_any(path, name)
+    assert layout == LAYOUT_ITEM_CONFIGS
+    assert snapshot(items) == snapshot(ITEMS)
+
+
+# Text formats have no layout of their own
+@pytest.mark.parametrize("name", ["json", "sqlite", "columnar"])
+def test_round_trip_keeps_array_layout(tmp_path, name):
+    records = {item_id: {"itemId": item_id, **item} for item_id, item in ITEMS.items()}
+    path = write(tmp_path, name, records, LAYOUT_ARRAY)
+    items, layout = read_any(path, name)
+    assert layout == LAYOUT_ARRAY
+    assert snapshot(items) == snapshot(records)
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    # Force paging and eviction with a handful of rows
+    monkeypatch.setattr(catalog_formats, "PAGE_ROWS", 2)
+    monkeypatch.setattr(catalog_formats, "PAGE_CACHE", 1)
+
+
+def test_sqlite_items_edit_add_delete_rename(tmp_path, small_pages):
+    path = write(tmp_path, "sqlite", ITEMS)
+    items = SqliteItems(path)
+    try:
+        assert list(items) == list(ITEMS)
+        items["plain"]["weight"] = 2.5
+        # Read the other pages so the edited item's page is evicted
+        assert snapshot({"sparse": items["sparse"], "clash": items["clash"]}) == snapshot(
+            {"sparse": ITEMS["sparse"], "clash": ITEMS["clash"]})
+        assert items["plain"]["weight"] == 2.5
+        items["added"] = {"displayName": "Added", "extra": [1, 2]}
+        del items["sparse"]
+        items["renamed"] = items.pop("tricky")
+        assert "tricky" not in items
+        assert len(items) == 5
+        assert items.save(items.columns + ["extra"]) == 5
+        assert not items.has_changes()
+    finally:
+        items.close()
+
+    expected = {
+        "plain": {**ITEMS["plain"], "weight": 2.5},
+        "nested": ITEMS["nested"],
+        "clash": ITEMS["clash"],
+        "added": {"displayName": "Added", "extra": [1, 2]},
+        "renamed": ITEMS["tricky"],
+    }
+    reopened = SqliteItems(path)
+    try:
+        assert snapshot(reopened) == snapshot(expected)
+    finally:
+        reopened.close()
+    items, _ = read_any(path)
+    assert snapshot(items) == snapshot(expected)
+
+
+def test_sqlite_items_save_drops_columns(tmp_path):
+    path = write(tmp_path, "sqlite", ITEMS)
+    items = SqliteItems(path)
+    try:
+        items["sparse"]["displayName"] = "6"
+        items.save([key for key in items.columns if key != "modData"])
+    finally:
+        items.close()
+    items, _ = read_any(path)
+    assert "modData" not in items["nested"]
+    assert dict(items["sparse"]) == {"displayName": "6"}
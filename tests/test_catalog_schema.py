@@ -0,0 +1,62 @@
+from catalog_schema import ColumnStore, ItemRow, detach
+
+
+def test_popped_item_keeps_its_values_after_drop_column():
+    store = ColumnStore({"a": {"x": 1, "y": 2}, "b": {"x": 3, "y": 4}})
+    removed = store.pop("a")
+    assert type(removed) is dict
+    assert store.drop_column("y") == {"b": 4}
+    # Undo in reverse order: the column comes back, then the removed item
+    store.fill_column("y", {"b": 4})
+    store["a"] = removed
+    assert dict(store["a"]) == {"x": 1, "y": 2}
+    assert dict(store["b"]) == {"x": 3, "y": 4}
+
+
+def test_pop_missing_item():
+    store = ColumnStore({"a": {"x": 1}})
+    assert store.pop("b", None) is None
+    assert "a" in store and store.pop("a") == {"x": 1}
+
+
+def test_detach_copies_only_views():
+    store = ColumnStore({"a": {"x": 1}})
+    row = store["a"]
+    assert type(row) is ItemRow
+    detached = detach(row)
+    row["x"] = 2
+    assert detached == {"x": 1}
+    plain = {"x": 1}
+    assert detach(plain) is plain
+
+
+def test_removed_slots_are_cleared_and_reused():
+    store = ColumnStore({"a": {"x": 1, "name": "A"}, "b": [1, 2], "c": {"name": "C", "x": 3}})
+    slots = dict(store.slots)
+    del store["a"], store["b"], store["c"]
+    store["d"] = {"name": "D"}
+    store.extend([("e", {"x": 5}), ("f", {"x": 6, "name": "F"})])
+    assert sorted(store.slots.values()) == sorted(slots.values())
+    assert store.size == 3 and not store.loose and not store.orders
+    assert {item_id: dict(item) for item_id, item in store.items()} == {
+        "d": {"name": "D"}, "e": {"x": 5}, "f": {"x": 6, "name": "F"}}
+
+
+def test_replacing_items_does_not_grow_the_store():
+    store = ColumnStore({f"id{n}": {"x": n, "name": f"N{n}"} for n in range(10)})
+    for generation in range(50):
+        # As a reload from disk does: every item assigned again
+        store.extend((f"id{n}", {"name": f"N{n}", "x": n + generation}) for n in range(10))
+    assert store.size == 10
+    assert all(len(column.values) == 10 for key, column in store.columns.items() if key == "x")
+    assert list(store) == [f"id{n}" for n in range(10)]
+    assert dict(store["id3"]) == {"name": "N3", "x": 52}
+    assert store.orders == {slot: ("name", "x") for slot in store.slots.values()}
+
+
+def test_item_assigned_from_its_own_row():
+    store = ColumnStore({"a": {"x": 1, "y": "one"}, "b": {"x": 2}})
+    store["a"] = store["a"]
+    store["b"] = store["a"]
+    assert dict(store["a"]) == dict(store["b"]) == {"x": 1, "y": "one"}
+    assert store.size == 2
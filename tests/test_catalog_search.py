@@ -0,0 +1,96 @@
+import pytest
+
+from catalog_search import SearchIndex, SearchTerm, parse_query
+
+COLUMNS = ["ID", "displayName", "category", "rarity", "maxStackSize"]
+ROWS = [
+    ["Medkit", "Medkit", "consumables", "common", "10"],
+    ["Stim_Weak", "Weak Stim", "consumables", "uncommon", "5"],
+    ["Helmet_01", "Helmet", "armor", "epic", "1"],
+    ["Helmet_02", "Heavy Helmet", "armor", "legendary", "1"],
+    ["Scrap", "Scrap", "materials", "common", "50"],
+    ["Wire", "Wire", "materials", "common", "100"],
+    ["Odd", "Odd", "materials", "", "many"],
+]
+
+
+def make_index(rows=ROWS):
+    index = SearchIndex(lambda row, col: rows[row][col])
+    index.reset(len(rows), len(COLUMNS))
+    return index
+
+
+def matching(mask):
+    return [ROWS[row][0] for row, visible in enumerate(mask) if visible]
+
+
+def search(index, text, default_column=None):
+    return matching(index.search(parse_query(text, COLUMNS, default_column)))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("helmet", [SearchTerm(None, ":", "helmet")]),
+    ("category:Armor", [SearchTerm(2, ":", "armor")]),
+    ("RARITY=epic", [SearchTerm(3, "=", "epic")]),
+    ("maxStackSize>=50", [SearchTerm(4, ">=", "50")]),
+    ("rarity!=common", [SearchTerm(3, "!=", "common")]),
+    ('displayName:"weak stim" medkit', [SearchTerm(1, ":", "weak stim"), SearchTerm(None, ":", "medkit")]),
+    ('"heavy helmet"', [SearchTerm(None, ":", "heavy helmet")]),
+    ("weight>3", [SearchTerm(None, ":", "weight>3")]),  # Not a column: plain text
+    ("category:", []),  # Still being typed
+    ("rarity=", [SearchTerm(3, "=", "")]),
+])
+def test_query_grammar(text, expected):
+    assert parse_query(text, COLUMNS) == expected
+
+
+def test_plain_terms_use_the_default_column():
+    assert parse_query("scrap", COLUMNS, default_column=1) == [SearchTerm(1, ":", "scrap")]
+
+
+def test_terms_must_all_match():
+    index = make_index()
+    assert search(index, "helmet") == ["Helmet_01", "Helmet_02"]
+    assert search(index, "helmet rarity=epic") == ["Helmet_01"]
+    assert search(index, "category:materials rarity=") == ["Odd"]
+
+
+def test_typed_comparisons():
+    index = make_index()
+    # Numbers compare as numbers, not text ("100" > "50")
+    assert search(index, "maxStackSize>10") == ["Scrap", "Wire"]
+    assert search(index, "maxStackSize<=5") == ["Stim_Weak", "Helmet_01", "Helmet_02"]
+    assert search(index, "maxStackSize>=1 maxStackSize<10") == ["Stim_Weak", "Helmet_01", "Helmet_02"]
+    assert search(index, "maxStackSize!=1.0") == ["Medkit", "Stim_Weak", "Scrap", "Wire", "Odd"]
+    # A non-number never satisfies a numeric comparison
+    assert "Odd" not in search(index, "maxStackSize<1000")
+
+
+@pytest.mark.parametrize("queries", [
+    ["h", "he", "hel", "helmet"],
+    ["category:m", "category:ma", "category:materials", "category:materials rarity=common"],
+    ["maxStackSize>1", "maxStackSize>5", "maxStackSize>=50", "maxStackSize>60"],
+    ["maxStackSize<100", "maxStackSize<10", "maxStackSize<=1"],
+    ["e", "e rarity!=common", "e rarity!=common maxStackSize<5"],
+])
+def test_narrowing_matches_a_fresh_search(queries):
+    narrowed = make_index()
+    for text in queries:
+        expected = search(make_index(), text)
+        assert search(narrowed, text) == expected
+
+
+def test_narrowing_rechecks_edited_rows():
+    rows = [list(row) for row in ROWS]
+    index = make_index(rows)
+    assert search(index, "category:arm") == ["Helmet_01", "Helmet_02"]
+    rows[0][2] = "armor"
+    index.update_cell(0, 2)
+    assert search(index, "category:armor") == ["Medkit", "Helmet_01", "Helmet_02"]
+
+
+def test_looser_query_searches_every_row():
+    index = make_index()
+    assert search(index, "helmet rarity=epic") == ["Helmet_01"]
+    assert search(index, "helmet") == ["Helmet_01", "Helmet_02"]
+    assert index.search([]) is None
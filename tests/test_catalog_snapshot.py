@@ -0,0 +1,82 @@
+import json
+import os
+
+from catalog_core import LAYOUT_ARRAY, LAYOUT_ITEM_CONFIGS, file_signature, read_catalog
+from catalog_snapshot import read_catalog_cached, read_snapshot, snapshot_path, write_snapshot
+
+ITEMS = {
+    "Medkit": {"displayName": "Medkit", "category": "consumables", "maxStackSize": 10, "weight": 0.5},
+    "Scrap": {"displayName": "Scrap", "category": "materials", "maxStackSize": 50, "tags": ["a"]},
+}
+
+
+def write_catalog(path, items=ITEMS, mtime_ns=None):
+    path.write_text(json.dumps({"itemConfigs": items}, indent=4), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def snapshot_of(path):
+    items, layout = read_catalog(str(path))
+    assert write_snapshot(str(path), items, layout, file_signature(str(path)))
+
+
+def test_snapshot_matches_unchanged_file(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    write_catalog(path)
+    snapshot_of(path)
+    items, layout = read_snapshot(str(path))
+    assert layout == LAYOUT_ITEM_CONFIGS
+    assert {item_id: dict(item) for item_id, item in items.items()} == ITEMS
+
+
+def test_snapshot_rejected_when_size_changes(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    write_catalog(path, mtime_ns=1_000_000_000)
+    snapshot_of(path)
+    write_catalog(path, {**ITEMS, "Odd": {}}, mtime_ns=1_000_000_000)
+    assert read_snapshot(str(path)) is None
+
+
+def test_snapshot_accepted_when_only_mtime_changes(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    write_catalog(path, mtime_ns=1_000_000_000)
+    snapshot_of(path)
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert read_snapshot(str(path)) is not None
+
+
+def test_snapshot_rejected_when_content_changes_at_same_size(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    write_catalog(path, mtime_ns=1_000_000_000)
+    snapshot_of(path)
+    changed = dict(ITEMS, Medkit=dict(ITEMS["Medkit"], maxStackSize=20))
+    write_catalog(path, changed, mtime_ns=2_000_000_000)
+    assert os.path.getsize(path) == len(json.dumps({"itemConfigs": ITEMS}, indent=4))
+    assert read_snapshot(str(path)) is None
+
+
+def test_snapshot_not_written_for_a_changed_file(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    write_catalog(path, mtime_ns=1_000_000_000)
+    items, layout = read_catalog(str(path))
+    signature = file_signature(str(path))
+    write_catalog(path, {"Scrap": ITEMS["Scrap"]})
+    assert not write_snapshot(str(path), items, layout, signature)
+    assert not os.path.exists(snapshot_path(str(path)))
+
+
+def test_arrays_are_not_snapshotted(tmp_path):
+    path = tmp_path / "itemIds.json"
+    path.write_text(json.dumps([{"itemId": "a", "amount": 1}]), encoding="utf-8")
+    items, layout = read_catalog(str(path))
+    assert layout == LAYOUT_ARRAY
+    assert not write_snapshot(str(path), items, layout, file_signature(str(path)))
+
+
+def test_parse_refreshes_snapshot(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    write_catalog(path)
+    assert read_catalog_cached(str(path))[2] is False
+    items, _, from_snapshot = read_catalog_cached(str(path))
+    assert from_snapshot and dict(items["Scrap"]) == ITEMS["Scrap"]
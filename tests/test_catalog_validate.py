@@ -0,0 +1,54 @@
+import json
+import os
+
+import catalog_validate
+from catalog_core import LAYOUT_ITEM_CONFIGS
+from catalog_validate import read_checked, validate_file, validate_files
+
+
+def test_duplicate_ids_found_while_streaming(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    path.write_text('{"itemConfigs": {"Medkit": {"maxStackSize": 1}, "Scrap": {}, '
+                    '"Medkit": {"maxStackSize": 2, "tags": {"a": 1, "a": 2}}}}', encoding="utf-8")
+    items, layout, duplicates = read_checked(str(path))
+    assert layout == LAYOUT_ITEM_CONFIGS
+    # Repeated keys inside an item are not item IDs
+    assert duplicates == ["Medkit"]
+    assert list(items) == ["Medkit", "Scrap"] and items["Medkit"]["maxStackSize"] == 2
+    problems = validate_file(str(path))["problems"]
+    assert problems == [{"id": "Medkit", "field": None, "message": "duplicate ID"}]
+
+
+def test_duplicate_ids_in_direct_object(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_text('{"a": {}, "b": {}, "a": {}, "a": {}}', encoding="utf-8")
+    assert read_checked(str(path))[2] == ["a", "a"]
+
+
+def test_unreadable_json_is_an_error(tmp_path):
+    path = tmp_path / "itemConfigs.json"
+    path.write_text(json.dumps({"itemConfigs": {"a": {}}})[:-3], encoding="utf-8")
+    result = validate_file(str(path))
+    assert result["items"] == 0 and result["error"].startswith("cannot load")
+
+
+def test_unchanged_file_is_skipped_on_second_run(tmp_path, monkeypatch):
+    path = tmp_path / "itemConfigs.json"
+    path.write_text(json.dumps({"itemConfigs": {"Medkit": {"maxStackSize": -1}}}), encoding="utf-8")
+    cache = tmp_path / "cache" / "validate-cache.json"
+    first = validate_files([str(path)], 1, str(cache))
+    assert first["summary"] == {"files": 1, "failed": 1, "problems": 1, "cached": 0}
+
+    def not_again(job):
+        raise AssertionError(f"{job[0]} was checked again")
+
+    monkeypatch.setattr(catalog_validate, "validate_job", not_again)
+    second = validate_files([str(path)], 1, str(cache))
+    assert second["summary"]["cached"] == 1
+    assert second["files"][str(path)] == dict(first["files"][str(path)], cached=True)
+
+
+def test_cache_defaults_to_user_cache_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "name", "posix")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert catalog_validate.default_cache_path() == str(tmp_path / "itemConfigsEditor" / "validate-cache.json")
@@ -0,0 +1,67 @@
+import json
+import os
+
+from catalog_xref import CrossReference
+
+
+def write_json(path, document, mtime_ns):
+    path.write_text(json.dumps(document, indent=4), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def make_folder(tmp_path):
+    write_json(tmp_path / "itemConfigs.json", {"itemConfigs": {
+        "Medkit": {"icon": "medkit.png"},
+        "Scrap": {"icon": "scrap.png"},
+    }}, 1_000_000_000)
+    write_json(tmp_path / "itemIds.json", [
+        {"itemId": "r1", "baseItemId": "Medkit"},
+        {"itemId": "r2", "baseItemId": "Helmet_01"},
+        {"itemId": "r3", "baseItemId": "Helmet_01"},
+        {"itemId": "r4"},
+    ], 1_000_000_000)
+    (tmp_path / "icons").mkdir()
+    (tmp_path / "icons" / "medkit.png").write_bytes(b"png")
+    (tmp_path / "icons" / "old.png").write_bytes(b"png")
+    return CrossReference(str(tmp_path))
+
+
+def test_dangling_base_item_ids(tmp_path):
+    xref = make_folder(tmp_path)
+    xref.refresh()
+    inventory = str(tmp_path / "itemIds.json")
+    assert xref.missing_configs() == [(inventory, "r2", "Helmet_01"), (inventory, "r3", "Helmet_01")]
+    assert xref.unused_configs() == ["Scrap"]
+    report = xref.report()
+    assert report["missing_configs"][0] == {"file": "itemIds.json", "id": "r2", "baseItemId": "Helmet_01"}
+    assert report["missing_icons"] == [{"file": "itemConfigs.json", "id": "Scrap", "icon": "scrap.png"}]
+    assert report["orphaned_icons"] == ["old.png"] and report["errors"] == []
+
+
+def test_dangling_reference_resolved_by_a_config_in_another_file(tmp_path):
+    xref = make_folder(tmp_path)
+    xref.refresh()
+    write_json(tmp_path / "_itemConfigs.json", {"itemConfigs": {"Helmet_01": {}}}, 2_000_000_000)
+    assert xref.refresh() == [str(tmp_path / "_itemConfigs.json")]
+    assert xref.missing_configs() == []
+    os.remove(tmp_path / "_itemConfigs.json")
+    xref.refresh()
+    assert [base_id for _, _, base_id in xref.missing_configs()] == ["Helmet_01", "Helmet_01"]
+
+
+def test_refresh_rereads_only_changed_sources(tmp_path):
+    xref = make_folder(tmp_path)
+    xref.refresh()
+    assert xref.refresh() == []
+    write_json(tmp_path / "itemIds.json", [{"itemId": "r1", "baseItemId": "Gone"}], 2_000_000_000)
+    assert xref.refresh() == [str(tmp_path / "itemIds.json")]
+    assert [base_id for _, _, base_id in xref.missing_configs()] == ["Gone"]
+    assert xref.unused_configs() == ["Medkit", "Scrap"]
+
+
+def test_unreadable_inventory_is_reported(tmp_path):
+    xref = make_folder(tmp_path)
+    write_json(tmp_path / "itemIds.json", {"itemConfigs": {}}, 2_000_000_000)
+    xref.refresh()
+    assert xref.missing_configs() == []
+    assert xref.errors() == [(str(tmp_path / "itemIds.json"), "expected an array of inventory records")]
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6.QtGui")
+
+from PyQt6.QtCore import QCoreApplication
+
+from icon_import import IconImporter, IconLibrary
+
+
+def icon_files(icons_dir):
+    return sorted(name for name in os.listdir(icons_dir) if not name.startswith("."))
+
+
+def test_same_bytes_placed_once(tmp_path):
+    library = IconLibrary(str(tmp_path / "icons"))
+    assert library.place(b"GIF89a-one", "medkit.gif") == ("medkit.gif", False)
+    assert library.place(b"GIF89a-one", "other.gif") == ("medkit.gif", True)
+    assert icon_files(tmp_path / "icons") == ["medkit.gif"]
+
+
+def test_identical_file_already_in_folder_is_reused(tmp_path):
+    icons = tmp_path / "icons"
+    icons.mkdir()
+    (icons / "stim.gif").write_bytes(b"GIF89a-stim")
+    (icons / "same_size.gif").write_bytes(b"GIF89a-XXXX")
+    library = IconLibrary(str(icons))
+    assert library.place(b"GIF89a-stim", "new.gif") == ("stim.gif", True)
+    assert icon_files(icons) == ["same_size.gif", "stim.gif"]
+
+
+def test_different_bytes_never_overwrite(tmp_path):
+    icons = tmp_path / "icons"
+    icons.mkdir()
+    (icons / "Medkit.gif").write_bytes(b"GIF89a-old")
+    library = IconLibrary(str(icons))
+    assert library.place(b"GIF89a-new", "medkit.gif") == ("medkit_2.gif", False)
+    assert library.place(b"GIF89a-newer", "medkit.gif") == ("medkit_3.gif", False)
+    assert (icons / "Medkit.gif").read_bytes() == b"GIF89a-old"
+
+
+def test_importing_the_same_icon_twice(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    first, second = tmp_path / "a.gif", tmp_path / "b.gif"
+    first.write_bytes(b"GIF89a-same")
+    second.write_bytes(b"GIF89a-same")
+    icons_dir = str(tmp_path / "icons")
+    importer = IconImporter()
+    finished = []
+    importer.finished.connect(finished.append)
+
+    for run in range(2):
+        importer.start([(str(first), "medkit.gif"), (str(second), "stim.gif")], icons_dir)
+        while len(finished) <= run:
+            app.processEvents()
+    importer.pool.waitForDone()
+
+    once, again = finished
+    assert not once.errors and len(set(once.names.values())) == 1
+    assert len(once.reused) == 1  # The second file found the first one's icon
+    assert again.names == once.names and again.reused == {str(first), str(second)}
+    assert icon_files(icons_dir) == list(set(once.names.values()))
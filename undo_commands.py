@@ -0,0 +1,106 @@
+"""Undo/redo commands for the item table.
+
+Every change to the table is expressed as a list of small edit records
+(see ItemTableModel.apply_records). A command stores only those records and
+the inverse records produced when they were applied, never a copy of the
+catalog, and writes whatever it applies to the model's edit journal.
+"""
+from PyQt6.QtGui import QUndoCommand, QUndoStack
+
+from catalog_core import encode_records
+
+# QUndoCommand.id() shared by single-cell edits so they can coalesce
+EDIT_CELL_ID = 1001
+
+
+class RecordCommand(QUndoCommand):
+    """Undoable change made of edit records"""
+
+    def __init__(self, model, records, text):
+        super().__init__(text)
+        self.model = model
+        self.records = records
+        self.inverse = None
+        self.byte_size = 0
+        self.skip_redo = False
+
+    def redo(self):
+        if self.skip_redo:
+            # Re-pushed clone of a command that is already applied
+            self.skip_redo = False
+            return
+        self.inverse = self.model.apply_records(self.records)
+        self.byte_size = self.model.journal_records(self.records) + len(encode_records(self.inverse))
+
+    def undo(self):
+        # Applying the inverse yields fresh forward records (e.g. rows now re-inserted)
+        self.records = self.model.apply_records(self.inverse)
+        self.model.journal_records(self.inverse)
+
+    def clone(self):
+        """Copy of an applied command that can be pushed without re-applying it"""
+        command = type(self)(self.model, self.records, self.text())
+        command.inverse = self.inverse
+        command.byte_size = self.byte_size
+        command.skip_redo = True
+        return command
+
+
+class EditCellCommand(RecordCommand):
+    """Single cell edit; consecutive edits of the same cell merge into one step"""
+
+    def id(self):
+        return EDIT_CELL_ID
+
+    def mergeWith(self, other):
+        if not isinstance(other, EditCellCommand):
+            return False
+        mine, theirs = self.records[0], other.records[0]
+        if (mine.get("id"), mine.get("key")) != (theirs.get("id"), theirs.get("key")):
+            return False
+        # Keep our inverse (the value before the first edit) and take the latest value
+        self.records = other.records
+        self.byte_size = len(encode_records(self.records)) + len(encode_records(self.inverse))
+        if self.inverse == self.records:
+            self.setObsolete(True)  # Edited back to where it started
+        return True
+
+
+class UndoHistory(QUndoStack):
+    """QUndoStack that keeps the memory held by its commands under a cap.
+
+    QUndoStack can only limit the number of commands, and only while empty.
+    When the commands' recorded sizes exceed memory_limit, the oldest ones
+    are dropped by rebuilding the stack from clones of the newest commands
+    that fit in half the budget.
+    """
+
+    def __init__(self, memory_limit=64 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.memory_limit = memory_limit
+
+    def push(self, command):
+        super().push(command)
+        self.enforce_memory_limit()
+
+    def memory_used(self):
+        return sum(getattr(self.command(i), "byte_size", 0) for i in range(self.count()))
+
+    def enforce_memory_limit(self):
+        if not self.memory_limit or self.memory_used() <= self.memory_limit:
+            return
+        keep = []
+        total = 0
+        for i in range(self.index() - 1, -1, -1):
+            command = self.command(i)
+            size = getattr(command, "byte_size", 0)
+            if keep and total + size > self.memory_limit // 2:
+                break
+            if not hasattr(command, "clone"):
+                break
+            keep.append(command.clone())
+            total += size
+        keep.reverse()
+        self.clear()
+        for command in keep:
+            super().push(command)